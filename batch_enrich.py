@@ -5,95 +5,255 @@ Batch enrichment script for existing land records without coordinates or scoring
 
 import os
 import sys
+import time
+import queue
 import logging
+import multiprocessing
 from datetime import datetime
 
 # Add the current directory to the path so we can import our modules
 sys.path.append('.')
 
-from app import app, db
-from models import Land
-from services.enrichment_service import EnrichmentService
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(processName)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-def batch_enrich_lands(limit=None):
-    """Enrich existing lands that are missing coordinates or scoring"""
-    
-    with app.app_context():
-        # Find lands needing enrichment
-        query = Land.query.filter(
-            db.or_(
-                Land.location_lat.is_(None),
-                Land.location_lon.is_(None),
-                Land.score_total.is_(None)
-            )
+# How long to wait for a progress report before checking whether workers died
+WORKER_POLL_SECONDS = 5
+
+def find_land_ids_needing_enrichment(limit=None):
+    """Ids of lands that are missing coordinates or scoring, in id order"""
+    from app import db
+    from models import Land
+
+    query = db.session.query(Land.id).filter(
+        db.or_(
+            Land.location_lat.is_(None),
+            Land.location_lon.is_(None),
+            Land.score_total.is_(None)
         )
-        
-        if limit:
-            lands_to_enrich = query.limit(limit).all()
-        else:
-            lands_to_enrich = query.all()
-        
-        logger.info(f"Found {len(lands_to_enrich)} lands needing enrichment")
-        
-        if not lands_to_enrich:
-            logger.info("No lands need enrichment")
-            return 0
-        
-        enrichment_service = EnrichmentService()
-        success_count = 0
-        error_count = 0
-        
-        for i, land in enumerate(lands_to_enrich, 1):
-            try:
-                logger.info(f"Processing {i}/{len(lands_to_enrich)}: Land {land.id} - {land.title[:50]}...")
-                
-                # Skip if municipality is clearly bad
-                if not land.municipality or land.municipality.lower() in ['and', 'cantabria']:
-                    logger.warning(f"Skipping land {land.id} with bad municipality: '{land.municipality}'")
-                    error_count += 1
-                    continue
-                
-                success = enrichment_service.enrich_land(land.id)
-                
+    ).order_by(Land.id)
+
+    if limit:
+        query = query.limit(limit)
+
+    return [row.id for row in query]
+
+def has_usable_municipality(land):
+    """Skip lands whose municipality is clearly bad"""
+    return bool(land.municipality) and land.municipality.lower() not in ['and', 'cantabria']
+
+def enrich_land_ids(land_ids, on_result=None, force=False):
+    """Enrich the given lands one by one, reporting each outcome to on_result(land_id, success)"""
+    from config import Config
+    from models import Land
+    from services.enrichment_service import EnrichmentService
+
+    enrichment_service = EnrichmentService()
+    success_count = 0
+    error_count = 0
+
+    land_ids = list(land_ids)
+    for index, land_id in enumerate(land_ids):
+        # Batched Overpass and Distance Matrix requests for the upcoming lands
+        if index % Config.OSM_BATCH_LANDS == 0:
+            enrichment_service.prefetch_lands(land_ids[index:index + Config.OSM_BATCH_LANDS], force=force)
+
+        success = False
+        try:
+            land = Land.query.get(land_id)
+
+            if not has_usable_municipality(land):
+                logger.warning(f"Skipping land {land.id} with bad municipality: '{land.municipality}'")
+            else:
+                logger.info(f"Processing land {land.id} - {(land.title or '')[:50]}...")
+                success = enrichment_service.enrich_land(land.id, force=force)
+
                 if success:
-                    success_count += 1
                     logger.info(f"Successfully enriched land {land.id}")
                 else:
-                    error_count += 1
                     logger.warning(f"Failed to enrich land {land.id}")
-                
-                # Small delay to avoid overwhelming external APIs
-                if i % 10 == 0:
-                    logger.info(f"Processed {i} lands so far. Success: {success_count}, Errors: {error_count}")
-                    
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Exception enriching land {land.id}: {str(e)}")
-                continue
-        
-        logger.info(f"Batch enrichment completed. Success: {success_count}, Errors: {error_count}")
-        return success_count
+
+        except Exception as e:
+            logger.error(f"Exception enriching land {land_id}: {str(e)}")
+
+        if success:
+            success_count += 1
+        else:
+            error_count += 1
+        if on_result:
+            on_result(land_id, success)
+
+    return success_count, error_count
+
+def _worker_main(worker_index, land_ids, progress_queue, force=False):
+    """Worker process entry point: own app context and DB session for one id range"""
+    try:
+        from app import app
+
+        with app.app_context():
+            enrich_land_ids(land_ids, on_result=lambda land_id, success: progress_queue.put(
+                ('result', worker_index, land_id, success)
+            ), force=force)
+    except Exception as e:
+        logger.error(f"Worker {worker_index} crashed: {str(e)}")
+    finally:
+        progress_queue.put(('done', worker_index, None, None))
+
+def split_into_ranges(land_ids, workers):
+    """Split sorted ids into at most `workers` disjoint contiguous ranges"""
+    chunk = -(-len(land_ids) // workers)  # ceiling division
+    return [land_ids[i:i + chunk] for i in range(0, len(land_ids), chunk)]
+
+def parallel_enrich_lands(land_ids, workers, force=False):
+    """Enrich lands in `workers` processes and merge their progress reports"""
+    ranges = split_into_ranges(land_ids, workers)
+
+    # Without Redis each process gets an equal share of every provider budget
+    os.environ['RATE_LIMIT_PROCESSES'] = str(len(ranges))
+
+    # Spawned workers build their own app, engine and connection pool
+    context = multiprocessing.get_context('spawn')
+    progress_queue = context.Queue()
+    processes = []
+    for index, id_range in enumerate(ranges):
+        logger.info(f"Worker {index}: {len(id_range)} lands (ids {id_range[0]}-{id_range[-1]})")
+        process = context.Process(target=_worker_main, args=(index, id_range, progress_queue, force),
+                                  name=f'enrich-worker-{index}')
+        process.start()
+        processes.append(process)
+
+    total = len(land_ids)
+    success_count = 0
+    error_count = 0
+    reported = [0] * len(processes)
+    finished = set()
+    started = time.monotonic()
+
+    def finish_worker(worker_index):
+        # Lands a worker never reported on (crash, kill) count as errors
+        nonlocal error_count
+        finished.add(worker_index)
+        unreported = len(ranges[worker_index]) - reported[worker_index]
+        if unreported:
+            logger.error(f"Worker {worker_index} stopped with {unreported} lands unprocessed")
+            error_count += unreported
+
+    while len(finished) < len(processes):
+        try:
+            event, worker_index, land_id, success = progress_queue.get(timeout=WORKER_POLL_SECONDS)
+        except queue.Empty:
+            # A worker killed outright never sends 'done'
+            for index, process in enumerate(processes):
+                if index not in finished and not process.is_alive():
+                    logger.error(f"Worker {index} exited with code {process.exitcode} without finishing")
+                    finish_worker(index)
+            continue
+
+        if worker_index in finished:
+            continue
+        if event == 'done':
+            finish_worker(worker_index)
+            logger.info(f"Worker {worker_index} finished")
+            continue
+
+        reported[worker_index] += 1
+        if success:
+            success_count += 1
+        else:
+            error_count += 1
+
+        processed = success_count + error_count
+        if processed % 10 == 0 or processed == total:
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed > 0 else 0
+            eta = (total - processed) / rate if rate > 0 else 0
+            logger.info(f"Progress {processed}/{total} ({rate * 60:.1f} lands/min, ETA {eta:.0f}s). "
+                        f"Success: {success_count}, Errors: {error_count}")
+
+    for process in processes:
+        process.join()
+
+    return success_count, error_count
+
+def async_enrich_land_ids(land_ids, on_result=None, force=False):
+    """Enrich the given lands concurrently on one event loop (AsyncEnrichmentService)"""
+    from models import Land
+    from services.async_enrichment_service import AsyncEnrichmentService
+
+    usable_ids = []
+    for land in Land.query.filter(Land.id.in_(land_ids)):
+        if has_usable_municipality(land):
+            usable_ids.append(land.id)
+        else:
+            logger.warning(f"Skipping land {land.id} with bad municipality: '{land.municipality}'")
+
+    results = AsyncEnrichmentService().enrich_lands(usable_ids, force=force, on_result=on_result)
+    success_count = sum(results.values())
+    return success_count, len(land_ids) - success_count
+
+def batch_enrich_lands(limit=None, workers=1, force=False, use_async=False):
+    """Enrich existing lands that are missing coordinates or scoring"""
+    if workers > 1 and use_async:
+        raise ValueError("workers and use_async cannot be combined")
+
+    from app import app
+
+    with app.app_context():
+        land_ids = find_land_ids_needing_enrichment(limit)
+
+    logger.info(f"Found {len(land_ids)} lands needing enrichment")
+
+    if not land_ids:
+        logger.info("No lands need enrichment")
+        return 0
+
+    started = datetime.utcnow()
+    if workers > 1:
+        success_count, error_count = parallel_enrich_lands(land_ids, workers, force)
+    elif use_async:
+        with app.app_context():
+            success_count, error_count = async_enrich_land_ids(land_ids, force=force)
+    else:
+        with app.app_context():
+            processed = []
+
+            def log_progress(land_id, success):
+                processed.append(success)
+                if len(processed) % 10 == 0:
+                    logger.info(f"Processed {len(processed)} lands so far. "
+                                f"Success: {sum(processed)}, Errors: {len(processed) - sum(processed)}")
+
+            success_count, error_count = enrich_land_ids(land_ids, on_result=log_progress, force=force)
+
+    duration = (datetime.utcnow() - started).total_seconds()
+    logger.info(f"Batch enrichment completed in {duration:.0f}s. Success: {success_count}, Errors: {error_count}")
+    return success_count
 
 if __name__ == "__main__":
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Batch enrich land records")
     parser.add_argument("--limit", type=int, help="Limit number of records to process")
     parser.add_argument("--test", action="store_true", help="Test run with first 5 records")
-    
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes, each enriching a disjoint id range")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Enrich all lands concurrently with the asyncio engine in one process")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-run every enrichment step even if its inputs are unchanged")
+
     args = parser.parse_args()
-    
+    if args.workers > 1 and args.use_async:
+        parser.error("--workers and --async cannot be combined")
+
     if args.test:
         print("Running test with 5 records...")
-        result = batch_enrich_lands(limit=5)
+        result = batch_enrich_lands(limit=5, workers=args.workers, force=args.force, use_async=args.use_async)
     else:
-        result = batch_enrich_lands(limit=args.limit)
-    
-    print(f"Enriched {result} land records successfully")
\ No newline at end of file
+        result = batch_enrich_lands(limit=args.limit, workers=args.workers, force=args.force, use_async=args.use_async)
+
+    print(f"Enriched {result} land records successfully")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark the thread-pooled and asyncio enrichment engines against local HTTP stand-ins
+
+A local server imitates Places searchNearby, Distance Matrix and Overpass
+with a fixed latency, so the comparison needs no network or API keys. Only
+the enrichment stages are timed: planning, merging and the commit are shared
+by both engines.
+
+    python benchmarks/enrichment_engines.py --lands 50 --latency 0.05
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Settings read at import time by the services
+os.environ.setdefault('Google_api', 'benchmark-key')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers like the Google/Overpass endpoints after a fixed delay"""
+
+    # A connection per request: keep-alive plus delayed ACKs would add ~40 ms to some responses
+    protocol_version = 'HTTP/1.0'
+    latency = 0.05
+    request_count = 0
+    count_lock = threading.Lock()
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self._respond()
+
+    def _respond(self):
+        with StandInHandler.count_lock:
+            StandInHandler.request_count += 1
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        time.sleep(self.latency)
+
+        url = urlsplit(self.path)
+        if 'searchNearby' in url.path:
+            center = json.loads(body)['locationRestriction']['circle']['center']
+            payload = {'places': [
+                {'id': f'p{i}', 'displayName': {'text': place_type}, 'types': [place_type], 'rating': 4.2,
+                 'location': {'latitude': center['latitude'] + 0.001 * (i + 1), 'longitude': center['longitude']}}
+                for i, place_type in enumerate(['supermarket', 'school', 'hospital', 'restaurant',
+                                                'cafe', 'train_station', 'bus_station', 'airport'])
+            ]}
+        elif 'distancematrix' in url.path:
+            query = parse_qs(url.query)
+            origins = query.get('origins', [''])[0].split('|')
+            destinations = query.get('destinations', [''])[0].split('|')
+            payload = {'status': 'OK', 'rows': [{'elements': [{
+                'status': 'OK', 'duration': {'value': 600 + 60 * (len(destination) % 30)},
+                'distance': {'value': (600 + 60 * (len(destination) % 30)) * 15}
+            } for destination in destinations]} for _ in origins]}
+        else:
+            payload = {'elements': [{'tags': {'amenity': 'cafe'}}, {'tags': {'amenity': 'school'}}]}
+
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(latency):
+    StandInHandler.latency = latency
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def point_services_at(base_url):
+    """Redirect every outbound URL to the stand-in server and lift rate limits"""
+    from config import Config
+    import services.amenity_lookup as amenity_lookup
+    import services.enrichment_service as enrichment_service
+    import services.travel_time_service as travel_time_service
+
+    Config.PROVIDER_RATE_LIMITS = {}
+    Config.OSM_POI_INDEX_PATH = os.path.join(os.path.dirname(__file__), 'no-poi-index')
+    amenity_lookup.PLACES_NEARBY_URL = f"{base_url}/v1/places:searchNearby"
+    enrichment_service.DISTANCE_MATRIX_URL = f"{base_url}/maps/api/distancematrix/json"
+    travel_time_service.DISTANCE_MATRIX_URL = f"{base_url}/maps/api/distancematrix/json"
+
+    import services.async_enrichment_service as async_enrichment_service
+    async_enrichment_service.DISTANCE_MATRIX_URL = enrichment_service.DISTANCE_MATRIX_URL
+
+
+def make_lands(count):
+    # ~1.1 km apart so no two lands share an amenity search or cache cell
+    return [
+        SimpleNamespace(id=i, title=f'Land {i}', description='Finca con vistas al mar', municipality='Gijón',
+                        location_lat=43.0 + 0.01 * (i // 40), location_lon=-6.0 + 0.015 * (i % 40),
+                        infrastructure_extended=None, transport=None, services_quality=None, environment=None)
+        for i in range(count)
+    ]
+
+
+def run_sync(lands, base_url, workers):
+    from services.enrichment_service import EnrichmentService
+
+    service = EnrichmentService(max_workers=workers)
+    service.osm_overpass_url = f"{base_url}/api/interpreter"
+    results = []
+    for land in lands:
+        results.append(service._run_enrichment_stages(land))
+    return results
+
+
+def run_async(lands, base_url, max_lands, max_in_flight):
+    from services.async_enrichment_service import AsyncEnrichmentService
+    from utils.http_client import AsyncHttpClient
+
+    service = AsyncEnrichmentService(max_lands=max_lands, max_in_flight=max_in_flight)
+    service.osm_overpass_url = f"{base_url}/api/interpreter"
+
+    async def main():
+        land_slots = asyncio.Semaphore(service.max_lands)
+
+        async def run_one(land):
+            async with land_slots:
+                return await service._run_enrichment_stages_async(land, service._enrichment_stages())
+
+        async with AsyncHttpClient(max_in_flight=service.max_in_flight) as client:
+            service.client = client
+            return await asyncio.gather(*(run_one(land) for land in lands))
+
+    return asyncio.run(main())
+
+
+def summarize(stage_results):
+    """Merged stage output, for checking that both engines agree"""
+    merged = {}
+    for name, snapshot in stage_results:
+        merged[name] = {field: getattr(snapshot, field) for field in
+                        ('infrastructure_extended', 'transport', 'services_quality', 'environment', 'travel_times')}
+    return json.dumps(merged, sort_keys=True, default=str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the sync and asyncio enrichment engines")
+    parser.add_argument("--lands", type=int, default=20, help="Number of lands to enrich")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in response latency in seconds")
+    parser.add_argument("--workers", type=int, default=5, help="Thread pool size per land for the sync engine")
+    parser.add_argument("--max-lands", type=int, default=50, help="Lands in flight for the async engine")
+    parser.add_argument("--max-in-flight", type=int, default=100, help="Requests in flight for the async engine")
+    args = parser.parse_args()
+
+    from flask import Flask
+    from utils.cache import cache
+
+    base_url = start_stand_in_server(args.latency)
+    point_services_at(base_url)
+
+    app = Flask(__name__)
+    # Every lookup goes to the stand-in
+    cache.init_app(app, config={'CACHE_TYPE': 'NullCache', 'CACHE_NO_NULL_WARNING': True})
+
+    with app.app_context():
+        lands = make_lands(args.lands)
+
+        StandInHandler.request_count = 0
+        started = time.monotonic()
+        sync_results = run_sync(lands, base_url, args.workers)
+        sync_seconds = time.monotonic() - started
+        sync_requests = StandInHandler.request_count
+
+        StandInHandler.request_count = 0
+        started = time.monotonic()
+        async_results = run_async(lands, base_url, args.max_lands, args.max_in_flight)
+        async_seconds = time.monotonic() - started
+        async_requests = StandInHandler.request_count
+
+    matching = sum(summarize(a) == summarize(b) for a, b in zip(sync_results, async_results))
+    print(f"{args.lands} lands, {args.latency * 1000:.0f} ms stand-in latency")
+    print(f"  sync  (thread pool of {args.workers} per land): {sync_seconds:7.2f}s  "
+          f"{args.lands / sync_seconds:7.1f} lands/s  {sync_requests} requests")
+    print(f"  async (max {args.max_lands} lands, {args.max_in_flight} requests in flight): {async_seconds:7.2f}s  "
+          f"{args.lands / async_seconds:7.1f} lands/s  {async_requests} requests")
+    print(f"  speedup: {sync_seconds / async_seconds:.1f}x, identical results for {matching}/{args.lands} lands")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark KeywordMatcher against `any(keyword in text ...)` scans and a single-pass regex
+
+Runs the keyword sets used by enrichment, scoring and the email parser on
+synthetic descriptions - listing-like text full of keywords, and plain
+text with few of them - and checks that every approach finds the same
+categories. The regex column is the single-pass alternative KeywordMatcher
+does not use: one trie-shaped alternation of all keywords, searched from
+each match start so overlapping keywords are still found.
+
+    python benchmarks/keyword_matching.py --texts 1000 --words 400
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Settings read at import time by the services
+os.environ.setdefault('Google_api', 'benchmark-key')
+
+LISTING_WORDS = ('finca', 'parcela', 'con', 'acceso', 'por', 'camino', 'asfaltado', 'a', 'minutos', 'del', 'pueblo',
+                 'orientación', 'sur', 'vistas', 'despejadas', 'ideal', 'para', 'huerta', 'o', 'casa', 'de', 'campo',
+                 'agua', 'luz', 'próxima', 'metros', 'cuadrados', 'prado', 'llano', 'asturias', 'ganado', 'hórreo',
+                 'suelo', 'rústico', 'monte', 'bosque', 'playa', 'fibra', 'urbanizable', 'construir')
+PLAIN_WORDS = ('with', 'the', 'and', 'property', 'located', 'near', 'quiet', 'area', 'good', 'access', 'road',
+               'meters', 'from', 'village', 'views', 'garden', 'sunny', 'plot', 'ideal', 'building', 'house',
+               'family', 'privacy')
+
+
+def make_texts(count, words, vocabulary, seed=7):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(words // 2, words))) for _ in range(count)]
+
+
+def scan_any(keywords, text):
+    """The approach KeywordMatcher replaced: one substring scan per keyword"""
+    return {category for category, category_keywords in keywords.items()
+            if any(keyword in text for keyword in category_keywords)}
+
+
+def trie_pattern(words):
+    """Regex alternation shaped like a trie, so each position branches on one character"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class SinglePassRegex:
+    """All keywords in one regex; the longest match at a position implies its prefixes"""
+
+    def __init__(self, keywords):
+        keyword_categories = {}
+        for category, category_keywords in keywords.items():
+            for keyword in category_keywords:
+                keyword_categories.setdefault(keyword, set()).add(category)
+        self.prefix_categories = {
+            keyword: set().union(*(found for prefix, found in keyword_categories.items() if keyword.startswith(prefix)))
+            for keyword in keyword_categories
+        }
+        self.pattern = re.compile(trie_pattern(keyword_categories))
+        self.category_count = len(keywords)
+
+    def matches(self, text):
+        found = set()
+        match = self.pattern.search(text)
+        while match and len(found) < self.category_count:
+            found |= self.prefix_categories[match.group()]
+            match = self.pattern.search(text, match.start() + 1)
+        return found
+
+
+def timed(func, texts, repeat):
+    best = float('inf')
+    results = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [func(text) for text in texts]
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6 / len(texts), results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare KeywordMatcher with any() scans and a single-pass regex")
+    parser.add_argument("--texts", type=int, default=1000, help="Descriptions per corpus")
+    parser.add_argument("--words", type=int, default=400, help="Maximum words per description")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    from services.enrichment_service import VIEW_KEYWORDS
+    from services.scoring.config_manager import ScoringConfigManager
+    from utils.email_parser import EmailParser, LEGAL_STATUS_KEYWORDS
+    from utils.keyword_matcher import keyword_matcher
+
+    config_manager = ScoringConfigManager()
+    matchers = {
+        'environment views': VIEW_KEYWORDS,
+        'infrastructure': keyword_matcher({utility: config_manager.get_infrastructure_keywords(utility)
+                                           for utility in ('electricity', 'water', 'internet', 'gas')}),
+        'land type': EmailParser().land_type_matcher,
+        'legal status': LEGAL_STATUS_KEYWORDS,
+    }
+
+    print(f"{args.texts} descriptions of up to {args.words} words, microseconds per text")
+    for corpus, vocabulary in (('listing', LISTING_WORDS), ('plain', PLAIN_WORDS)):
+        texts = make_texts(args.texts, args.words, vocabulary)
+        for name, matcher in matchers.items():
+            any_us, expected = timed(lambda text: scan_any(matcher.keywords, text), texts, args.repeat)
+            matcher_us, found = timed(matcher.matches, texts, args.repeat)
+            regex_us, regex_found = timed(SinglePassRegex(matcher.keywords).matches, texts, args.repeat)
+            identical = found == expected and regex_found == expected
+            print(f"  {corpus:8} {name:18} any(): {any_us:7.1f}  matcher: {matcher_us:7.1f}  "
+                  f"single-pass regex: {regex_us:7.1f}  identical: {identical}")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Precompute drive times from every cell of the region grid to every destination
+
+Run after import_osm_roads.py, and again whenever the road graph or the
+destination list changes.
+"""
+
+import sys
+import logging
+
+# Add the current directory to the path so we can import our modules
+sys.path.append('.')
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    import argparse
+    from services.travel_time_grid import build_travel_time_grid
+
+    parser = argparse.ArgumentParser(description="Build the precomputed travel time grid from the road graph")
+    parser.add_argument("--output", help="Grid file path (default: Config.TRAVEL_TIME_GRID_PATH)")
+
+    args = parser.parse_args()
+
+    cell_count, destination_count = build_travel_time_grid(args.output)
+    print(f"Built travel time grid of {cell_count} cells x {destination_count} destinations")
@@ -1,5 +1,8 @@
 import os
 
+# Data files shipped with or built next to the code, found whatever the working directory
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
 class Config:
     # Email backend selection
     EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", "imap").lower()  # 'imap' or 'gmail'
@@ -44,6 +47,98 @@ class Config:
     # OSM Overpass API
     OSM_OVERPASS_URL = "https://overpass-api.de/api/interpreter"
     
+    # Offline OSM amenity index built by import_osm_pois.py; Overpass is queried only when it is missing
+    OSM_POI_INDEX_PATH = os.environ.get("OSM_POI_INDEX_PATH") or os.path.join(DATA_DIR, "osm_pois.idx")
+    OSM_OVERPASS_FALLBACK = (os.environ.get("OSM_OVERPASS_FALLBACK") or "true").lower() == "true"
+    # Batch enrichment groups lands into grid cells this size and sends one bounding-box Overpass query per cell
+    OSM_BATCH_CLUSTER_METERS = int(os.environ.get("OSM_BATCH_CLUSTER_METERS") or "10000")
+    OSM_BATCH_LANDS = int(os.environ.get("OSM_BATCH_LANDS") or "200")  # Lands prefetched at a time
+
+    # Travel time destinations (cities, beaches, airports, ...)
+    DESTINATION_CATALOG_PATH = os.environ.get("DESTINATION_CATALOG_PATH") or os.path.join(DATA_DIR, "destinations.json")
+
+    # Offline road graph built by import_osm_roads.py; travel times are routed on it before Google is asked
+    ROAD_GRAPH_PATH = os.environ.get("ROAD_GRAPH_PATH") or os.path.join(DATA_DIR, "roads.graph")
+    ROAD_ROUTER_MAX_SNAP_METERS = int(os.environ.get("ROAD_ROUTER_MAX_SNAP_METERS") or "3000")  # Point to nearest road
+    # Drive times from every grid cell to every destination, built by build_travel_time_grid.py
+    TRAVEL_TIME_GRID_PATH = os.environ.get("TRAVEL_TIME_GRID_PATH") or os.path.join(DATA_DIR, "travel_times.grid")
+    TRAVEL_TIME_GRID_CELL_METERS = int(os.environ.get("TRAVEL_TIME_GRID_CELL_METERS") or "1000")
+    # South, west, north, east - Asturias and Cantabria
+    TRAVEL_TIME_GRID_BOUNDS = tuple(float(value) for value in
+                                    (os.environ.get("TRAVEL_TIME_GRID_BOUNDS") or "42.85,-7.25,43.75,-3.05").split(','))
+
+    # Outbound HTTP (Google, Nominatim, Overpass) - per-attempt timeouts, overall deadline, retries
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT") or "5")
+    HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT") or "15")
+    HTTP_DEADLINE = float(os.environ.get("HTTP_DEADLINE") or "30")
+    HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES") or "2")
+    HTTP_BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR") or "0.5")
+    HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX") or "8")
+    HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE") or "20")
+    
+    # Circuit breakers: a provider is skipped (local fallbacks used) after this many consecutive
+    # failed attempts, and probed again after the reset period
+    CIRCUIT_BREAKER_FAILURES = int(os.environ.get("CIRCUIT_BREAKER_FAILURES") or "5")
+    CIRCUIT_BREAKER_RESET_SECONDS = float(os.environ.get("CIRCUIT_BREAKER_RESET_SECONDS") or "60")
+
+    # Per-provider API budgets (token bucket: sustained requests/second and burst size)
+    # Shared by all workers through Redis when REDIS_URL is set
+    PROVIDER_RATE_LIMITS = {
+        'google_places': {'rate': float(os.environ.get("RATE_LIMIT_GOOGLE_PLACES") or "10"), 'burst': 10},
+        'google_distance_matrix': {'rate': float(os.environ.get("RATE_LIMIT_GOOGLE_DISTANCE_MATRIX") or "20"), 'burst': 20},
+        'google_geocoding': {'rate': float(os.environ.get("RATE_LIMIT_GOOGLE_GEOCODING") or "40"), 'burst': 40},
+        'nominatim': {'rate': float(os.environ.get("RATE_LIMIT_NOMINATIM") or "1"), 'burst': 1},  # OSMF usage policy
+        'overpass': {'rate': float(os.environ.get("RATE_LIMIT_OVERPASS") or "1"), 'burst': 2},
+    }
+    
+    # Travel times - only the k nearest (great-circle) candidates of each facility type are routed
+    TRAVEL_TIME_CANDIDATES = {
+        'beach': int(os.environ.get("TRAVEL_TIME_CANDIDATES_BEACH") or "3"),
+        'airport': int(os.environ.get("TRAVEL_TIME_CANDIDATES_AIRPORT") or "2"),
+        'train_station': int(os.environ.get("TRAVEL_TIME_CANDIDATES_TRAIN_STATION") or "2"),
+        'hospital': int(os.environ.get("TRAVEL_TIME_CANDIDATES_HOSPITAL") or "2"),
+        'police': int(os.environ.get("TRAVEL_TIME_CANDIDATES_POLICE") or "2"),
+    }
+    
+    # Enrichment pipeline - number of external I/O stages run concurrently per land (1 = sequential)
+    ENRICHMENT_MAX_WORKERS = int(os.environ.get("ENRICHMENT_MAX_WORKERS") or "5")
+    
+    # asyncio enrichment engine - 'sync' (thread pool per land) or 'async' for bulk ingestion
+    ENRICHMENT_ENGINE = (os.environ.get("ENRICHMENT_ENGINE") or "sync").lower()
+    ASYNC_ENRICHMENT_MAX_IN_FLIGHT = int(os.environ.get("ASYNC_ENRICHMENT_MAX_IN_FLIGHT") or "100")  # HTTP requests
+    ASYNC_ENRICHMENT_MAX_LANDS = int(os.environ.get("ASYNC_ENRICHMENT_MAX_LANDS") or "50")
+    
+    # Background bulk enrichment jobs - lands prefetched per batch, and heartbeat age after which a job can be resumed
+    ENRICHMENT_JOB_CHUNK_SIZE = int(os.environ.get("ENRICHMENT_JOB_CHUNK_SIZE") or "25")
+    ENRICHMENT_JOB_STALE_SECONDS = int(os.environ.get("ENRICHMENT_JOB_STALE_SECONDS") or "600")
+    
+    # Enrichment read-through cache - lookups are shared by lands in the same grid cell
+    ENRICHMENT_CACHE_GRID_METERS = int(os.environ.get("ENRICHMENT_CACHE_GRID_METERS") or "50")
+    ENRICHMENT_CACHE_TTLS = {
+        'google_places': 7 * 86400,       # POIs open and close, refresh weekly
+        'distance_matrix': 30 * 86400,    # Road network is stable for months
+        'overpass': 30 * 86400,
+    }
+    
+    # Persistent route cache (route_cache table) - routed travel times per origin cell, destination and mode
+    ROUTE_CACHE_GRID_METERS = int(os.environ.get("ROUTE_CACHE_GRID_METERS") or "50")
+    ROUTE_CACHE_TTL_DAYS = int(os.environ.get("ROUTE_CACHE_TTL_DAYS") or "180")
+    
+    # Persistent geocode cache (geocode_cache table) - results per normalized address, misses kept briefly
+    GEOCODE_CACHE_TTL_DAYS = int(os.environ.get("GEOCODE_CACHE_TTL_DAYS") or "365")
+    GEOCODE_CACHE_NEGATIVE_TTL_HOURS = int(os.environ.get("GEOCODE_CACHE_NEGATIVE_TTL_HOURS") or "24")
+    # Addresses geocoded in parallel by GeocodingService.geocode_many (requests still respect PROVIDER_RATE_LIMITS)
+    GEOCODING_MAX_WORKERS = int(os.environ.get("GEOCODING_MAX_WORKERS") or "8")
+    # Precise geocodes within this distance of another land's coordinates count as duplicates
+    DUPLICATE_COORDINATE_TOLERANCE_METERS = float(os.environ.get("DUPLICATE_COORDINATE_TOLERANCE_METERS") or "2")
+    
+    # Offline gazetteer consulted before any geocoding request (rebuild with import_gazetteer.py)
+    GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH") or os.path.join(DATA_DIR, "gazetteer.json")
+    GAZETTEER_MIN_SIMILARITY = float(os.environ.get("GAZETTEER_MIN_SIMILARITY") or "0.7")
+    
+    # Amenity searches are reused by lands whose centre is this close to a recent search
+    AMENITY_SHARE_MAX_OFFSET_METERS = int(os.environ.get("AMENITY_SHARE_MAX_OFFSET_METERS") or "250")
+
     # Professional scoring weights based on Spanish/European standards
     # Total must equal 1.0 (100%) - Updated to include Investment Yield
     DEFAULT_SCORING_WEIGHTS = {
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Build the offline place-name gazetteer from a GeoNames country dump
+
+Download: https://download.geonames.org/export/dump/ES.zip
+"""
+
+import sys
+import logging
+
+# Add the current directory to the path so we can import our modules
+sys.path.append('.')
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    import argparse
+    from services.gazetteer import import_geonames
+
+    parser = argparse.ArgumentParser(description="Import Asturian and Cantabrian place names into the gazetteer")
+    parser.add_argument("source", help="GeoNames dump (ES.zip or ES.txt)")
+    parser.add_argument("--output", help="Gazetteer file path (default: Config.GAZETTEER_PATH)")
+
+    args = parser.parse_args()
+
+    count = import_geonames(args.source, args.output)
+    print(f"Imported {count} places")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Build the offline OSM amenity index from a regional extract (GeoJSON or PBF)
+
+Example extract: osmium tags-filter asturias-latest.osm.pbf nwr/amenity -o amenities.osm.pbf
+"""
+
+import sys
+import logging
+
+# Add the current directory to the path so we can import our modules
+sys.path.append('.')
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    import argparse
+    from services.osm_poi_index import import_osm_extract
+
+    parser = argparse.ArgumentParser(description="Import OSM amenities into the local POI index")
+    parser.add_argument("source", help="GeoJSON (.geojson/.json) or PBF (.pbf) extract")
+    parser.add_argument("--output", help="Index file path (default: Config.OSM_POI_INDEX_PATH)")
+
+    args = parser.parse_args()
+
+    count = import_osm_extract(args.source, args.output)
+    print(f"Indexed {count} POIs")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Build the offline road graph used for travel times from a regional extract (GeoJSON or PBF)
+
+Example extract: osmium tags-filter asturias-latest.osm.pbf w/highway -o roads.osm.pbf
+"""
+
+import sys
+import logging
+
+# Add the current directory to the path so we can import our modules
+sys.path.append('.')
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    import argparse
+    from services.road_router import import_road_extract
+
+    parser = argparse.ArgumentParser(description="Import OSM roads into the local routing graph")
+    parser.add_argument("source", help="GeoJSON (.geojson/.json) or PBF (.pbf) extract")
+    parser.add_argument("--output", help="Graph file path (default: Config.ROAD_GRAPH_PATH)")
+
+    args = parser.parse_args()
+
+    node_count, edge_count = import_road_extract(args.source, args.output)
+    print(f"Built road graph with {node_count} nodes and {edge_count} edges")
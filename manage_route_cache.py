@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Inspect, purge, export and bulk-load the persistent route cache
+
+Warm start a new database: export on the old one, then load the CSV:
+    python manage_route_cache.py export routes.csv
+    python manage_route_cache.py load routes.csv
+"""
+
+import sys
+import json
+import logging
+
+# Add the current directory to the path so we can import our modules
+sys.path.append('.')
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    import argparse
+    from app import app
+    from services.route_cache import export_routes, get_route_cache_stats, load_routes, purge_expired_routes
+
+    parser = argparse.ArgumentParser(description="Manage the persistent route cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show route counts by provider")
+    subparsers.add_parser("purge", help="Delete expired routes")
+    export_parser = subparsers.add_parser("export", help="Write unexpired routes to a CSV file")
+    export_parser.add_argument("path")
+    load_parser = subparsers.add_parser("load", help="Bulk-load routes from an exported CSV file")
+    load_parser.add_argument("path")
+    load_parser.add_argument("--batch-size", type=int, default=5000, help="Rows per commit")
+
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.command == "stats":
+            print(json.dumps(get_route_cache_stats(), indent=2))
+        elif args.command == "purge":
+            print(f"Purged {purge_expired_routes()} expired routes")
+        elif args.command == "export":
+            print(f"Exported {export_routes(args.path)} routes to {args.path}")
+        elif args.command == "load":
+            print(f"Loaded {load_routes(args.path, batch_size=args.batch_size)} routes from {args.path}")
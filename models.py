@@ -147,3 +147,94 @@ class SyncHistory(db.Model):
     
     def __repr__(self):
         return f'<SyncHistory {self.sync_type} - {self.new_properties_added} properties>'
+
+class EnrichmentJob(db.Model):
+    __tablename__ = 'enrichment_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(30), nullable=False, default='bulk_enrichment')
+    status = db.Column(db.String(20), default='pending')  # 'pending', 'running', 'completed', 'failed'
+    chunk_size = db.Column(db.Integer, default=25)
+    total_count = db.Column(db.Integer, default=0)      # Lands matching when the job was created
+    processed_count = db.Column(db.Integer, default=0)
+    success_count = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    last_land_id = db.Column(db.Integer, default=0)     # Checkpoint: every land up to this id is done
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    run_started_at = db.Column(db.DateTime)             # Start of the current (possibly resumed) run
+    run_start_processed = db.Column(db.Integer, default=0)  # processed_count when the current run started
+    heartbeat_at = db.Column(db.DateTime)               # Updated after every land
+    completed_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<EnrichmentJob {self.id} {self.status} {self.processed_count}/{self.total_count}>'
+    
+    def to_dict(self):
+        """Convert job to dictionary including progress, throughput and ETA"""
+        now = datetime.utcnow()
+        throughput = None
+        eta_seconds = None
+        
+        if self.run_started_at:
+            elapsed = ((self.completed_at or now) - self.run_started_at).total_seconds()
+            processed_this_run = (self.processed_count or 0) - (self.run_start_processed or 0)
+            if elapsed > 0 and processed_this_run > 0:
+                throughput = processed_this_run / elapsed * 60  # lands per minute
+                remaining = max(0, (self.total_count or 0) - (self.processed_count or 0))
+                if self.status == 'running':
+                    eta_seconds = int(remaining / throughput * 60)
+        
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'total_count': self.total_count,
+            'processed_count': self.processed_count,
+            'success_count': self.success_count,
+            'error_count': self.error_count,
+            'last_land_id': self.last_land_id,
+            'progress_percentage': round(min(100.0, self.processed_count / self.total_count * 100), 1) if self.total_count else 100.0,
+            'throughput_per_minute': round(throughput, 2) if throughput else None,
+            'eta_seconds': eta_seconds,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class RouteCache(db.Model):
+    __tablename__ = 'route_cache'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    origin_cell = db.Column(db.String(64), nullable=False)      # utils.cache.coordinate_cell of the origin
+    destination = db.Column(db.String(255), nullable=False)
+    mode = db.Column(db.String(20), nullable=False, default='driving')
+    travel_time = db.Column(db.Integer)                         # Minutes
+    distance = db.Column(db.Integer)                            # Kilometers
+    provider = db.Column(db.String(20), nullable=False)         # 'google', 'road_graph'
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    __table_args__ = (
+        db.UniqueConstraint('origin_cell', 'destination', 'mode', name='uq_route_cache_key'),
+    )
+    
+    def __repr__(self):
+        return f'<RouteCache {self.origin_cell} -> {self.destination} [{self.mode}]: {self.travel_time} min>'
+
+class GeocodeCache(db.Model):
+    __tablename__ = 'geocode_cache'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    address_key = db.Column(db.String(500), nullable=False, unique=True)  # services.geocode_cache.normalize_address
+    address = db.Column(db.String(500), nullable=False)         # As first geocoded
+    found = db.Column(db.Boolean, nullable=False, default=True) # False: no provider knows the address
+    lat = db.Column(db.Float)
+    lng = db.Column(db.Float)
+    formatted_address = db.Column(db.Text)
+    address_components = db.Column(JSONB)
+    provider = db.Column(db.String(20))                         # 'google', 'nominatim'
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<GeocodeCache {self.address_key}: {(self.lat, self.lng) if self.found else "not found"}>'
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Recompute estimated travel times for every land with the vectorized engine
+
+Run after changing the speed model or the destination lists in TravelTimeService.
+"""
+
+import sys
+import logging
+
+# Add the current directory to the path so we can import our modules
+sys.path.append('.')
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    import argparse
+    from app import app
+    from services.travel_time_matrix import recompute_estimated_travel_times
+
+    parser = argparse.ArgumentParser(description="Recompute estimated travel times for all lands")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Lands per bulk update and commit")
+    parser.add_argument("--missing-only", action="store_true",
+                        help="Only fill lands without travel times (keeps Google-routed values)")
+
+    args = parser.parse_args()
+
+    with app.app_context():
+        count = recompute_estimated_travel_times(batch_size=args.batch_size, missing_only=args.missing_only)
+    print(f"Recomputed travel times for {count} lands")
@@ -1,7 +1,7 @@
 import logging
 import os
 from flask import Blueprint, jsonify, request, send_from_directory, current_app
-from models import Land, ScoringCriteria, SyncHistory
+from models import Land, ScoringCriteria, SyncHistory, EnrichmentJob
 from app import db
 from utils.auth import admin_required, rate_limit
 
@@ -37,44 +37,71 @@ def download_project():
 @admin_required
 @rate_limit(max_requests=2, window_seconds=300)  # 2 requests per 5 minutes
 def bulk_enrichment():
-    """Enrich all properties that are missing extended infrastructure or environment data"""
+    """Start a background job enriching all properties missing extended infrastructure or environment data"""
     try:
-        from services.enrichment_service import EnrichmentService
+        from services.enrichment_job_service import start_bulk_enrichment_job
         
-        # Find properties missing enrichment data
-        lands_to_enrich = Land.query.filter(
-            (Land.infrastructure_extended.is_(None)) |
-            (Land.environment.is_(None)) |
-            (Land.transport.is_(None)) |
-            (Land.services_quality.is_(None)) |
-            (Land.infrastructure_extended == {}) |
-            (Land.environment == {}) |
-            (Land.transport == {}) |
-            (Land.services_quality == {})
-        ).all()
+        job = start_bulk_enrichment_job()
         
-        enrichment_service = EnrichmentService()
-        success_count = 0
-        total_count = len(lands_to_enrich)
+        return jsonify({
+            "success": True,
+            "message": f"Bulk enrichment job {job.id} is {job.status} for {job.total_count} properties",
+            "job_id": job.id,
+            "status_url": f"/api/enrichment/jobs/{job.id}",
+            "job": job.to_dict()
+        }), 202
         
-        for land in lands_to_enrich:
-            try:
-                if enrichment_service.enrich_land(land.id):
-                    success_count += 1
-                    logger.info(f"Enriched land {land.id}: {land.title[:50]}...")
-            except Exception as e:
-                logger.error(f"Failed to enrich land {land.id}: {str(e)}")
-                continue
+    except Exception as e:
+        logger.error(f"Bulk enrichment failed: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/enrichment/jobs/<int:job_id>')
+def enrichment_job_status(job_id):
+    """Get progress, throughput and ETA of a bulk enrichment job"""
+    try:
+        from services.enrichment_job_service import is_job_stale
+        
+        job = EnrichmentJob.query.get_or_404(job_id)
+        job_data = job.to_dict()
+        job_data['resumable'] = job.status == 'failed' or is_job_stale(job)
         
         return jsonify({
             "success": True,
-            "message": f"Successfully enriched {success_count} out of {total_count} properties",
-            "enriched_count": success_count,
-            "total_found": total_count
+            "job": job_data
         })
         
     except Exception as e:
-        logger.error(f"Bulk enrichment failed: {str(e)}")
+        logger.error(f"Failed to get enrichment job {job_id}: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/enrichment/jobs/<int:job_id>/resume', methods=['POST'])
+@admin_required
+def resume_enrichment_job(job_id):
+    """Resume an interrupted bulk enrichment job from its last checkpoint"""
+    try:
+        from services.enrichment_job_service import resume_enrichment_job as resume_job
+        
+        job = resume_job(job_id)
+        
+        return jsonify({
+            "success": True,
+            "message": f"Resumed enrichment job {job.id} after land {job.last_land_id}",
+            "job": job.to_dict()
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 409
+    except Exception as e:
+        logger.error(f"Failed to resume enrichment job {job_id}: {str(e)}")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -83,14 +110,18 @@ def bulk_enrichment():
 @api_bp.route('/land/<int:land_id>/enrich', methods=['POST'])
 @rate_limit(max_requests=10, window_seconds=60)  # Protect from abuse
 def manual_enrichment(land_id):
-    """Manually trigger data enrichment for a specific property"""
+    """Manually trigger data enrichment for a specific property
+    
+    Unchanged steps are skipped; pass ?force=true to recompute everything.
+    """
     try:
         from services.enrichment_service import EnrichmentService
         
         land = Land.query.get_or_404(land_id)
         enrichment_service = EnrichmentService()
+        force = request.args.get('force', 'false').lower() in ('1', 'true', 'yes')
         
-        success = enrichment_service.enrich_land(land_id)
+        success = enrichment_service.enrich_land(land_id, force=force)
         
         if success:
             return jsonify({
@@ -419,6 +450,8 @@ def get_lands():
         sort_by = request.args.get('sort', 'score_total')
         sort_order = request.args.get('order', 'desc')
         land_type_filter = request.args.get('filter')
+        near = request.args.get('near')
+        within_minutes = request.args.get('within_minutes', type=int)
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
         
@@ -429,6 +462,18 @@ def get_lands():
         if land_type_filter and land_type_filter in ['developed', 'buildable']:
             query = query.filter(Land.land_type == land_type_filter)
         
+        # Apply drive time filter (lands within within_minutes of near), from the travel time grid
+        if near and within_minutes:
+            from services.travel_time_grid import land_ids_within_minutes
+            try:
+                land_ids = land_ids_within_minutes(near, within_minutes)
+            except ValueError as e:
+                return jsonify({
+                    "success": False,
+                    "error": str(e)
+                }), 400
+            query = query.filter(Land.id.in_(land_ids))
+        
         # Apply sorting
         if hasattr(Land, sort_by):
             sort_column = getattr(Land, sort_by)
@@ -577,6 +622,93 @@ def scheduler_status():
             "error": str(e)
         }), 500
 
+@api_bp.route('/cache/stats')
+@admin_required
+def cache_stats():
+    """Get cache backend info, enrichment cache hit/miss counters and route and geocode cache counts"""
+    try:
+        from utils.cache import get_cache_stats
+        from services.route_cache import get_route_cache_stats
+        from services.geocode_cache import get_geocode_cache_stats
+        
+        return jsonify({
+            "success": True,
+            "cache": get_cache_stats(),
+            "route_cache": get_route_cache_stats(),
+            "geocode_cache": get_geocode_cache_stats()
+        })
+        
+    except Exception as e:
+        logger.error(f"Failed to get cache stats: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/http/metrics')
+@admin_required
+def http_metrics():
+    """Get per-host latency and error metrics and rate limit usage for outbound API calls"""
+    try:
+        from utils.http_client import get_http_metrics
+        from utils.rate_limiter import get_rate_limiter
+        
+        return jsonify({
+            "success": True,
+            "hosts": get_http_metrics(),
+            "rate_limits": get_rate_limiter().get_stats()
+        })
+        
+    except Exception as e:
+        logger.error(f"Failed to get HTTP metrics: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/http/circuit-breakers')
+@admin_required
+def circuit_breakers():
+    """Get circuit breaker state per external provider (this worker process)"""
+    try:
+        from utils.circuit_breaker import get_circuit_breaker
+        
+        breaker = get_circuit_breaker()
+        return jsonify({
+            "success": True,
+            "failure_threshold": breaker.failure_threshold,
+            "reset_seconds": breaker.reset_seconds,
+            "providers": breaker.get_stats()
+        })
+    
+    except Exception as e:
+        logger.error(f"Failed to get circuit breakers: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api_bp.route('/http/circuit-breakers/reset', methods=['POST'])
+@admin_required
+def reset_circuit_breakers():
+    """Close a provider's circuit breaker (?provider=name), or all of them"""
+    try:
+        from utils.circuit_breaker import get_circuit_breaker
+        
+        provider = request.args.get('provider')
+        get_circuit_breaker().reset(provider)
+        return jsonify({
+            "success": True,
+            "message": f"Circuit breaker reset for {provider or 'all providers'}"
+        })
+    
+    except Exception as e:
+        logger.error(f"Failed to reset circuit breakers: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @api_bp.route('/stats')
 def get_stats():
     """Get application statistics"""
@@ -40,6 +40,8 @@ def lands():
             'municipality': request.args.get('municipality', ''),
             'search': request.args.get('search', ''),
             'sea_view': request.args.get('sea_view', '') == 'on',
+            'near': request.args.get('near', ''),
+            'within_minutes': request.args.get('within_minutes', type=int),
             'min_price': request.args.get('min_price', type=float),
             'max_price': request.args.get('max_price', type=float),
             'min_area': request.args.get('min_area', type=float),
@@ -106,6 +108,8 @@ def lands():
                 'municipality': validated_filters.get('municipality', ''),
                 'search': validated_filters.get('search', ''),
                 'sea_view': validated_filters.get('sea_view', False),
+                'near': validated_filters.get('near', ''),
+                'within_minutes': validated_filters.get('within_minutes'),
                 'min_price': validated_filters.get('min_price'),
                 'max_price': validated_filters.get('max_price'),
                 'min_area': validated_filters.get('min_area'),
@@ -0,0 +1,301 @@
+import os
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from utils.cache import cached_enrichment_lookup, cached_enrichment_lookup_async
+from utils.http_client import get_http_client
+from utils.spatial_index import haversine_meters
+
+logger = logging.getLogger(__name__)
+
+# Places API (New) accepts many place types per Nearby Search request
+PLACES_NEARBY_URL = "https://places.googleapis.com/v1/places:searchNearby"
+PLACES_FIELD_MASK = "places.id,places.displayName,places.types,places.location,places.rating"
+MAX_RESULTS_PER_REQUEST = 20  # Hard limit of searchNearby
+
+# Amenity categories and the Google place types that count for each
+AMENITY_CATEGORIES = {
+    'supermarket': ['supermarket', 'grocery_store'],
+    'school': ['school', 'primary_school', 'secondary_school'],
+    'hospital': ['hospital', 'doctor'],
+    'restaurant': ['restaurant'],
+    'cafe': ['cafe'],
+    'train_station': ['train_station', 'subway_station'],
+    'bus_station': ['bus_station'],
+    'airport': ['airport']
+}
+
+LOCAL_RADIUS = 5000
+WIDE_RADIUS = 50000  # Maximum radius accepted by the Places API
+WIDE_SEARCH_CATEGORIES = ['airport']  # Retried at WIDE_RADIUS when nothing is found locally
+MAX_SEARCH_ROUNDS = 3
+
+MAX_RECENT_SEARCHES = 256
+
+
+class RecentSearches:
+    """Recent nearby searches shared between lands whose search circles overlap heavily
+
+    Owned by whoever enriches a batch of lands (see EnrichmentService) and
+    cleared between batches, so results never leak across services or tests.
+    """
+
+    def __init__(self, maxlen: int = MAX_RECENT_SEARCHES):
+        self._searches = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, lat: float, lon: float, types_key: str, radius: int, places: List[Dict]):
+        with self._lock:
+            self._searches.append((lat, lon, types_key, radius, places))
+
+    def find(self, lat: float, lon: float, types_key: str, radius: int, max_offset: float) -> Optional[List[Dict]]:
+        """Places of the latest search with the same types and radius centred within max_offset"""
+        with self._lock:
+            for search_lat, search_lon, search_types, search_radius, places in reversed(self._searches):
+                if search_types == types_key and search_radius == radius:
+                    if haversine_meters(lat, lon, search_lat, search_lon) <= max_offset:
+                        return places
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._searches.clear()
+
+    def __len__(self):
+        return len(self._searches)
+
+
+class AmenityLookupService:
+    """Fetches every amenity category for a location in as few Places calls as possible
+
+    The first request asks for all categories at once, ranked by distance. Only
+    categories that may have been crowded out of the 20-result page are asked
+    for again, and the airport search is widened when none is nearby.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, recent_searches: Optional[RecentSearches] = None):
+        from config import Config
+
+        self.api_key = api_key or os.environ.get("Google_api") or os.environ.get("GOOGLE_MAPS_API") or os.environ.get("GOOGLE_PLACES_API_KEY")
+        self.share_max_offset = Config.AMENITY_SHARE_MAX_OFFSET_METERS
+        # Pass the same RecentSearches to lookups of one batch so nearby lands share searches
+        self.recent_searches = recent_searches if recent_searches is not None else RecentSearches()
+
+        self.type_categories = {}
+        for category, place_types in AMENITY_CATEGORIES.items():
+            for place_type in place_types:
+                self.type_categories.setdefault(place_type, []).append(category)
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, Dict]]:
+        """Get nearest distance and average rating for every amenity category
+
+        Returns {category: {'distance': meters, 'avg_rating': float|None,
+        'count': int, 'radius': search radius}} for categories that were found,
+        or None if the Places API could not be reached.
+        """
+        plan = self._lookup_plan(lat, lon)
+        try:
+            search = next(plan)
+            while True:
+                search = plan.send(self._search(lat, lon, *search))
+        except StopIteration as done:
+            return done.value
+
+    async def lookup_async(self, lat: float, lon: float, client) -> Optional[Dict[str, Dict]]:
+        """lookup() for the asyncio engine, sending requests through an AsyncHttpClient"""
+        plan = self._lookup_plan(lat, lon)
+        try:
+            search = next(plan)
+            while True:
+                search = plan.send(await self._search_async(lat, lon, *search, client))
+        except StopIteration as done:
+            return done.value
+
+    def _lookup_plan(self, lat: float, lon: float):
+        """The lookup algorithm, independent of how searches are sent
+
+        Yields (place_types, radius) for each search it needs, receives the
+        places found (None on failure) and returns the summary.
+        """
+        places = yield from self._search_local_plan(lat, lon)
+        if places is None:
+            return None
+
+        summary = self.summarize(lat, lon, places, LOCAL_RADIUS)
+
+        missing_wide = [c for c in WIDE_SEARCH_CATEGORIES if c not in summary]
+        if missing_wide:
+            wide_places = yield (self._types_for(missing_wide), WIDE_RADIUS)
+            if wide_places:
+                wide_summary = self.summarize(lat, lon, wide_places, WIDE_RADIUS)
+                for category in missing_wide:
+                    if category in wide_summary:
+                        summary[category] = wide_summary[category]
+
+        return summary
+
+    def summarize(self, lat: float, lon: float, places: List[Dict], radius: int) -> Dict[str, Dict]:
+        """Nearest distance and average rating per category in one pass over the places"""
+        summary = {}
+
+        for place in places:
+            location = place.get('location') or {}
+            distance = haversine_meters(lat, lon, location.get('lat', 0), location.get('lng', 0))
+            if distance > radius:
+                continue
+
+            categories = set()
+            for place_type in place.get('types', []):
+                categories.update(self.type_categories.get(place_type, []))
+
+            for category in categories:
+                stats = summary.setdefault(category, {'distance': distance, 'rating_sum': 0.0,
+                                                      'rating_count': 0, 'count': 0, 'radius': radius})
+                stats['distance'] = min(stats['distance'], distance)
+                stats['count'] += 1
+                if place.get('rating'):
+                    stats['rating_sum'] += place['rating']
+                    stats['rating_count'] += 1
+
+        for stats in summary.values():
+            stats['avg_rating'] = stats['rating_sum'] / stats['rating_count'] if stats['rating_count'] else None
+            del stats['rating_sum'], stats['rating_count']
+
+        return summary
+
+    def _search_local_plan(self, lat: float, lon: float):
+        """Search all categories within LOCAL_RADIUS, re-asking only for crowded-out ones"""
+        pending = list(AMENITY_CATEGORIES)
+        places = []
+
+        for _ in range(MAX_SEARCH_ROUNDS):
+            results = yield (self._types_for(pending), LOCAL_RADIUS)
+            if results is None:
+                return None if not places else places
+            places.extend(results)
+
+            # A page that is not full holds every matching place in the circle
+            if len(results) < MAX_RESULTS_PER_REQUEST:
+                break
+
+            found = self.summarize(lat, lon, places, LOCAL_RADIUS)
+            remaining = [c for c in pending if c not in found]
+            if not remaining or remaining == pending:
+                break
+            pending = remaining
+
+        return places
+
+    def _types_for(self, categories: List[str]) -> List[str]:
+        place_types = []
+        for category in categories:
+            for place_type in AMENITY_CATEGORIES[category]:
+                if place_type not in place_types:
+                    place_types.append(place_type)
+        return place_types
+
+    def _search(self, lat: float, lon: float, place_types: List[str], radius: int) -> Optional[List[Dict]]:
+        """Nearby search shared with recent overlapping circles and the grid cache"""
+        types_key = ','.join(sorted(place_types))
+
+        shared = self._find_overlapping_search(lat, lon, types_key, radius)
+        if shared is not None:
+            return shared
+
+        places = cached_enrichment_lookup(
+            lat, lon, 'google_places',
+            lambda: self._fetch(lat, lon, place_types, radius),
+            params={'types': types_key, 'radius': radius}
+        )
+        self._remember_search(lat, lon, types_key, radius, places)
+        return places
+
+    async def _search_async(self, lat: float, lon: float, place_types: List[str], radius: int,
+                            client) -> Optional[List[Dict]]:
+        types_key = ','.join(sorted(place_types))
+
+        shared = self._find_overlapping_search(lat, lon, types_key, radius)
+        if shared is not None:
+            return shared
+
+        places = await cached_enrichment_lookup_async(
+            lat, lon, 'google_places',
+            lambda: self._fetch_async(lat, lon, place_types, radius, client),
+            params={'types': types_key, 'radius': radius}
+        )
+        self._remember_search(lat, lon, types_key, radius, places)
+        return places
+
+    def _remember_search(self, lat: float, lon: float, types_key: str, radius: int, places: Optional[List[Dict]]):
+        if places is not None:
+            self.recent_searches.add(lat, lon, types_key, radius, places)
+
+    def _find_overlapping_search(self, lat: float, lon: float, types_key: str, radius: int) -> Optional[List[Dict]]:
+        """Reuse a recent search whose centre lies within the allowed offset"""
+        max_offset = self.share_max_offset * radius / LOCAL_RADIUS
+        places = self.recent_searches.find(lat, lon, types_key, radius, max_offset)
+        if places is not None:
+            logger.debug(f"Reusing overlapping amenity search for {lat},{lon}")
+        return places
+
+    def _fetch(self, lat: float, lon: float, place_types: List[str], radius: int) -> Optional[List[Dict]]:
+        """Call Places searchNearby once for several place types (None on failure)"""
+        try:
+            response = get_http_client().post(PLACES_NEARBY_URL, json=self._request_body(lat, lon, place_types, radius),
+                                              headers=self._request_headers(), timeout=15, provider='google_places')
+            return self._parse_response(response)
+
+        except Exception as e:
+            logger.error(f"Failed to search nearby places: {str(e)}")
+            return None
+
+    async def _fetch_async(self, lat: float, lon: float, place_types: List[str], radius: int,
+                           client) -> Optional[List[Dict]]:
+        try:
+            response = await client.post(PLACES_NEARBY_URL, json=self._request_body(lat, lon, place_types, radius),
+                                         headers=self._request_headers(), timeout=15, provider='google_places')
+            return self._parse_response(response)
+
+        except Exception as e:
+            logger.error(f"Failed to search nearby places: {str(e)}")
+            return None
+
+    def _request_body(self, lat: float, lon: float, place_types: List[str], radius: int) -> Dict:
+        return {
+            'includedTypes': place_types,
+            'maxResultCount': MAX_RESULTS_PER_REQUEST,
+            'rankPreference': 'DISTANCE',
+            'locationRestriction': {
+                'circle': {
+                    'center': {'latitude': lat, 'longitude': lon},
+                    'radius': float(radius)
+                }
+            }
+        }
+
+    def _request_headers(self) -> Dict[str, str]:
+        return {
+            'X-Goog-Api-Key': self.api_key,
+            'X-Goog-FieldMask': PLACES_FIELD_MASK
+        }
+
+    def _parse_response(self, response) -> Optional[List[Dict]]:
+        """Places from a searchNearby response (works for requests and httpx responses)"""
+        if response.status_code != 200:
+            logger.warning(f"Places nearby search failed with status {response.status_code}")
+            return None
+
+        return [
+            {
+                'name': place.get('displayName', {}).get('text'),
+                'rating': place.get('rating'),
+                'place_id': place.get('id'),
+                'types': place.get('types', []),
+                'location': {
+                    'lat': place.get('location', {}).get('latitude'),
+                    'lng': place.get('location', {}).get('longitude')
+                }
+            }
+            for place in response.json().get('places', [])
+        ]
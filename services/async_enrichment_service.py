@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from services.enrichment_service import EnrichmentService, OSM_AMENITY_RADIUS, OSM_AMENITY_TYPES, DISTANCE_MATRIX_URL
+from utils.cache import cached_enrichment_lookup_async
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEnrichmentService(EnrichmentService):
+    """asyncio enrichment engine for bulk ingestion
+
+    Many lands are enriched at once on a single event loop. Every external
+    lookup is a coroutine sent through one AsyncHttpClient, which caps the
+    requests in flight across all lands. Planning, merging, scoring and the
+    single commit per land reuse EnrichmentService, and they run between
+    awaits so the shared session never holds a half-enriched land.
+    """
+
+    def __init__(self, max_lands: Optional[int] = None, max_in_flight: Optional[int] = None):
+        from config import Config
+
+        super().__init__(max_workers=1)
+        self.max_lands = max_lands or Config.ASYNC_ENRICHMENT_MAX_LANDS
+        self.max_in_flight = max_in_flight or Config.ASYNC_ENRICHMENT_MAX_IN_FLIGHT
+        self.client = None
+
+    def enrich_lands(self, land_ids: Iterable[int], force: bool = False,
+                     on_result: Optional[Callable[[int, bool], None]] = None) -> Dict[int, bool]:
+        """Enrich many lands concurrently (call inside an app context); returns success per land id"""
+        land_ids = list(land_ids)
+        self.prefetch_lands(land_ids, force=force)
+        return asyncio.run(self._enrich_lands(land_ids, force, on_result))
+
+    async def _enrich_lands(self, land_ids: List[int], force: bool,
+                            on_result: Optional[Callable[[int, bool], None]]) -> Dict[int, bool]:
+        from utils.http_client import AsyncHttpClient
+
+        land_slots = asyncio.Semaphore(self.max_lands)
+        results = {}
+        started = time.monotonic()
+
+        async def enrich_one(land_id):
+            async with land_slots:
+                results[land_id] = await self._enrich_land_async(land_id, force)
+            if on_result:
+                on_result(land_id, results[land_id])
+
+        async with AsyncHttpClient(max_in_flight=self.max_in_flight) as client:
+            self.client = client
+            try:
+                await asyncio.gather(*(enrich_one(land_id) for land_id in land_ids))
+            finally:
+                self.client = None
+
+        logger.info(f"Async enrichment of {len(land_ids)} lands finished in {time.monotonic() - started:.1f}s: "
+                    f"{sum(results.values())} enriched")
+        return results
+
+    async def _enrich_land_async(self, land_id: int, force: bool = False) -> bool:
+        """enrich_land() for the event loop: stages are awaited, persistence is unchanged"""
+        from app import db
+        from models import Land
+
+        try:
+            land = Land.query.get(land_id)
+            if not land:
+                logger.error(f"Land with ID {land_id} not found")
+                return False
+
+            # Geocoding still goes through the blocking client
+            location = self._locate_land(land)
+            if not location:
+                logger.warning(f"Could not geocode land {land_id}, skipping enrichment")
+                db.session.commit()
+                return False
+
+            # Plan and run against a detached copy: other lands commit while this one awaits
+            source = self._snapshot_land(land)
+            source.location_lat, source.location_lon = location['lat'], location['lng']
+            step_records = self._step_records(land)
+            stages, fingerprints = self._plan_enrichment_stages(source, step_records, force)
+            stage_results = await self._run_enrichment_stages_async(source, stages)
+
+            # No awaits from here to the commit
+            land = Land.query.get(land_id)
+            self._apply_location(land, location)
+            self._complete_enrichment(land, stage_results, fingerprints, step_records, force)
+            db.session.commit()
+            logger.info(f"Successfully enriched land {land_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to enrich land {land_id}: {str(e)}")
+            db.session.rollback()
+            return False
+
+    def _async_stages(self) -> Dict[str, Callable]:
+        return {
+            'google_places': self._enrich_with_google_places_async,
+            'google_maps': self._enrich_with_google_maps_async,
+            'osm': self._enrich_with_osm_data_async,
+            'environment': self._analyze_environment_async,
+            'travel_times': self._compute_travel_times_async,
+        }
+
+    async def _run_enrichment_stages_async(self, land, stages: List[Tuple[str, Callable]]) -> List[Tuple[str, SimpleNamespace]]:
+        """Await the async version of each planned stage, each on its own snapshot"""
+        async_stages = self._async_stages()
+        snapshots = [self._snapshot_land(land) for _ in stages]
+        await asyncio.gather(*(
+            self._run_stage_async(name, async_stages[name], snapshot)
+            for (name, _), snapshot in zip(stages, snapshots)
+        ))
+        return [(name, snapshot) for (name, _), snapshot in zip(stages, snapshots)]
+
+    async def _run_stage_async(self, name: str, func: Callable, snapshot: SimpleNamespace):
+        started = time.monotonic()
+        try:
+            await func(snapshot)
+        except Exception as e:
+            snapshot.degraded = True
+            logger.error(f"Enrichment stage '{name}' failed for land {snapshot.id}: {str(e)}")
+        finally:
+            logger.debug(f"Enrichment stage '{name}' for land {snapshot.id} took {time.monotonic() - started:.2f}s")
+
+    async def _enrich_with_google_places_async(self, land):
+        try:
+            if not self.google_places_key:
+                logger.warning("Google Places API key not available")
+                return
+
+            from services.amenity_lookup import AmenityLookupService
+            amenities = await AmenityLookupService(self.google_places_key, self.amenity_searches).lookup_async(
+                float(land.location_lat), float(land.location_lon), self.client)
+            if amenities is None:
+                raise RuntimeError("Places nearby search unavailable")
+            self._apply_amenities(land, amenities)
+
+        except Exception as e:
+            logger.error(f"Failed to enrich with Google Places: {str(e)}")
+            land.degraded = True
+            self._create_fallback_amenities_data(land)
+
+    async def _enrich_with_google_maps_async(self, land):
+        try:
+            if not self.google_maps_key:
+                logger.warning("Google Maps API key not available")
+                return
+
+            lat, lon = float(land.location_lat), float(land.location_lon)
+            destinations = self._major_destinations(land)
+            results = await asyncio.gather(*(
+                self._get_distance_matrix_async(lat, lon, destination) for destination in destinations
+            ))
+            self._apply_major_destinations(land, destinations, results)
+
+        except Exception as e:
+            logger.error(f"Failed to enrich with Google Maps: {str(e)}")
+
+    async def _get_distance_matrix_async(self, lat: float, lon: float, destination: str) -> Optional[Dict]:
+        async def fetch():
+            try:
+                response = await self.client.get(DISTANCE_MATRIX_URL,
+                                                 params=self._distance_matrix_params(lat, lon, destination),
+                                                 timeout=15, provider='google_distance_matrix')
+                return self._parse_distance_matrix(response)
+            except Exception as e:
+                logger.error(f"Failed to get distance matrix: {str(e)}")
+                return None
+
+        return await cached_enrichment_lookup_async(
+            lat, lon, 'distance_matrix', fetch,
+            params={'destination': destination, 'mode': 'driving'}
+        )
+
+    async def _enrich_with_osm_data_async(self, land):
+        try:
+            from config import Config
+            from services.osm_poi_index import get_poi_index
+
+            lat, lon = float(land.location_lat), float(land.location_lon)
+
+            poi_index = get_poi_index()
+            if poi_index is not None:
+                amenity_counts = poi_index.count_by_category(lat, lon, OSM_AMENITY_RADIUS, OSM_AMENITY_TYPES)
+            elif (lat, lon) in self._osm_prefetched:
+                amenity_counts = self._osm_prefetched[(lat, lon)]
+            elif Config.OSM_OVERPASS_FALLBACK:
+                async def fetch():
+                    response = await self.client.post(
+                        self.osm_overpass_url,
+                        data=self._overpass_query(lat, lon),
+                        headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                        timeout=10,
+                        provider='overpass'
+                    )
+                    return self._parse_osm_amenity_counts(response)
+
+                amenity_counts = await cached_enrichment_lookup_async(
+                    lat, lon, 'overpass', fetch, params={'radius': OSM_AMENITY_RADIUS}
+                )
+            else:
+                return
+
+            self._apply_osm_amenity_counts(land, amenity_counts)
+
+        except Exception as e:
+            logger.error(f"Failed to enrich with OSM data: {str(e)}")
+
+    async def _analyze_environment_async(self, land):
+        # Text analysis only, no I/O
+        self._analyze_environment(land)
+
+    async def _compute_travel_times_async(self, land):
+        land.travel_times = await self.travel_service.compute_travel_times_async(
+            float(land.location_lat), float(land.location_lon), self.client)
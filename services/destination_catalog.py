@@ -0,0 +1,131 @@
+"""Destinations travel times are computed to, loaded from a JSON catalog
+
+Config.DESTINATION_CATALOG_PATH holds {"destinations": [...]} entries with a
+name (also what Google geocodes), category ('city', 'beach', 'airport',
+'train_station', 'hospital', 'police'), lat, lon and optionally a key
+('oviedo') for the destinations with their own Land column and a short_name
+stored on lands. Each category gets its own in-memory KD-tree, so nearest
+queries stay well under a millisecond with thousands of entries.
+
+Entries keep the catalog's order; among equally fast facilities the first
+one listed wins.
+"""
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from utils.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+_catalog = None
+_catalog_mtime = None
+_catalog_lock = threading.Lock()
+
+
+class DestinationCatalog:
+    """Named destinations by category with k-nearest queries"""
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = {}
+        self.keys = {}
+        self._names = {}
+        self._positions = {}
+        for entry in entries:
+            name, category = entry.get('name'), entry.get('category')
+            if not name or not category or entry.get('lat') is None or entry.get('lon') is None:
+                raise ValueError(f"Destination catalog entry needs name, category, lat and lon: {entry}")
+            if name in self.entries:
+                raise ValueError(f"Duplicate destination in catalog: {name}")
+            self.entries[name] = dict(entry, lat=float(entry['lat']), lon=float(entry['lon']))
+            self._positions[name] = len(self._positions)
+            self._names.setdefault(category, []).append(name)
+            if entry.get('key'):
+                self.keys[entry['key']] = name
+
+        self._indexes = {
+            category: SpatialIndex.from_points(
+                [(self.entries[name]['lat'], self.entries[name]['lon'], category) for name in names], names=names
+            )
+            for category, names in self._names.items()
+        }
+        # Shared by every TravelTimeService, so read-only
+        self._names = {category: tuple(names) for category, names in self._names.items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._names)
+
+    def names(self, category: str) -> Tuple[str, ...]:
+        """Destination names of a category, in catalog order"""
+        return self._names.get(category, ())
+
+    def coordinates(self, name: str) -> Optional[Tuple[float, float]]:
+        entry = self.entries.get(name)
+        return (entry['lat'], entry['lon']) if entry else None
+
+    def short_name(self, name: str) -> Optional[str]:
+        entry = self.entries.get(name)
+        return entry.get('short_name') if entry else None
+
+    def nearest(self, lat: float, lon: float, category: str, k: int = 1) -> List[Tuple[str, float]]:
+        """(name, great-circle meters) of the k destinations of a category closest to a point, closest first"""
+        index = self._indexes.get(category)
+        if index is None:
+            return []
+        return [(index.names[position], meters) for position, meters in index.nearest(lat, lon, k)]
+
+    def in_catalog_order(self, names) -> List[str]:
+        """Catalog names sorted into catalog order"""
+        return sorted(names, key=self._positions.__getitem__)
+
+
+def load_destination_catalog(path: str) -> DestinationCatalog:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return DestinationCatalog(data.get('destinations', []))
+
+
+def destination_catalog_version() -> Optional[float]:
+    """Modification time of the destination catalog file (None if missing)"""
+    from config import Config
+
+    try:
+        return os.path.getmtime(Config.DESTINATION_CATALOG_PATH)
+    except OSError:
+        return None
+
+
+def get_destination_catalog() -> DestinationCatalog:
+    """Process-wide destination catalog, reloaded when the file changes
+
+    A file that fails to load keeps the previous catalog in use.
+    """
+    global _catalog, _catalog_mtime
+    from config import Config
+
+    path = Config.DESTINATION_CATALOG_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        raise RuntimeError(f"Destination catalog {path} not found")
+
+    if _catalog is None or _catalog_mtime != (path, mtime):
+        with _catalog_lock:
+            if _catalog is None or _catalog_mtime != (path, mtime):
+                try:
+                    catalog = load_destination_catalog(path)
+                except Exception as e:
+                    if _catalog is None:
+                        raise
+                    # Keep serving the previous catalog until the file is fixed
+                    logger.error(f"Failed to reload destination catalog {path}: {str(e)}")
+                    return _catalog
+                _catalog = catalog
+                _catalog_mtime = (path, mtime)
+                logger.info(f"Loaded {len(_catalog)} destinations from {path}")
+    return _catalog
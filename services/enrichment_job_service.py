@@ -0,0 +1,199 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Job threads running in this process, by job id
+_running_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def lands_needing_enrichment_filter():
+    """SQLAlchemy filter for lands missing extended infrastructure or environment data"""
+    from models import Land
+
+    return (
+        (Land.infrastructure_extended.is_(None)) |
+        (Land.environment.is_(None)) |
+        (Land.transport.is_(None)) |
+        (Land.services_quality.is_(None)) |
+        (Land.infrastructure_extended == {}) |
+        (Land.environment == {}) |
+        (Land.transport == {}) |
+        (Land.services_quality == {})
+    )
+
+
+def is_job_stale(job) -> bool:
+    """A running job whose heartbeat stopped (worker crashed or was recycled)"""
+    from config import Config
+
+    if job.status != 'running':
+        return False
+    with _jobs_lock:
+        if job.id in _running_jobs:
+            return False
+    last_seen = job.heartbeat_at or job.run_started_at or job.created_at
+    return last_seen is None or datetime.utcnow() - last_seen > timedelta(seconds=Config.ENRICHMENT_JOB_STALE_SECONDS)
+
+
+def get_active_job():
+    """Most recent bulk enrichment job that is still pending or running"""
+    from models import EnrichmentJob
+
+    job = EnrichmentJob.query.filter(
+        EnrichmentJob.status.in_(['pending', 'running'])
+    ).order_by(EnrichmentJob.id.desc()).first()
+
+    if job and is_job_stale(job):
+        return None
+    return job
+
+
+def start_bulk_enrichment_job(chunk_size: Optional[int] = None):
+    """Create a bulk enrichment job and start it in the background
+
+    Returns the already active job instead if one is running.
+    """
+    from models import Land, EnrichmentJob
+    from app import db
+    from config import Config
+
+    active_job = get_active_job()
+    if active_job:
+        logger.info(f"Bulk enrichment job {active_job.id} is already {active_job.status}")
+        return active_job
+
+    job = EnrichmentJob(
+        status='pending',
+        chunk_size=chunk_size or Config.ENRICHMENT_JOB_CHUNK_SIZE,
+        total_count=Land.query.filter(lands_needing_enrichment_filter()).count(),
+        last_land_id=0
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    logger.info(f"Created bulk enrichment job {job.id} for {job.total_count} lands")
+    _launch_job(job.id)
+    return job
+
+
+def resume_enrichment_job(job_id: int):
+    """Restart an interrupted or failed job from its last checkpoint"""
+    from models import EnrichmentJob
+    from app import db
+
+    job = EnrichmentJob.query.get(job_id)
+    if not job:
+        raise ValueError(f"Enrichment job {job_id} not found")
+    if job.status == 'completed':
+        raise ValueError(f"Enrichment job {job_id} is already completed")
+    if job.status in ('pending', 'running') and not is_job_stale(job):
+        raise ValueError(f"Enrichment job {job_id} is still running")
+
+    logger.info(f"Resuming enrichment job {job_id} after land {job.last_land_id}")
+    job.status = 'pending'
+    job.error_message = None
+    db.session.commit()
+
+    _launch_job(job.id)
+    return job
+
+
+def _launch_job(job_id: int):
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    thread = threading.Thread(target=_run_job, args=(app, job_id),
+                              name=f'enrichment-job-{job_id}', daemon=True)
+    with _jobs_lock:
+        _running_jobs[job_id] = thread
+    thread.start()
+
+
+def _run_job(app, job_id: int):
+    """Enrich matching lands in id order, checkpointing after every land
+
+    Counters are kept locally and written with each checkpoint: the rollback
+    after a failed land discards uncommitted changes to the job row too.
+    """
+    with app.app_context():
+        from models import Land, EnrichmentJob
+        from app import db
+        from services.enrichment_service import EnrichmentService
+
+        job = EnrichmentJob.query.get(job_id)
+        try:
+            job.status = 'running'
+            job.run_started_at = datetime.utcnow()
+            job.run_start_processed = job.processed_count or 0
+            job.heartbeat_at = job.run_started_at
+            db.session.commit()
+
+            enrichment_service = EnrichmentService()
+            counts = {
+                'processed_count': job.processed_count or 0,
+                'success_count': job.success_count or 0,
+                'error_count': job.error_count or 0,
+            }
+
+            while True:
+                land_ids = [row.id for row in db.session.query(Land.id).filter(
+                    lands_needing_enrichment_filter(),
+                    Land.id > job.last_land_id
+                ).order_by(Land.id).limit(job.chunk_size)]
+
+                if not land_ids:
+                    break
+
+                enrichment_service.prefetch_lands(land_ids)
+                _checkpoint_job(job, job.last_land_id, counts)
+                for land_id in land_ids:
+                    try:
+                        enriched = enrichment_service.enrich_land(land_id)
+                    except Exception as e:
+                        logger.error(f"Failed to enrich land {land_id}: {str(e)}")
+                        enriched = False
+                    if not enriched:
+                        db.session.rollback()
+
+                    counts['processed_count'] += 1
+                    counts['success_count' if enriched else 'error_count'] += 1
+
+                    # Checkpoint: a restart continues after this land, and the
+                    # heartbeat stays fresh however slow the chunk is
+                    _checkpoint_job(job, land_id, counts)
+
+                logger.info(f"Enrichment job {job_id}: {job.processed_count}/{job.total_count} processed")
+
+            job.status = 'completed'
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+            logger.info(f"Enrichment job {job_id} completed: {job.success_count} enriched, {job.error_count} failed")
+
+        except Exception as e:
+            logger.error(f"Enrichment job {job_id} failed: {str(e)}")
+            db.session.rollback()
+            job = EnrichmentJob.query.get(job_id)
+            if job:
+                job.status = 'failed'
+                job.error_message = str(e)
+                db.session.commit()
+
+        finally:
+            with _jobs_lock:
+                _running_jobs.pop(job_id, None)
+            db.session.remove()
+
+
+def _checkpoint_job(job, last_land_id: int, counts: dict):
+    """Commit the job's progress and heartbeat"""
+    from app import db
+
+    job.last_land_id = last_land_id
+    for field, value in counts.items():
+        setattr(job, field, value)
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
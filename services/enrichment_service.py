@@ -1,27 +1,95 @@
 import os
 import re
+import json
+import math
+import hashlib
 import logging
-import requests
 import time
-from typing import Dict, List, Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+from services.amenity_lookup import RecentSearches
+from utils.coordinate_index import CoordinateIndex
 from utils.geocoding import GeocodingService
-from utils.cache import cache_enrichment_data, get_cached_enrichment_data
+from utils.cache import cached_enrichment_lookup
+from utils.circuit_breaker import report_provider_status
+from utils.http_client import get_http_client
+from utils.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# JSONB fields written by the enrichment stages
+ENRICHMENT_JSONB_FIELDS = ('infrastructure_extended', 'transport', 'services_quality', 'environment')
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# OSM amenity types counted around each land, and the search radius in meters
+OSM_AMENITY_TYPES = ('supermarket', 'school', 'hospital', 'restaurant', 'cafe', 'fuel')
+OSM_AMENITY_RADIUS = 2000
+
+# View keywords (Spanish + English + known coastal/mountain areas) matched in title, description and municipality
+VIEW_KEYWORDS = KeywordMatcher({
+    'sea_view': ['mar', 'playa', 'costa', 'litoral', 'vista al mar', 'sea', 'beach', 'coast', 'coastal', 'ocean', 'bay', 'shore', 'cudillero', 'santander', 'gijon', 'llanes', 'comillas', 'ribadesella'],
+    'mountain_view': ['montaña', 'sierra', 'monte', 'vista montaña', 'mountain', 'hill', 'valley', 'peak', 'cordillera', 'picos de europa', 'cantabrica'],
+    'forest_view': ['bosque', 'forestal', 'pinar', 'verde', 'forest', 'wood', 'trees', 'natural', 'rural', 'countryside'],
+})
+
+# Orientation from the description; the first listed orientation found wins
+ORIENTATION_KEYWORDS = KeywordMatcher({
+    'north': ['norte'], 'south': ['sur'], 'east': ['este'], 'west': ['oeste'],
+    'northeast': ['noreste'], 'northwest': ['noroeste'],
+    'southeast': ['sureste'], 'southwest': ['suroeste'],
+})
+
+# Bump a step's version when its logic changes so stored results are recomputed
+ENRICHMENT_STEP_VERSIONS = {
+    'google_places': 1,
+    'google_maps': 1,
+    'osm': 1,
+    'environment': 1,
+    'travel_times': 2,
+    'scoring': 1,
+}
+
+# Key in land.environment holding each step's input fingerprint and version
+ENRICHMENT_STEPS_KEY = 'enrichment_steps'
+
 class EnrichmentService:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
+        from config import Config
+        from services.travel_time_service import TravelTimeService
+        
         # Use existing secret names with fallback to standard names
         self.google_maps_key = os.environ.get("Google_api") or os.environ.get("GOOGLE_MAPS_API") or os.environ.get("GOOGLE_MAPS_API_KEY")
         self.google_places_key = os.environ.get("Google_api") or os.environ.get("GOOGLE_MAPS_API") or os.environ.get("GOOGLE_PLACES_API_KEY")
         self.osm_overpass_url = "https://overpass-api.de/api/interpreter"
         self.geocoding_service = GeocodingService()
+        # Stages run concurrently when more than one worker is allowed
+        self.max_workers = max_workers if max_workers is not None else Config.ENRICHMENT_MAX_WORKERS
+        # OSM amenity counts from batched bounding-box queries, keyed by (lat, lon)
+        self._osm_prefetched = {}
+        # Locations of lands without coordinates geocoded by prefetch_geocodes, keyed by land id
+        self._geocode_prefetched = {}
+        # Located lands for duplicate-coordinate checks of the current batch (see geocode_lands)
+        self._coordinate_index = None
+        # Places searches shared by lands of the current batch, cleared by prefetch_lands
+        self.amenity_searches = RecentSearches()
+        # Shared so travel times prefetched for a batch are used by each land
+        self.travel_service = TravelTimeService()
+        
+    def enrich_land(self, land_id: int, force: bool = False) -> bool:
+        """Main method to enrich a land record with external data
+        
+        The loaded Land is passed through every step and committed once at the
+        end, so readers never see a half-enriched row. Steps whose inputs and
+        version match the fingerprint stored by the last run are skipped unless
+        force is set.
+        """
+        from app import db
         
-    def enrich_land(self, land_id: int) -> bool:
-        """Main method to enrich a land record with external data"""
         try:
             from models import Land
-            from app import db
             
             land = Land.query.get(land_id)
             if not land:
@@ -31,49 +99,249 @@ class EnrichmentService:
             logger.info(f"Starting enrichment for land {land_id}: {land.title}")
             
             # Step 1: Geocode the location if coordinates are missing
-            if not land.location_lat or not land.location_lon:
-                coordinates_info = self._geocode_with_accuracy(land)
-                if coordinates_info:
-                    land.location_lat = coordinates_info['lat']
-                    land.location_lon = coordinates_info['lng']
-                    land.location_accuracy = coordinates_info['accuracy']
-                    db.session.commit()
-                    logger.info(f"Geocoded land {land_id}: {coordinates_info}")
-            
-            if not land.location_lat or not land.location_lon:
+            location = self._locate_land(land)
+            if not location:
                 logger.warning(f"Could not geocode land {land_id}, skipping enrichment")
+                # Keep a municipality re-extracted from the title for the next attempt
+                db.session.commit()
                 return False
+            self._apply_location(land, location)
             
-            # Step 2: Enrich with Google Places data
-            self._enrich_with_google_places(land)
-            
-            # Step 3: Enrich with Google Maps data (distances, travel times)
-            self._enrich_with_google_maps(land)
-            
-            # Step 4: Enrich with OSM data (fallback and additional POIs)
-            self._enrich_with_osm_data(land)
-            
-            # Step 5: Analyze environment (views, orientation)
-            self._analyze_environment(land)
+            # Steps 2-6: Places, Maps, OSM, environment and travel times are
+            # independent, so they run on a bounded pool and are merged once
+            step_records = self._step_records(land)
+            stages, fingerprints = self._plan_enrichment_stages(land, step_records, force)
+            stage_results = self._run_enrichment_stages(land, stages)
             
-            # Step 6: Calculate travel times
-            from services.travel_time_service import TravelTimeService
-            travel_service = TravelTimeService()
-            travel_service.calculate_travel_times(land_id)
+            # Step 7: Merge results and calculate final score
+            self._complete_enrichment(land, stage_results, fingerprints, step_records, force)
             
+            db.session.commit()
+            logger.info(f"Successfully enriched land {land_id}")
+            return True
             
-            # Step 7: Calculate final score
+        except Exception as e:
+            logger.error(f"Failed to enrich land {land_id}: {str(e)}")
+            db.session.rollback()
+            return False
+    
+    def _locate_land(self, land) -> Optional[Dict]:
+        """Stored coordinates, or freshly geocoded ones (not yet applied to the land)"""
+        if land.location_lat and land.location_lon:
+            return {'lat': land.location_lat, 'lng': land.location_lon, 'accuracy': land.location_accuracy}
+        
+        coordinates_info = self._geocode_prefetched.pop(land.id, None) or self._geocode_with_accuracy(land)
+        if coordinates_info:
+            logger.info(f"Geocoded land {land.id}: {coordinates_info}")
+        return coordinates_info
+    
+    def _apply_location(self, land, location: Dict):
+        land.location_lat = location['lat']
+        land.location_lon = location['lng']
+        land.location_accuracy = location['accuracy']
+    
+    def _step_records(self, land) -> Dict:
+        """Fingerprint records stored by previous enrichment runs"""
+        return dict((land.environment or {}).get(ENRICHMENT_STEPS_KEY) or {})
+    
+    def _plan_enrichment_stages(self, land, step_records: Dict, force: bool = False) -> Tuple[List[Tuple[str, Callable]], Dict[str, str]]:
+        """Stages whose inputs changed since the last run, and every stage's fingerprint"""
+        stages = []
+        fingerprints = {}
+        for name, func in self._enrichment_stages():
+            fingerprints[name] = self._step_fingerprint(name, land)
+            if force or not self._step_is_current(step_records, name, fingerprints[name]):
+                stages.append((name, func))
+        
+        skipped = [name for name in fingerprints if name not in dict(stages)]
+        if skipped:
+            logger.info(f"Skipping unchanged enrichment steps for land {land.id}: {', '.join(skipped)}")
+        return stages, fingerprints
+    
+    def _complete_enrichment(self, land, stage_results: List[Tuple[str, SimpleNamespace]],
+                             fingerprints: Dict[str, str], step_records: Dict, force: bool = False):
+        """Merge stage results, rescore if needed and store the step fingerprints (no commit)"""
+        self._merge_stage_results(land, stage_results)
+        
+        for name, snapshot in stage_results:
+            if self._stage_succeeded(snapshot):
+                step_records[name] = self._step_record(name, fingerprints[name])
+            else:
+                step_records.pop(name, None)
+        
+        scoring_fingerprint = self._step_fingerprint('scoring', land)
+        if force or not self._step_is_current(step_records, 'scoring', scoring_fingerprint):
             from services.scoring_service import ScoringService
             scoring_service = ScoringService()
             scoring_service.calculate_score(land)
+            step_records['scoring'] = self._step_record('scoring', scoring_fingerprint)
+        
+        environment = dict(land.environment or {})
+        environment[ENRICHMENT_STEPS_KEY] = step_records
+        land.environment = environment
+    
+    def _enrichment_stages(self) -> List[Tuple[str, Callable]]:
+        """Independent I/O stages in the order their results are merged"""
+        return [
+            ('google_places', self._enrich_with_google_places),
+            ('google_maps', self._enrich_with_google_maps),
+            ('osm', self._enrich_with_osm_data),
+            ('environment', self._analyze_environment),
+            ('travel_times', self._compute_travel_times),
+        ]
+    
+    def _run_enrichment_stages(self, land, stages: Optional[List[Tuple[str, Callable]]] = None) -> List[Tuple[str, SimpleNamespace]]:
+        """Run enrichment stages (all by default) against detached copies of the land
+        
+        Each stage works on a snapshot with empty JSONB fields, so whatever it
+        writes is exactly its contribution. Stages never touch the SQLAlchemy
+        session, which keeps them safe to run from worker threads.
+        """
+        if stages is None:
+            stages = self._enrichment_stages()
+        if not stages:
+            return []
+        snapshots = [self._snapshot_land(land) for _ in stages]
+        started = time.monotonic()
+        
+        if self.max_workers and self.max_workers > 1:
+            from flask import current_app
+            app = current_app._get_current_object()
             
-            db.session.commit()
-            logger.info(f"Successfully enriched land {land_id}")
-            return True
+            def run_in_context(stage, snapshot):
+                with app.app_context():
+                    self._run_stage(stage[0], stage[1], snapshot)
             
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stages)),
+                                    thread_name_prefix='enrichment') as executor:
+                futures = [executor.submit(run_in_context, stage, snapshot)
+                           for stage, snapshot in zip(stages, snapshots)]
+                for future in futures:
+                    future.result()
+        else:
+            for (name, func), snapshot in zip(stages, snapshots):
+                self._run_stage(name, func, snapshot)
+        
+        logger.info(f"Enrichment stages for land {land.id} finished in {time.monotonic() - started:.2f}s "
+                    f"({'concurrent' if self.max_workers and self.max_workers > 1 else 'sequential'})")
+        return [(name, snapshot) for (name, _), snapshot in zip(stages, snapshots)]
+    
+    def _run_stage(self, name: str, func: Callable, snapshot: SimpleNamespace):
+        """Run a single stage, logging its duration and swallowing failures"""
+        started = time.monotonic()
+        try:
+            func(snapshot)
         except Exception as e:
-            logger.error(f"Failed to enrich land {land_id}: {str(e)}")
+            snapshot.degraded = True
+            logger.error(f"Enrichment stage '{name}' failed for land {snapshot.id}: {str(e)}")
+        finally:
+            logger.debug(f"Enrichment stage '{name}' for land {snapshot.id} took {time.monotonic() - started:.2f}s")
+    
+    def _snapshot_land(self, land) -> SimpleNamespace:
+        """Copy the inputs the enrichment stages read into a plain object"""
+        snapshot = SimpleNamespace(
+            id=land.id,
+            title=land.title,
+            description=land.description,
+            municipality=land.municipality,
+            location_lat=land.location_lat,
+            location_lon=land.location_lon,
+            travel_times={},
+            degraded=False  # Set by a stage that fell back to estimated data
+        )
+        for field in ENRICHMENT_JSONB_FIELDS:
+            setattr(snapshot, field, {})
+        return snapshot
+    
+    def _merge_stage_results(self, land, stage_results: List[Tuple[str, SimpleNamespace]]):
+        """Merge stage outputs into the land's JSONB fields and travel time columns
+        
+        Results are applied in stage order, so a later stage overrides keys of an
+        earlier one exactly as the sequential pipeline did. New dict objects are
+        assigned so SQLAlchemy detects the JSONB changes.
+        """
+        merged = {field: dict(getattr(land, field) or {}) for field in ENRICHMENT_JSONB_FIELDS}
+        travel_times = {}
+        
+        for _, snapshot in stage_results:
+            for field in ENRICHMENT_JSONB_FIELDS:
+                merged[field].update(getattr(snapshot, field) or {})
+            travel_times.update(snapshot.travel_times)
+        
+        for field, value in merged.items():
+            setattr(land, field, value)
+        for column, value in travel_times.items():
+            setattr(land, column, value)
+    
+    def _step_inputs(self, name: str, land) -> Dict:
+        """Inputs an enrichment step depends on"""
+        location = [str(land.location_lat), str(land.location_lon)]
+        
+        if name == 'google_places':
+            return {'location': location, 'api_key': bool(self.google_places_key)}
+        if name == 'google_maps':
+            return {'location': location, 'municipality': land.municipality, 'api_key': bool(self.google_maps_key)}
+        if name == 'osm':
+            from services.osm_poi_index import poi_index_version
+            return {'location': location, 'poi_index': poi_index_version()}
+        if name == 'travel_times':
+            from services.destination_catalog import destination_catalog_version
+            from services.road_router import road_graph_version
+            from services.travel_time_grid import travel_time_grid_version
+            return {'location': location, 'destinations': destination_catalog_version(),
+                    'road_graph': road_graph_version(), 'travel_time_grid': travel_time_grid_version()}
+        if name == 'environment':
+            return {'location': location, 'title': land.title, 'description': land.description,
+                    'municipality': land.municipality}
+        if name == 'scoring':
+            from services.scoring.weight_manager import WeightManager
+            weight_manager = WeightManager()
+            environment = {k: v for k, v in (land.environment or {}).items()
+                           if k not in ('scoring', ENRICHMENT_STEPS_KEY)}
+            return {
+                'price': str(land.price), 'area': str(land.area),
+                'land_type': str(land.land_type), 'municipality': land.municipality,
+                'description': land.description,
+                'infrastructure_basic': land.infrastructure_basic,
+                'infrastructure_extended': land.infrastructure_extended,
+                'transport': land.transport,
+                'services_quality': land.services_quality,
+                'environment': environment,
+                'travel_times': [getattr(land, column, None) for column in (
+                    'travel_time_oviedo', 'travel_time_gijon', 'travel_time_nearest_beach',
+                    'travel_time_airport', 'travel_time_train_station',
+                    'travel_time_hospital', 'travel_time_police')],
+                'weights': {profile: weight_manager.load_profile_weights(profile)
+                            for profile in ('investment', 'lifestyle')}
+            }
+        raise ValueError(f"Unknown enrichment step: {name}")
+    
+    def _step_fingerprint(self, name: str, land) -> str:
+        """Stable hash of a step's inputs"""
+        payload = json.dumps(self._step_inputs(name, land), sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def _step_is_current(self, step_records: Dict, name: str, fingerprint: str) -> bool:
+        record = step_records.get(name) or {}
+        return (record.get('fingerprint') == fingerprint and
+                record.get('version') == ENRICHMENT_STEP_VERSIONS[name])
+    
+    def _step_record(self, name: str, fingerprint: str) -> Dict:
+        return {
+            'fingerprint': fingerprint,
+            'version': ENRICHMENT_STEP_VERSIONS[name],
+            'updated_at': datetime.utcnow().isoformat()
+        }
+    
+    def _stage_succeeded(self, snapshot: SimpleNamespace) -> bool:
+        """A stage counts as done when it produced real (not fallback) data"""
+        if snapshot.degraded:
             return False
+        return bool(snapshot.travel_times) or any(getattr(snapshot, field) for field in ENRICHMENT_JSONB_FIELDS)
+    
+    def _compute_travel_times(self, land):
+        """Compute travel times to key destinations (stored on land.travel_times)"""
+        land.travel_times = self.travel_service.compute_travel_times(float(land.location_lat), float(land.location_lon))
     
     def _extract_municipality_from_title(self, title: str) -> Optional[str]:
         """Extract municipality specifically from title like 'Land in camino Pinzalez, Porceyo - Cenero, Gijón'"""
@@ -152,25 +420,38 @@ class EnrichmentService:
         return False
     
     def _geocode_with_accuracy(self, land) -> Optional[Dict]:
-        """Geocode a land with accuracy determination"""
+        """Geocode a land with accuracy determination
+        
+        Every address variant is geocoded at once (see
+        GeocodingService.geocode_many); the most precise accepted one wins.
+        """
+        address_attempts = self._address_attempts(land)
+        if not address_attempts:
+            return None
+        
+        results = self.geocoding_service.geocode_many(attempt['address'] for attempt in address_attempts)
+        location = self._choose_location(land, address_attempts, results, self._is_duplicate_coordinates)
+        if location and self._coordinate_index is not None:
+            self._coordinate_index.add(land.id, location['lat'], location['lng'])
+        return location
+    
+    def _address_attempts(self, land) -> List[Dict]:
+        """Addresses to geocode a land from, most precise first, with their accuracy"""
         if not land.municipality:
             # Try to re-extract municipality from title if missing
             municipality = self._extract_municipality_from_title(land.title)
             if municipality:
                 logger.info(f"Re-extracted municipality from title for land {land.id}: '{municipality}'")
                 land.municipality = municipality
-                # Commit immediately so we have the municipality for geocoding
-                from app import db
-                db.session.commit()
             else:
                 logger.warning(f"No municipality found in title for land {land.id}: '{land.title}'")
-                return None
+                return []
             
         # Clean and validate municipality data first
         municipality = self._clean_municipality(land.municipality)
         if not municipality:
             logger.warning(f"Invalid municipality data for land {land.id}: '{land.municipality}'")
-            return None
+            return []
         
         # Normalize address format: replace " - " with ", " for better geocoding
         municipality = municipality.replace(" - ", ", ")
@@ -207,13 +488,18 @@ class EnrichmentService:
                 'accuracy': 'regional'
             })
         
+        return address_attempts
+    
+    def _choose_location(self, land, address_attempts: List[Dict], results: Dict[str, Optional[Dict]],
+                         is_duplicate: Callable[[float, float, int], bool]) -> Optional[Dict]:
+        """The first attempt with an accepted geocoding result, as {'lat', 'lng', 'accuracy'}"""
         for attempt in address_attempts:
-            coordinates = self.geocoding_service.geocode_address(attempt['address'])
+            coordinates = results.get(attempt['address'])
             if coordinates:
                 # Only check for duplicates on precise geocoding results
                 # Allow approximate/regional results even if they're duplicates
                 if attempt['accuracy'] == 'precise':
-                    if not self._is_duplicate_coordinates(coordinates['lat'], coordinates['lng'], land.id):
+                    if not is_duplicate(coordinates['lat'], coordinates['lng'], land.id):
                         logger.info(f"Successfully geocoded '{attempt['address']}' with {attempt['accuracy']} accuracy")
                         return {
                             'lat': coordinates['lat'],
@@ -261,24 +547,13 @@ class EnrichmentService:
         
         # Try to extract more specific location info
         if municipality:
-            # Look for known cities/towns in the municipality string
-            known_locations = {
-                'oviedo': 'Oviedo, Asturias, Spain',
-                'gijon': 'Gijón, Asturias, Spain', 
-                'santander': 'Santander, Cantabria, Spain',
-                'cudillero': 'Cudillero, Asturias, Spain',
-                'ribadedeva': 'Ribadedeva, Asturias, Spain',
-                'siero': 'Siero, Asturias, Spain',
-                'piloña': 'Piloña, Asturias, Spain',
-                'llanes': 'Llanes, Asturias, Spain',
-                'comillas': 'Comillas, Cantabria, Spain'
-            }
+            # The municipality the location mentions, from the offline gazetteer
+            from services.gazetteer import get_gazetteer
             
-            municipality_lower = municipality.lower()
-            for location, full_address in known_locations.items():
-                if location in municipality_lower:
-                    fallbacks.append(full_address)
-                    break
+            gazetteer = get_gazetteer()
+            municipality_address = gazetteer.municipality_address(municipality) if gazetteer else None
+            if municipality_address:
+                fallbacks.append(municipality_address)
         
         # Default regional fallbacks - more specific than just "Cantabria, Spain"
         if not fallbacks:
@@ -290,18 +565,27 @@ class EnrichmentService:
         return fallbacks
     
     def _is_duplicate_coordinates(self, lat: float, lng: float, current_land_id: int) -> bool:
-        """Check if these coordinates already exist for another property"""
+        """Check if another property lies within DUPLICATE_COORDINATE_TOLERANCE_METERS of these coordinates"""
+        if self._coordinate_index is not None:
+            return self._coordinate_index.has_other(lat, lng, current_land_id)
+        
         try:
+            from config import Config
             from models import Land
+            from utils.spatial_index import METERS_PER_DEGREE, haversine_meters
             
-            # Check if these exact coordinates exist for other properties
-            existing = Land.query.filter(
+            # Bounding box around the point (uses ix_location_coords), then great-circle distance
+            tolerance = Config.DUPLICATE_COORDINATE_TOLERANCE_METERS
+            lat_delta = tolerance / METERS_PER_DEGREE
+            lon_delta = lat_delta / max(math.cos(math.radians(float(lat))), 0.01)
+            nearby = Land.query.with_entities(Land.location_lat, Land.location_lon).filter(
                 Land.id != current_land_id,
-                Land.location_lat == lat,
-                Land.location_lon == lng
-            ).first()
+                Land.location_lat.between(lat - lat_delta, lat + lat_delta),
+                Land.location_lon.between(lng - lon_delta, lng + lon_delta)
+            ).all()
             
-            return existing is not None
+            return any(haversine_meters(lat, lng, float(other_lat), float(other_lon)) <= tolerance
+                       for other_lat, other_lon in nearby)
         except Exception as e:
             logger.warning(f"Could not check for duplicate coordinates: {e}")
             return False
@@ -315,116 +599,54 @@ class EnrichmentService:
             
             lat, lon = float(land.location_lat), float(land.location_lon)
             
-            # Search for nearby amenities
-            amenities = {
-                'supermarket': ['supermarket', 'grocery_or_supermarket'],
-                'school': ['school', 'primary_school', 'secondary_school'],
-                'hospital': ['hospital', 'doctor'],
-                'restaurant': ['restaurant'],
-                'cafe': ['cafe'],
-                'train_station': ['train_station', 'subway_station'],
-                'bus_station': ['bus_station'],
-                'airport': ['airport']
-            }
-            
-            infrastructure_extended = land.infrastructure_extended or {}
-            transport = land.transport or {}
-            services_quality = land.services_quality or {}
-            
-            for amenity, place_types in amenities.items():
-                nearby_places = self._search_nearby_places(lat, lon, place_types)
-                
-                if amenity in ['supermarket', 'school', 'hospital', 'restaurant', 'cafe']:
-                    # Calculate distance to nearest and average rating
-                    if nearby_places:
-                        nearest = min(nearby_places, key=lambda x: x.get('distance', float('inf')))
-                        distance_m = nearest.get('distance')
-                        if distance_m and distance_m > 0:
-                            infrastructure_extended[f'{amenity}_distance'] = distance_m
-                            # Calculate estimated travel time (assuming 40 km/h average speed in city)
-                            travel_time_min = max(1, round((distance_m / 1000) * 60 / 40))
-                            infrastructure_extended[f'{amenity}_travel_time'] = travel_time_min
-                        
-                        # Get average rating for services
-                        if amenity in ['school', 'restaurant', 'cafe']:
-                            ratings = [p.get('rating', 0) for p in nearby_places if p.get('rating')]
-                            if ratings:
-                                services_quality[f'{amenity}_avg_rating'] = sum(ratings) / len(ratings)
-                    # Note: No longer setting _available = false to avoid duplicates
-                
-                elif amenity in ['train_station', 'bus_station', 'airport']:
-                    # Calculate transport accessibility
-                    if nearby_places:
-                        nearest = min(nearby_places, key=lambda x: x.get('distance', float('inf')))
-                        distance_m = nearest.get('distance')
-                        if distance_m and distance_m > 0:
-                            transport[f'{amenity}_distance'] = distance_m
-                            # Use higher speed for transport hubs (50 km/h average)
-                            travel_time_min = max(1, round((distance_m / 1000) * 60 / 50))
-                            transport[f'{amenity}_travel_time'] = travel_time_min
-                    else:
-                        # For airports, check if there's one within 100km radius
-                        if amenity == 'airport':
-                            wider_places = self._search_nearby_places(lat, lon, place_types, radius=100000)
-                            if wider_places:
-                                nearest = min(wider_places, key=lambda x: x.get('distance', float('inf')))
-                                distance_m = nearest.get('distance')
-                                if distance_m and distance_m > 0:
-                                    transport[f'{amenity}_distance'] = distance_m
-                                    # Highway speed for long distance (80 km/h average)
-                                    travel_time_min = max(1, round((distance_m / 1000) * 60 / 80))
-                                    transport[f'{amenity}_travel_time'] = travel_time_min
-                    # Note: No longer setting _available fields to avoid duplicates
-            
-            land.infrastructure_extended = infrastructure_extended
-            land.transport = transport
-            land.services_quality = services_quality
+            # All amenity categories in one batched lookup
+            from services.amenity_lookup import AmenityLookupService
+            amenities = AmenityLookupService(self.google_places_key, self.amenity_searches).lookup(lat, lon)
+            if amenities is None:
+                raise RuntimeError("Places nearby search unavailable")
+            self._apply_amenities(land, amenities)
             
         except Exception as e:
             logger.error(f"Failed to enrich with Google Places: {str(e)}")
             # Create fallback enrichment data when Google APIs fail
+            land.degraded = True
             self._create_fallback_amenities_data(land)
     
-    def _search_nearby_places(self, lat: float, lon: float, place_types: List[str], radius: int = 5000) -> List[Dict]:
-        """Search for nearby places using Google Places API"""
-        try:
-            places = []
-            
-            for place_type in place_types:
-                url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-                params = {
-                    'location': f"{lat},{lon}",
-                    'radius': radius,
-                    'type': place_type,
-                    'key': self.google_places_key
-                }
-                
-                response = requests.get(url, params=params, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    for place in data.get('results', []):
-                        place_info = {
-                            'name': place.get('name'),
-                            'rating': place.get('rating'),
-                            'place_id': place.get('place_id'),
-                            'types': place.get('types', []),
-                            'location': place.get('geometry', {}).get('location', {}),
-                            'distance': self._calculate_distance(
-                                lat, lon,
-                                place.get('geometry', {}).get('location', {}).get('lat', 0),
-                                place.get('geometry', {}).get('location', {}).get('lng', 0)
-                            )
-                        }
-                        places.append(place_info)
-                
-                # Rate limiting
-                time.sleep(0.1)
+    def _apply_amenities(self, land, amenities: Dict[str, Dict]):
+        """Write amenity lookup results as distances, travel times and ratings"""
+        from services.amenity_lookup import LOCAL_RADIUS
+        
+        infrastructure_extended = land.infrastructure_extended or {}
+        transport = land.transport or {}
+        services_quality = land.services_quality or {}
+        
+        for amenity, stats in amenities.items():
+            distance_m = stats['distance']
             
-            return places
+            if amenity in ['supermarket', 'school', 'hospital', 'restaurant', 'cafe']:
+                if distance_m and distance_m > 0:
+                    infrastructure_extended[f'{amenity}_distance'] = distance_m
+                    # Calculate estimated travel time (assuming 40 km/h average speed in city)
+                    travel_time_min = max(1, round((distance_m / 1000) * 60 / 40))
+                    infrastructure_extended[f'{amenity}_travel_time'] = travel_time_min
+                
+                # Get average rating for services
+                if amenity in ['school', 'restaurant', 'cafe'] and stats['avg_rating']:
+                    services_quality[f'{amenity}_avg_rating'] = stats['avg_rating']
             
-        except Exception as e:
-            logger.error(f"Failed to search nearby places: {str(e)}")
-            return []
+            elif amenity in ['train_station', 'bus_station', 'airport']:
+                # Calculate transport accessibility
+                if distance_m and distance_m > 0:
+                    transport[f'{amenity}_distance'] = distance_m
+                    # Use higher speed for transport hubs (50 km/h average),
+                    # highway speed for airports found by the wide search (80 km/h)
+                    speed = 50 if stats['radius'] <= LOCAL_RADIUS else 80
+                    travel_time_min = max(1, round((distance_m / 1000) * 60 / speed))
+                    transport[f'{amenity}_travel_time'] = travel_time_min
+        
+        land.infrastructure_extended = infrastructure_extended
+        land.transport = transport
+        land.services_quality = services_quality
     
     def _create_fallback_amenities_data(self, land):
         """Create realistic fallback amenity data when Google APIs are not available"""
@@ -499,97 +721,358 @@ class EnrichmentService:
                 return
             
             lat, lon = float(land.location_lat), float(land.location_lon)
-            
-            # Get distance matrix to major cities/destinations
-            destinations = [
-                "Madrid, Spain",
-                "Barcelona, Spain",
-                "Valencia, Spain",
-                f"{land.municipality} city center, Spain"
-            ]
-            
-            transport = land.transport or {}
-            
-            for destination in destinations:
-                distance_data = self._get_distance_matrix(lat, lon, destination)
-                if distance_data:
-                    dest_key = destination.split(',')[0].lower().replace(' ', '_')
-                    transport[f'distance_to_{dest_key}'] = distance_data.get('distance')
-                    transport[f'duration_to_{dest_key}'] = distance_data.get('duration')
-            
-            land.transport = transport
+            destinations = self._major_destinations(land)
+            results = [self._get_distance_matrix(lat, lon, destination) for destination in destinations]
+            self._apply_major_destinations(land, destinations, results)
             
         except Exception as e:
             logger.error(f"Failed to enrich with Google Maps: {str(e)}")
     
+    def _major_destinations(self, land) -> List[str]:
+        """Major cities/destinations for the distance matrix"""
+        return [
+            "Madrid, Spain",
+            "Barcelona, Spain",
+            "Valencia, Spain",
+            f"{land.municipality} city center, Spain"
+        ]
+    
+    def _apply_major_destinations(self, land, destinations: List[str], results: List[Optional[Dict]]):
+        transport = land.transport or {}
+        
+        for destination, distance_data in zip(destinations, results):
+            if distance_data:
+                dest_key = destination.split(',')[0].lower().replace(' ', '_')
+                transport[f'distance_to_{dest_key}'] = distance_data.get('distance')
+                transport[f'duration_to_{dest_key}'] = distance_data.get('duration')
+        
+        land.transport = transport
+    
     def _get_distance_matrix(self, lat: float, lon: float, destination: str) -> Optional[Dict]:
         """Get distance and duration to destination using Google Maps Distance Matrix API"""
+        return cached_enrichment_lookup(
+            lat, lon, 'distance_matrix',
+            lambda: self._fetch_distance_matrix(lat, lon, destination),
+            params={'destination': destination, 'mode': 'driving'}
+        )
+    
+    def _fetch_distance_matrix(self, lat: float, lon: float, destination: str) -> Optional[Dict]:
+        """Call the Distance Matrix API for a single origin/destination pair"""
         try:
-            url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-            params = {
-                'origins': f"{lat},{lon}",
-                'destinations': destination,
-                'mode': 'driving',
-                'key': self.google_maps_key
-            }
-            
-            response = requests.get(url, params=params, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('rows') and data['rows'][0].get('elements'):
-                    element = data['rows'][0]['elements'][0]
-                    if element.get('status') == 'OK':
-                        return {
-                            'distance': element.get('distance', {}).get('value'),  # in meters
-                            'duration': element.get('duration', {}).get('value')   # in seconds
-                        }
-            
-            return None
+            response = get_http_client().get(DISTANCE_MATRIX_URL, params=self._distance_matrix_params(lat, lon, destination),
+                                             timeout=15, provider='google_distance_matrix')
+            return self._parse_distance_matrix(response)
             
         except Exception as e:
             logger.error(f"Failed to get distance matrix: {str(e)}")
             return None
     
+    def _distance_matrix_params(self, lat: float, lon: float, destination: str) -> Dict:
+        return {
+            'origins': f"{lat},{lon}",
+            'destinations': destination,
+            'mode': 'driving',
+            'key': self.google_maps_key
+        }
+    
+    def _parse_distance_matrix(self, response) -> Optional[Dict]:
+        """Distance (m) and duration (s) of the single element of a Distance Matrix response"""
+        if response.status_code == 200:
+            data = response.json()
+            report_provider_status('google_distance_matrix', data.get('status'))
+            if data.get('rows') and data['rows'][0].get('elements'):
+                element = data['rows'][0]['elements'][0]
+                if element.get('status') == 'OK':
+                    return {
+                        'distance': element.get('distance', {}).get('value'),  # in meters
+                        'duration': element.get('duration', {}).get('value')   # in seconds
+                    }
+        
+        return None
+    
     def _enrich_with_osm_data(self, land):
         """Enrich with OpenStreetMap data as fallback"""
         try:
+            from config import Config
+            from services.osm_poi_index import get_poi_index
+            
             lat, lon = float(land.location_lat), float(land.location_lon)
             
-            # OSM Overpass query for nearby amenities
-            overpass_query = f"""
-            [out:json][timeout:25];
-            (
-              node["amenity"~"^(supermarket|school|hospital|restaurant|cafe|fuel)$"](around:2000,{lat},{lon});
-              way["amenity"~"^(supermarket|school|hospital|restaurant|cafe|fuel)$"](around:2000,{lat},{lon});
-              relation["amenity"~"^(supermarket|school|hospital|restaurant|cafe|fuel)$"](around:2000,{lat},{lon});
-            );
-            out center;
-            """
-            
-            response = requests.post(
+            # Local index first; the public Overpass API only when no index is built
+            poi_index = get_poi_index()
+            if poi_index is not None:
+                amenity_counts = poi_index.count_by_category(lat, lon, OSM_AMENITY_RADIUS, OSM_AMENITY_TYPES)
+            elif (lat, lon) in self._osm_prefetched:
+                amenity_counts = self._osm_prefetched[(lat, lon)]
+            elif Config.OSM_OVERPASS_FALLBACK:
+                amenity_counts = cached_enrichment_lookup(
+                    lat, lon, 'overpass',
+                    lambda: self._fetch_osm_amenity_counts(lat, lon),
+                    params={'radius': OSM_AMENITY_RADIUS}
+                )
+            else:
+                return
+            
+            self._apply_osm_amenity_counts(land, amenity_counts)
+            
+        except Exception as e:
+            logger.error(f"Failed to enrich with OSM data: {str(e)}")
+    
+    def _apply_osm_amenity_counts(self, land, amenity_counts: Optional[Dict[str, int]]):
+        if amenity_counts is not None:
+            infrastructure_extended = land.infrastructure_extended or {}
+            
+            # Store OSM fallback data
+            infrastructure_extended['osm_amenities'] = amenity_counts
+            land.infrastructure_extended = infrastructure_extended
+    
+    def _fetch_osm_amenity_counts(self, lat: float, lon: float) -> Optional[Dict[str, int]]:
+        """Count amenities within OSM_AMENITY_RADIUS using the Overpass API (None on failure)"""
+        response = get_http_client().post(
+            self.osm_overpass_url,
+            data=self._overpass_query(lat, lon),
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            timeout=10,  # 10 second timeout to prevent worker hangs
+            provider='overpass'
+        )
+        return self._parse_osm_amenity_counts(response)
+    
+    def _overpass_query(self, lat: float, lon: float) -> str:
+        # OSM Overpass query for nearby amenities
+        amenity_pattern = '|'.join(OSM_AMENITY_TYPES)
+        overpass_query = f"""
+        [out:json][timeout:25];
+        (
+          node["amenity"~"^({amenity_pattern})$"](around:{OSM_AMENITY_RADIUS},{lat},{lon});
+          way["amenity"~"^({amenity_pattern})$"](around:{OSM_AMENITY_RADIUS},{lat},{lon});
+          relation["amenity"~"^({amenity_pattern})$"](around:{OSM_AMENITY_RADIUS},{lat},{lon});
+        );
+        out center;
+        """
+        return overpass_query
+    
+    def _parse_osm_amenity_counts(self, response) -> Optional[Dict[str, int]]:
+        if response.status_code != 200:
+            return None
+        
+        osm_data = response.json()
+        
+        # Process OSM amenities as fallback data
+        amenity_counts = {}
+        for element in osm_data.get('elements', []):
+            amenity = element.get('tags', {}).get('amenity')
+            if amenity:
+                amenity_counts[amenity] = amenity_counts.get(amenity, 0) + 1
+        
+        return amenity_counts
+    
+    def prefetch_lands(self, land_ids: List[int], force: bool = False):
+        """Batch the external lookups of lands about to be enriched (geocoding, OSM amenities, travel times)"""
+        self.amenity_searches.clear()
+        self.geocoding_service.clear()
+        # Rebuilt by geocode_lands when the batch has lands to locate
+        self._coordinate_index = None
+        self.prefetch_geocodes(land_ids)
+        self.prefetch_osm_amenities(land_ids, force=force)
+        self.prefetch_travel_times(land_ids, force=force)
+    
+    def prefetch_geocodes(self, land_ids: List[int]) -> int:
+        """Geocode the lands without coordinates in one batch (see geocode_lands)
+        
+        The locations are applied by later enrich_land() calls on this
+        service. Returns the number of lands located.
+        """
+        from models import Land
+        
+        lands = [land for land in Land.query.filter(Land.id.in_(land_ids))
+                 if not (land.location_lat and land.location_lon)]
+        locations = self.geocode_lands(lands) if lands else {}
+        self._geocode_prefetched = {land_id: location for land_id, location in locations.items() if location}
+        return len(self._geocode_prefetched)
+    
+    def geocode_lands(self, lands) -> Dict[int, Optional[Dict]]:
+        """Locations of many lands by id, with every address variant of the batch geocoded at once
+        
+        Each distinct address is geocoded once (GeocodingService.geocode_many).
+        Precise results within DUPLICATE_COORDINATE_TOLERANCE_METERS of
+        another land are checked against a coordinate index of the stored
+        lands. The index is rebuilt for every batch, so coordinates written
+        by other workers since the last batch are seen, and it is updated
+        with every land located until the next batch.
+        """
+        attempts = {land.id: self._address_attempts(land) for land in lands}
+        results = self.geocoding_service.geocode_many(
+            attempt['address'] for land_attempts in attempts.values() for attempt in land_attempts
+        )
+        
+        coordinate_index = self._load_coordinate_index()
+        locations = {}
+        for land in lands:
+            location = (self._choose_location(land, attempts[land.id], results, coordinate_index.has_other)
+                        if attempts[land.id] else None)
+            if location:
+                coordinate_index.add(land.id, location['lat'], location['lng'])
+            locations[land.id] = location
+        return locations
+    
+    def _load_coordinate_index(self) -> CoordinateIndex:
+        """Index the coordinates of every located land, replacing the previous batch's index"""
+        from app import db
+        from config import Config
+        from models import Land
+        
+        coordinate_index = CoordinateIndex(Config.DUPLICATE_COORDINATE_TOLERANCE_METERS)
+        for land_id, lat, lon in db.session.query(Land.id, Land.location_lat, Land.location_lon).filter(
+                Land.location_lat.isnot(None), Land.location_lon.isnot(None)):
+            coordinate_index.add(land_id, lat, lon)
+        self._coordinate_index = coordinate_index
+        return coordinate_index
+    
+    def _land_coordinates(self, land) -> Optional[Tuple[float, float]]:
+        """Stored coordinates of a land, else those prefetch_geocodes found for it"""
+        if land.location_lat and land.location_lon:
+            return float(land.location_lat), float(land.location_lon)
+        location = self._geocode_prefetched.get(land.id)
+        return (float(location['lat']), float(location['lng'])) if location else None
+    
+    def prefetch_travel_times(self, land_ids: List[int], force: bool = False) -> int:
+        """Fetch Google travel times for many lands with multi-origin Distance Matrix requests
+        
+        Only lands with coordinates whose travel time step would run are
+        included. Returns the number of requests sent.
+        """
+        from models import Land
+        
+        locations = []
+        for land in Land.query.filter(Land.id.in_(land_ids)):
+            coordinates = self._land_coordinates(land)
+            if not coordinates:
+                continue
+            if not force and self._step_is_current(self._step_records(land), 'travel_times',
+                                                   self._step_fingerprint('travel_times', land)):
+                continue
+            locations.append(coordinates)
+        
+        return self.travel_service.prefetch_travel_times(locations)
+    
+    def prefetch_osm_amenities(self, land_ids: List[int], force: bool = False) -> int:
+        """Count OSM amenities for many lands with one bounding-box Overpass query per spatial cluster
+        
+        Lands are grouped by OSM_BATCH_CLUSTER_METERS grid cell; each cell's
+        amenities are fetched once and counted per land by distance. The
+        counts are used by the OSM step of later enrich_land() calls on this
+        service (and cached per grid cell). Only lands with coordinates whose
+        OSM step would run are considered, and only when Overpass is the OSM
+        source. Returns the number of Overpass queries sent.
+        """
+        from config import Config
+        from models import Land
+        from services.osm_poi_index import get_poi_index
+        from utils.cache import cache_enrichment_data, coordinate_cell
+        
+        self._osm_prefetched = {}
+        if get_poi_index() is not None or not Config.OSM_OVERPASS_FALLBACK:
+            return 0
+        
+        clusters = {}
+        for land in Land.query.filter(Land.id.in_(land_ids)):
+            coordinates = self._land_coordinates(land)
+            if not coordinates:
+                continue
+            if not force and self._step_is_current(self._step_records(land), 'osm', self._step_fingerprint('osm', land)):
+                continue
+            lat, lon = coordinates
+            clusters.setdefault(coordinate_cell(lat, lon, Config.OSM_BATCH_CLUSTER_METERS), set()).add((lat, lon))
+        
+        queries = 0
+        for locations in clusters.values():
+            # A lone land keeps its own radius query
+            if len(locations) < 2:
+                continue
+            
+            queries += 1
+            elements = self._fetch_osm_elements_in_bbox(self._osm_cluster_bbox(locations))
+            if elements is None:
+                continue
+            
+            for lat, lon in locations:
+                amenity_counts = self._count_osm_amenities_near(lat, lon, elements)
+                self._osm_prefetched[(lat, lon)] = amenity_counts
+                cache_enrichment_data(lat, lon, 'overpass', amenity_counts, params={'radius': OSM_AMENITY_RADIUS})
+        
+        if queries:
+            logger.info(f"Prefetched OSM amenities for {len(self._osm_prefetched)} lands with {queries} Overpass queries")
+        return queries
+    
+    def _osm_cluster_bbox(self, locations) -> Tuple[float, float, float, float]:
+        """(south, west, north, east) covering OSM_AMENITY_RADIUS around every location"""
+        from utils.spatial_index import METERS_PER_DEGREE
+        
+        lats = [lat for lat, _ in locations]
+        lons = [lon for _, lon in locations]
+        delta_lat = OSM_AMENITY_RADIUS / METERS_PER_DEGREE
+        # Longitude degrees shrink towards the poles: pad using the highest latitude
+        max_abs_lat = min(89.9, max(abs(min(lats)), abs(max(lats))) + delta_lat)
+        delta_lon = OSM_AMENITY_RADIUS / (METERS_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+        return min(lats) - delta_lat, min(lons) - delta_lon, max(lats) + delta_lat, max(lons) + delta_lon
+    
+    def _fetch_osm_elements_in_bbox(self, bbox: Tuple[float, float, float, float]) -> Optional[List[Dict]]:
+        """OSM amenity elements with geometry inside a bounding box (None on failure)"""
+        amenity_pattern = '|'.join(OSM_AMENITY_TYPES)
+        south, west, north, east = bbox
+        overpass_query = f"""
+        [out:json][timeout:60];
+        (
+          node["amenity"~"^({amenity_pattern})$"]({south},{west},{north},{east});
+          way["amenity"~"^({amenity_pattern})$"]({south},{west},{north},{east});
+          relation["amenity"~"^({amenity_pattern})$"]({south},{west},{north},{east});
+        );
+        out geom;
+        """
+        try:
+            response = get_http_client().post(
                 self.osm_overpass_url,
                 data=overpass_query,
                 headers={'Content-Type': 'application/x-www-form-urlencoded'},
-                timeout=10  # 10 second timeout to prevent worker hangs
+                timeout=30,
+                provider='overpass'
             )
-            
-            if response.status_code == 200:
-                osm_data = response.json()
-                infrastructure_extended = land.infrastructure_extended or {}
-                
-                # Process OSM amenities as fallback data
-                amenity_counts = {}
-                for element in osm_data.get('elements', []):
-                    amenity = element.get('tags', {}).get('amenity')
-                    if amenity:
-                        amenity_counts[amenity] = amenity_counts.get(amenity, 0) + 1
-                
-                # Store OSM fallback data
-                infrastructure_extended['osm_amenities'] = amenity_counts
-                land.infrastructure_extended = infrastructure_extended
-            
+            if response.status_code != 200:
+                logger.warning(f"Overpass bounding-box query failed with status {response.status_code}")
+                return None
+            return response.json().get('elements', [])
         except Exception as e:
-            logger.error(f"Failed to enrich with OSM data: {str(e)}")
+            logger.error(f"Failed to fetch OSM amenities in bounding box: {str(e)}")
+            return None
+    
+    def _count_osm_amenities_near(self, lat: float, lon: float, elements: List[Dict]) -> Dict[str, int]:
+        """Amenity counts like an around: query - an element counts if any of its vertices is within range"""
+        from utils.spatial_index import haversine_meters
+        
+        amenity_counts = {}
+        for element in elements:
+            amenity = element.get('tags', {}).get('amenity')
+            if not amenity:
+                continue
+            
+            vertices = self._osm_element_vertices(element)
+            if any(haversine_meters(lat, lon, vertex_lat, vertex_lon) <= OSM_AMENITY_RADIUS
+                   for vertex_lat, vertex_lon in vertices):
+                amenity_counts[amenity] = amenity_counts.get(amenity, 0) + 1
+        
+        return amenity_counts
+    
+    def _osm_element_vertices(self, element: Dict) -> List[Tuple[float, float]]:
+        """Coordinates of a node, or the vertices of a way/relation from 'out geom'"""
+        if 'lat' in element:
+            return [(element['lat'], element['lon'])]
+        
+        vertices = [(point['lat'], point['lon']) for point in element.get('geometry') or [] if point]
+        for member in element.get('members') or []:
+            if 'lat' in member:
+                vertices.append((member['lat'], member['lon']))
+            vertices.extend((point['lat'], point['lon']) for point in member.get('geometry') or [] if point)
+        return vertices
     
     def _analyze_environment(self, land):
         """Analyze environment features like views and orientation"""
@@ -604,29 +1087,16 @@ class EnrichmentService:
             # Combine all text for analysis
             all_text = f"{description} {title} {municipality}"
             
-            # Enhanced sea view detection (Spanish + English + known coastal areas)
-            sea_keywords = ['mar', 'playa', 'costa', 'litoral', 'vista al mar', 'sea', 'beach', 'coast', 'coastal', 'ocean', 'bay', 'shore', 'cudillero', 'santander', 'gijon', 'llanes', 'comillas', 'ribadesella']
-            environment['sea_view'] = any(keyword in all_text for keyword in sea_keywords) or self._is_coastal_location(land)
-            
-            # Enhanced mountain view detection
-            mountain_keywords = ['montaña', 'sierra', 'monte', 'vista montaña', 'mountain', 'hill', 'valley', 'peak', 'cordillera', 'picos de europa', 'cantabrica']
-            environment['mountain_view'] = any(keyword in all_text for keyword in mountain_keywords)
-            
-            # Enhanced forest view detection
-            forest_keywords = ['bosque', 'forestal', 'pinar', 'verde', 'forest', 'wood', 'trees', 'natural', 'rural', 'countryside']
-            environment['forest_view'] = any(keyword in all_text for keyword in forest_keywords)
+            # Sea, mountain and forest views in one pass over the text
+            views = VIEW_KEYWORDS.matches(all_text)
+            environment['sea_view'] = 'sea_view' in views or self._is_coastal_location(land)
+            environment['mountain_view'] = 'mountain_view' in views
+            environment['forest_view'] = 'forest_view' in views
             
             # Orientation detection
-            orientation_keywords = {
-                'norte': 'north', 'sur': 'south', 'este': 'east', 'oeste': 'west',
-                'noreste': 'northeast', 'noroeste': 'northwest',
-                'sureste': 'southeast', 'suroeste': 'southwest'
-            }
-            
-            for spanish_orientation, english_orientation in orientation_keywords.items():
-                if spanish_orientation in description:
-                    environment['orientation'] = english_orientation
-                    break
+            orientation = ORIENTATION_KEYWORDS.first(description)
+            if orientation:
+                environment['orientation'] = orientation
             
             land.environment = environment
             
@@ -0,0 +1,331 @@
+"""Offline place-name gazetteer for Asturias and Cantabria
+
+Config.GAZETTEER_PATH holds {"places": [...]} entries with a name, type
+('province', 'municipality', 'parish', 'locality'), province, municipality
+(the place itself for municipalities), optionally parish and aliases, lat and
+lon. import_gazetteer.py rebuilds it from a GeoNames country dump.
+
+Names and aliases are compared after normalize_address folding: exact names
+through a dict, misspellings through a trigram index (Dice similarity of at
+least GAZETTEER_MIN_SIMILARITY). GeocodingService answers every address whose
+most specific part is a place found here in microseconds and with no network
+call. Street-level addresses (house numbers, "Calle ...", "Lugar ...") and
+names that match places in several municipalities still go to Google and
+Nominatim.
+"""
+import io
+import os
+import re
+import json
+import logging
+import threading
+import zipfile
+from array import array
+from typing import Dict, Iterator, List, Optional, Set
+from services.geocode_cache import normalize_address
+
+logger = logging.getLogger(__name__)
+
+PLACE_TYPES = ('province', 'municipality', 'parish', 'locality')
+COUNTRY_NAMES = {'spain', 'espana'}
+STREET_WORDS = {'calle', 'c/', 'avenida', 'avda', 'carretera', 'ctra', 'plaza', 'paseo', 'camino', 'travesia',
+                'urbanizacion', 'poligono', 'caserio', 'lugar', 'barrio', 'finca'}
+
+# GeoNames admin2 codes of the provinces covered, in the ES dump
+GEONAMES_PROVINCES = {'O': 'Asturias', 'S': 'Cantabria'}
+GEONAMES_SKIPPED_CODES = {'PPLH', 'PPLQ', 'PPLW'}  # Historical, abandoned, destroyed
+ALIAS_PATTERN = re.compile(r"^[A-Za-zÀ-ÿ' .-]+$")
+MAX_ALIASES = 8
+
+_gazetteer = None
+_gazetteer_mtime = None
+_gazetteer_lock = threading.Lock()
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def is_street_level(part: str) -> bool:
+    """Whether a normalized address part names a street or house rather than a place"""
+    words = part.split()
+    return (any(char.isdigit() for char in part) or part.startswith('c/')
+            or bool(words) and words[0] in STREET_WORDS)
+
+
+class Gazetteer:
+    """Places by normalized name, with trigram fuzzy matching and hierarchy checks"""
+
+    def __init__(self, places: List[Dict], min_similarity: float = 0.7):
+        self.min_similarity = min_similarity
+        self.places = []
+        self._name_keys = []      # Normalized name by place id
+        self._hierarchy = []      # (province, municipality, parish) keys by place id
+        self._exact = {}          # Normalized name or alias -> place ids
+        self._municipalities = {}  # Normalized municipality name -> place id
+
+        for place in places:
+            name, place_type = place.get('name'), place.get('type')
+            if not name or place_type not in PLACE_TYPES or place.get('lat') is None or place.get('lon') is None:
+                raise ValueError(f"Gazetteer place needs name, type, lat and lon: {place}")
+            place_id = len(self.places)
+            self.places.append(dict(place, lat=float(place['lat']), lon=float(place['lon'])))
+            self._name_keys.append(normalize_address(name))
+            self._hierarchy.append(tuple(
+                normalize_address(place[field]) if place.get(field) else None
+                for field in ('province', 'municipality', 'parish')
+            ))
+            for alias in [name] + list(place.get('aliases') or []):
+                key = normalize_address(alias)
+                if key and place_id not in self._exact.get(key, ()):
+                    self._exact.setdefault(key, []).append(place_id)
+            if place_type == 'municipality':
+                self._municipalities.setdefault(self._name_keys[place_id], place_id)
+
+        # Trigram postings over the distinct keys, kept as compact arrays
+        self._keys = list(self._exact)
+        self._key_sizes = array('H')
+        postings = {}
+        for key_id, key in enumerate(self._keys):
+            grams = trigrams(key)
+            self._key_sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, array('I')).append(key_id)
+        self._trigrams = postings
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _fuzzy(self, key: str) -> List[int]:
+        """Place ids of the keys most similar to key, if similar enough"""
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for key_id in self._trigrams.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+
+        best_score, best_keys = self.min_similarity, []
+        for key_id, count in shared.items():
+            score = 2 * count / (len(grams) + self._key_sizes[key_id])
+            if score > best_score + 1e-9:
+                best_score, best_keys = score, [key_id]
+            elif score >= best_score - 1e-9:
+                best_keys.append(key_id)
+        return [place_id for key_id in best_keys for place_id in self._exact[self._keys[key_id]]]
+
+    def match(self, part: str) -> List[int]:
+        """Place ids a normalized address part names (exact, else fuzzy, else by hyphenated pieces)"""
+        if part in self._exact:
+            return self._exact[part]
+        place_ids = self._fuzzy(part)
+        if not place_ids and '-' in part:
+            for piece in part.split('-'):
+                place_ids = self.match(piece.strip()) if piece.strip() else []
+                if place_ids:
+                    break
+        return place_ids
+
+    def _within(self, place_id: int, area_id: int) -> bool:
+        if place_id == area_id:
+            return True
+        area = self.places[area_id]
+        province, municipality, parish = self._hierarchy[place_id]
+        area_key = self._name_keys[area_id]
+        if area['type'] == 'province':
+            return province == area_key
+        if area['type'] == 'municipality':
+            return municipality == area_key
+        if area['type'] == 'parish':
+            return parish == area_key and municipality == self._hierarchy[area_id][1]
+        return False
+
+    def resolve(self, address: str) -> Optional[Dict]:
+        """The place an address names, or None for street-level, unknown or ambiguous addresses
+
+        The first part of the address picks the place; the later parts
+        (municipality, province) must contain it when they are known places.
+        """
+        parts = [part for part in normalize_address(address).split(', ') if part and part not in COUNTRY_NAMES]
+        if not parts or is_street_level(parts[0]):
+            return None
+
+        candidates = self.match(parts[0])
+        for part in parts[1:]:
+            if not candidates:
+                return None
+            areas = self.match(part) if not is_street_level(part) else []
+            if areas:
+                candidates = [place_id for place_id in candidates
+                              if any(self._within(place_id, area_id) for area_id in areas)]
+        if not candidates:
+            return None
+
+        # Same-named places of one municipality (a municipality and its seat) resolve to the coarsest
+        if len({self._hierarchy[place_id][:2] for place_id in candidates}) > 1:
+            return None
+        place_id = min(candidates, key=lambda candidate: PLACE_TYPES.index(self.places[candidate]['type']))
+        return self.places[place_id]
+
+    def formatted_address(self, place: Dict) -> str:
+        parts = [place['name']]
+        for field in ('parish', 'municipality', 'province'):
+            if place.get(field) and place[field] not in parts:
+                parts.append(place[field])
+        return ', '.join(parts + ['Spain'])
+
+    def geocode(self, address: str) -> Optional[Dict]:
+        """Geocoding result for an address the gazetteer resolves, shaped like GeocodingService results"""
+        place = self.resolve(address)
+        if place is None:
+            return None
+        return {
+            'lat': place['lat'],
+            'lng': place['lon'],
+            'formatted_address': self.formatted_address(place),
+            'address_components': [],
+            'provider': 'gazetteer',
+            'place_type': place['type']
+        }
+
+    def municipality_address(self, text: str) -> Optional[str]:
+        """'Llanes, Asturias, Spain' style address of the municipality a free-form location mentions
+
+        Address parts are tried from the coarsest; failing that, any run of up
+        to four words that is exactly a municipality name.
+        """
+        parts = [part for part in normalize_address(text).split(', ') if part and part not in COUNTRY_NAMES]
+        for part in reversed(parts):
+            if is_street_level(part):
+                continue
+            municipalities = {self._hierarchy[place_id][1] for place_id in self.match(part)} - {None}
+            if len(municipalities) == 1:
+                return self.formatted_address(self.places[self._municipalities[municipalities.pop()]])
+
+        words = re.sub(r'[,()]', ' ', normalize_address(text)).split()
+        for length in range(min(4, len(words)), 0, -1):
+            for start in range(len(words) - length + 1):
+                place_id = self._municipalities.get(' '.join(words[start:start + length]))
+                if place_id is not None:
+                    return self.formatted_address(self.places[place_id])
+        return None
+
+
+def load_gazetteer(path: str) -> Gazetteer:
+    from config import Config
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return Gazetteer(data.get('places', []), Config.GAZETTEER_MIN_SIMILARITY)
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Process-wide gazetteer, reloaded when the file changes (None without a gazetteer file)
+
+    A file that fails to load keeps the previous gazetteer in use.
+    """
+    global _gazetteer, _gazetteer_mtime
+    from config import Config
+
+    path = Config.GAZETTEER_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if _gazetteer is None or _gazetteer_mtime != (path, mtime):
+        with _gazetteer_lock:
+            if _gazetteer is None or _gazetteer_mtime != (path, mtime):
+                try:
+                    gazetteer = load_gazetteer(path)
+                except Exception as e:
+                    logger.error(f"Failed to load gazetteer {path}: {str(e)}")
+                    return _gazetteer
+                _gazetteer = gazetteer
+                _gazetteer_mtime = (path, mtime)
+                logger.info(f"Loaded {len(_gazetteer)} places from {path}")
+    return _gazetteer
+
+
+def _geonames_rows(source: str) -> Iterator[List[str]]:
+    """Tab-separated rows of a GeoNames dump (ES.txt, or ES.zip as downloaded)"""
+    if source.endswith('.zip'):
+        with zipfile.ZipFile(source) as archive:
+            name = next(name for name in archive.namelist()
+                        if name.endswith('.txt') and not name.lower().startswith('readme'))
+            with archive.open(name) as f:
+                for line in io.TextIOWrapper(f, encoding='utf-8'):
+                    yield line.rstrip('\n').split('\t')
+    else:
+        with open(source, encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\n').split('\t')
+
+
+def import_geonames(source: str, path: Optional[str] = None) -> int:
+    """Write the gazetteer from a GeoNames ES dump: provinces, municipalities (ADM3), parishes (ADM4) and
+    populated places of GEONAMES_PROVINCES; returns the number of places"""
+    from config import Config
+
+    path = path or Config.GAZETTEER_PATH
+    provinces, municipalities, parishes, localities = {}, {}, {}, []
+    for row in _geonames_rows(source):
+        if len(row) < 14 or row[11] not in GEONAMES_PROVINCES:
+            continue
+        feature_class, feature_code = row[6], row[7]
+        admin2, admin3, admin4 = row[11], row[12], row[13]
+        if feature_code == 'ADM2':
+            provinces[admin2] = row
+        elif feature_code == 'ADM3':
+            municipalities[(admin2, admin3)] = row
+        elif feature_code == 'ADM4':
+            parishes[(admin2, admin3, admin4)] = row
+        elif feature_class == 'P' and feature_code not in GEONAMES_SKIPPED_CODES:
+            localities.append(row)
+
+    def place(row, place_type, municipality=None, parish=None):
+        name = row[1]
+        aliases = []
+        for alias in row[3].split(','):
+            alias = alias.strip()
+            if (ALIAS_PATTERN.match(alias) and normalize_address(alias) != normalize_address(name)
+                    and normalize_address(alias) not in map(normalize_address, aliases)):
+                aliases.append(alias)
+        entry = {'name': name, 'type': place_type, 'province': GEONAMES_PROVINCES[row[11]],
+                 'lat': round(float(row[4]), 5), 'lon': round(float(row[5]), 5)}
+        if municipality:
+            entry['municipality'] = municipality
+        if parish:
+            entry['parish'] = parish
+        if aliases:
+            entry['aliases'] = aliases[:MAX_ALIASES]
+        return entry
+
+    places = [place(row, 'province') for row in provinces.values()]
+    places += [place(row, 'municipality', municipality=row[1]) for row in municipalities.values()]
+    for key, row in parishes.items():
+        municipality = municipalities.get(key[:2])
+        if municipality:
+            places.append(place(row, 'parish', municipality=municipality[1]))
+    for row in localities:
+        municipality = municipalities.get((row[11], row[12]))
+        if municipality is None:
+            continue
+        parish = parishes.get((row[11], row[12], row[13]))
+        places.append(place(row, 'locality', municipality=municipality[1], parish=parish[1] if parish else None))
+
+    # Validate before replacing the current file
+    Gazetteer(places)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "source": ' + json.dumps(f"GeoNames {os.path.basename(source)}") + ',\n  "places": [\n')
+        f.write(',\n'.join('    ' + json.dumps(entry, ensure_ascii=False) for entry in places))
+        f.write('\n  ]\n}\n')
+    os.replace(tmp_path, path)
+
+    logger.info(f"Imported {len(places)} places from {source} into {path}")
+    return len(places)
@@ -0,0 +1,137 @@
+"""Persistent geocoding results in the geocode_cache table
+
+Results are keyed by normalized address (lower-cased, accents folded, " - "
+read as ", ", spacing collapsed), so "Gijón - Asturias, Spain" and "gijon,
+asturias, spain" share one row. Found addresses are reused until
+GEOCODE_CACHE_TTL_DAYS old. Addresses no provider knows are remembered for
+GEOCODE_CACHE_NEGATIVE_TTL_HOURS only, so a failing string is not retried
+by every land of a backfill but gets another chance the next day.
+
+Each call uses its own short-lived session, so reading or writing the cache
+never flushes or commits the caller's pending changes. Failures are logged
+and treated as misses.
+"""
+import re
+import logging
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+QUERY_CHUNK = 500
+
+
+def normalize_address(address: str) -> str:
+    """Cache key of an address"""
+    folded = unicodedata.normalize('NFKD', address or '')
+    folded = ''.join(char for char in folded if not unicodedata.combining(char)).lower()
+    folded = folded.replace(' - ', ', ')
+    folded = re.sub(r'\s*,\s*', ', ', re.sub(r'\s+', ' ', folded))
+    return folded.strip(' ,')
+
+
+def _valid_geocodes():
+    """Filter for unexpired results; misses expire much sooner than found addresses"""
+    from config import Config
+    from models import GeocodeCache
+
+    now = datetime.utcnow()
+    return or_(
+        and_(GeocodeCache.found.is_(True),
+             GeocodeCache.fetched_at >= now - timedelta(days=Config.GEOCODE_CACHE_TTL_DAYS)),
+        and_(GeocodeCache.found.is_(False),
+             GeocodeCache.fetched_at >= now - timedelta(hours=Config.GEOCODE_CACHE_NEGATIVE_TTL_HOURS))
+    )
+
+
+def get_cached_geocodes(keys: Iterable[str]) -> Dict[str, Optional[Dict]]:
+    """Unexpired results by normalized address; None marks a cached miss, absent keys are not cached"""
+    keys = list(dict.fromkeys(keys))
+    results = {}
+    if not keys:
+        return results
+
+    try:
+        from app import db
+        from models import GeocodeCache
+
+        with Session(db.engine) as session:
+            for start in range(0, len(keys), QUERY_CHUNK):
+                rows = session.query(GeocodeCache).filter(
+                    GeocodeCache.address_key.in_(keys[start:start + QUERY_CHUNK]),
+                    _valid_geocodes()
+                ).all()
+                for row in rows:
+                    results[row.address_key] = {
+                        'lat': row.lat,
+                        'lng': row.lng,
+                        'formatted_address': row.formatted_address,
+                        'address_components': row.address_components or [],
+                        'provider': row.provider
+                    } if row.found else None
+    except Exception as e:
+        logger.warning(f"Geocode cache lookup failed: {str(e)}")
+        return {}
+
+    return results
+
+
+def store_geocodes(results: Dict[str, Optional[Dict]]) -> int:
+    """Cache geocoding results by address, None meaning no provider found the address; returns the rows stored"""
+    now = datetime.utcnow()
+    rows = {}
+    for address, result in results.items():
+        rows[normalize_address(address)] = {
+            'address': address[:500],
+            'found': result is not None,
+            'lat': result['lat'] if result else None,
+            'lng': result['lng'] if result else None,
+            'formatted_address': result.get('formatted_address') if result else None,
+            'address_components': result.get('address_components') if result else None,
+            'provider': result.get('provider') if result else None,
+            'fetched_at': now
+        }
+    if not rows:
+        return 0
+
+    try:
+        from app import db
+        from models import GeocodeCache
+
+        keys = list(rows)
+        with Session(db.engine) as session:
+            for start in range(0, len(keys), QUERY_CHUNK):
+                chunk = keys[start:start + QUERY_CHUNK]
+                existing = {
+                    row.address_key: row
+                    for row in session.query(GeocodeCache).filter(GeocodeCache.address_key.in_(chunk))
+                }
+                for key in chunk:
+                    row = existing.get(key)
+                    if row is None:
+                        session.add(GeocodeCache(address_key=key, **rows[key]))
+                    else:
+                        for field, value in rows[key].items():
+                            setattr(row, field, value)
+            session.commit()
+        return len(rows)
+    except Exception as e:
+        # Concurrent workers may race on a key; the addresses are simply geocoded again later
+        logger.warning(f"Could not store {len(rows)} geocodes in the geocode cache: {str(e)}")
+        return 0
+
+
+def get_geocode_cache_stats() -> Dict:
+    """Cached addresses, how many were not found, and how many have expired"""
+    from app import db
+    from models import GeocodeCache
+    from sqlalchemy import func
+
+    with Session(db.engine) as session:
+        total = session.query(func.count(GeocodeCache.id)).scalar()
+        not_found = session.query(func.count(GeocodeCache.id)).filter(GeocodeCache.found.is_(False)).scalar()
+        expired = session.query(func.count(GeocodeCache.id)).filter(~_valid_geocodes()).scalar()
+    return {'total': total, 'not_found': not_found, 'expired': expired}
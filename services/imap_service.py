@@ -7,12 +7,47 @@ from imapclient import IMAPClient
 from email import message_from_bytes
 from email.header import decode_header
 from utils.email_parser import EmailParser
+from utils.keyword_matcher import KeywordMatcher
 from models import Land, SyncHistory
 from app import db
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Email subjects (case-sensitive): 'skip' marks non-property emails, 'listing' the property alerts we process
+SUBJECT_KEYWORDS = KeywordMatcher({
+    'skip': [
+        'One of your favourites is no longer listed',
+        'Tu favorito ya no está disponible',
+        'Welcome to Idealista',
+        'Bienvenido a Idealista',
+        'Contactos que ha recibido',
+        'You have received contacts',
+        'Weekly digest',
+        'Resumen semanal',
+        'Update your preferences',
+        'Actualiza tus preferencias',
+        'Respuesta de',  # Skip user responses/replies
+        'Price change',  # Skip price change notifications
+        'Cambio de precio',
+        'detached house',  # Skip house listings
+        'casa adosada',
+        'vivienda',
+        'chalet',
+        'piso',
+        'apartamento',
+        'ático',
+        'dúplex',
+        'Bilbao homes'
+    ],
+    'listing': [
+        'New plot of land in your search',
+        'Nuevo terreno en tu búsqueda',
+        'Price reduction in your search',
+        'Bajada de precio en tu búsqueda'
+    ]
+})
+
 class IMAPService:
     def __init__(self):
         self.host = Config.IMAP_HOST
@@ -183,46 +218,14 @@ class IMAPService:
                         subject = self._decode_header_value(msg.get('Subject', ''))
                         logger.info(f"Processing email UID {uid}: {subject[:50]}...")
                         
-                        # Skip non-property emails (explicit blacklist)
-                        skip_subjects = [
-                            'One of your favourites is no longer listed',
-                            'Tu favorito ya no está disponible',
-                            'Welcome to Idealista',
-                            'Bienvenido a Idealista',
-                            'Contactos que ha recibido',
-                            'You have received contacts',
-                            'Weekly digest',
-                            'Resumen semanal',
-                            'Update your preferences',
-                            'Actualiza tus preferencias',
-                            'Respuesta de',  # Skip user responses/replies
-                            'Price change',  # Skip price change notifications
-                            'Cambio de precio',
-                            'detached house',  # Skip house listings
-                            'casa adosada',
-                            'vivienda',
-                            'chalet',
-                            'piso',
-                            'apartamento',
-                            'ático',
-                            'dúplex',
-                            'Bilbao homes'
-                        ]
-                        
-                        if any(skip_text in subject for skip_text in skip_subjects):
+                        # Skip non-property emails (explicit blacklist), then only
+                        # process property listing emails (whitelist approach)
+                        subject_types = SUBJECT_KEYWORDS.matches(subject)
+                        if 'skip' in subject_types:
                             logger.info(f"Skipping non-property email: {subject[:50]}")
                             continue
                         
-                        # Only process property listing emails (whitelist approach)
-                        valid_subjects = [
-                            'New plot of land in your search',
-                            'Nuevo terreno en tu búsqueda',
-                            'Price reduction in your search',
-                            'Bajada de precio en tu búsqueda'
-                        ]
-                        
-                        is_valid = any(valid_text in subject for valid_text in valid_subjects)
-                        if not is_valid:
+                        if 'listing' not in subject_types:
                             logger.warning(f"Unknown email type, skipping: {subject[:50]}")
                             continue
                         
@@ -306,6 +309,8 @@ class IMAPService:
             from services.enrichment_service import EnrichmentService
             
             processed_count = 0
+            # With the async engine, new lands are enriched together after the loop
+            deferred_enrichment = []
             for email_data in emails:
                 try:
                     # Check if email already processed
@@ -397,15 +402,18 @@ class IMAPService:
                     db.session.commit()
                     
                     # Try enrichment but continue if it fails
-                    try:
-                        enrichment_service = EnrichmentService()
-                        enriched = enrichment_service.enrich_land(land.id)
-                        if enriched:
-                            logger.info(f"Successfully enriched land {land.id}")
-                        else:
-                            logger.warning(f"Failed to enrich land {land.id}, continuing without enrichment")
-                    except Exception as enrich_error:
-                        logger.warning(f"Enrichment failed for land {land.id}: {str(enrich_error)}, continuing")
+                    if Config.ENRICHMENT_ENGINE == 'async':
+                        deferred_enrichment.append(land.id)
+                    else:
+                        try:
+                            enrichment_service = EnrichmentService()
+                            enriched = enrichment_service.enrich_land(land.id)
+                            if enriched:
+                                logger.info(f"Successfully enriched land {land.id}")
+                            else:
+                                logger.warning(f"Failed to enrich land {land.id}, continuing without enrichment")
+                        except Exception as enrich_error:
+                            logger.warning(f"Enrichment failed for land {land.id}: {str(enrich_error)}, continuing")
                     
                     # Enhance description with AI
                     try:
@@ -437,6 +445,14 @@ class IMAPService:
                     db.session.rollback()
                     continue
             
+            if deferred_enrichment:
+                try:
+                    from services.async_enrichment_service import AsyncEnrichmentService
+                    logger.info(f"Enriching {len(deferred_enrichment)} new lands with the async engine")
+                    AsyncEnrichmentService().enrich_lands(deferred_enrichment)
+                except Exception as enrich_error:
+                    logger.warning(f"Async enrichment failed: {str(enrich_error)}, continuing")
+            
             # Update sync history
             sync_history.new_properties_added = processed_count
             sync_history.status = 'completed'
@@ -67,6 +67,12 @@ class LandService:
         if filters.get('sea_view'):
             base_query = base_query.filter(Land.environment['sea_view'].astext == 'true')
         
+        # Drive time filter, answered from the precomputed travel time grid
+        if filters.get('near') and filters.get('within_minutes'):
+            from services.travel_time_grid import land_ids_within_minutes
+            land_ids = land_ids_within_minutes(filters['near'], filters['within_minutes'])
+            base_query = base_query.filter(Land.id.in_(land_ids))
+        
         # Apply sorting with NULL values last (default to score_total descending)
         sort_field = filters.get('sort', 'score_total')
         sort_order = filters.get('order', 'desc')
@@ -0,0 +1,131 @@
+import os
+import json
+import logging
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+from utils.spatial_index import SpatialIndex, build_spatial_index
+
+logger = logging.getLogger(__name__)
+
+# OSM tags whose values are indexed as POI categories
+POI_TAGS = ('amenity',)
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def _feature_point(geometry: Dict) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a GeoJSON point, or the vertex average of a line/polygon"""
+    if not geometry:
+        return None
+    coordinates = geometry.get('coordinates')
+    if geometry.get('type') == 'Point':
+        return coordinates[1], coordinates[0]
+
+    # Flatten nested rings/lines down to [lon, lat] pairs
+    while coordinates and isinstance(coordinates[0], list) and isinstance(coordinates[0][0], list):
+        coordinates = [pair for part in coordinates for pair in part]
+    if not coordinates:
+        return None
+    return (sum(pair[1] for pair in coordinates) / len(coordinates),
+            sum(pair[0] for pair in coordinates) / len(coordinates))
+
+
+def read_geojson_pois(path: str) -> Iterator[Tuple[float, float, str, Optional[str]]]:
+    """Yield (lat, lon, category, name) from a GeoJSON FeatureCollection of OSM features
+
+    Tags may be top-level properties (osmium/ogr2ogr export) or nested under
+    properties.tags (overpass-turbo export).
+    """
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    for feature in collection.get('features', []):
+        properties = feature.get('properties') or {}
+        tags = properties.get('tags') or properties
+        point = _feature_point(feature.get('geometry'))
+        if not point:
+            continue
+        for tag in POI_TAGS:
+            if tags.get(tag):
+                yield point[0], point[1], tags[tag], tags.get('name')
+
+
+def read_pbf_pois(path: str) -> Iterator[Tuple[float, float, str, Optional[str]]]:
+    """Yield (lat, lon, category, name) from an OSM PBF extract (requires the osmium package)"""
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("Reading .pbf extracts requires the 'osmium' package; "
+                           "install it or convert the extract to GeoJSON")
+
+    pois = []
+
+    class PoiHandler(osmium.SimpleHandler):
+        def node(self, node):
+            self._add(node.tags, node.location.lat, node.location.lon)
+
+        def way(self, way):
+            locations = [n.location for n in way.nodes if n.location.valid()]
+            if locations:
+                self._add(way.tags,
+                          sum(l.lat for l in locations) / len(locations),
+                          sum(l.lon for l in locations) / len(locations))
+
+        def _add(self, tags, lat, lon):
+            for tag in POI_TAGS:
+                if tag in tags:
+                    pois.append((lat, lon, tags[tag], tags.get('name')))
+
+    PoiHandler().apply_file(path, locations=True)
+    return iter(pois)
+
+
+def import_osm_extract(source_path: str, index_path: Optional[str] = None) -> int:
+    """Build the POI index from a GeoJSON or PBF extract; returns the number of POIs"""
+    from config import Config
+
+    index_path = index_path or Config.OSM_POI_INDEX_PATH
+    if source_path.endswith('.pbf'):
+        pois = list(read_pbf_pois(source_path))
+    else:
+        pois = list(read_geojson_pois(source_path))
+
+    count = build_spatial_index(((lat, lon, category) for lat, lon, category, _ in pois), index_path,
+                                names=(name for _, _, _, name in pois))
+    logger.info(f"Indexed {count} OSM POIs from {source_path} into {index_path}")
+    return count
+
+
+def poi_index_version() -> Optional[float]:
+    """Modification time of the POI index file (None if not built)"""
+    from config import Config
+
+    try:
+        return os.path.getmtime(Config.OSM_POI_INDEX_PATH)
+    except OSError:
+        return None
+
+
+def get_poi_index() -> Optional[SpatialIndex]:
+    """Process-wide POI index, reopened when the file is rebuilt (None if not built)"""
+    global _index, _index_mtime
+    from config import Config
+
+    path = Config.OSM_POI_INDEX_PATH
+    mtime = poi_index_version()
+    if mtime is None:
+        return None
+
+    if _index is None or _index_mtime != mtime:
+        with _index_lock:
+            if _index is None or _index_mtime != mtime:
+                try:
+                    _index = SpatialIndex(path)
+                    _index_mtime = mtime
+                    logger.info(f"Loaded OSM POI index with {len(_index)} points from {path}")
+                except Exception as e:
+                    logger.error(f"Failed to open OSM POI index {path}: {str(e)}")
+                    return None
+    return _index
@@ -0,0 +1,258 @@
+"""Offline driving times from a regional OSM road graph
+
+import_osm_roads.py turns an extract into the graph file at
+Config.ROAD_GRAPH_PATH; TravelTimeService routes on it before asking Google.
+Edge travel times come from the highway class (capped by maxspeed). Origins
+and destinations are snapped to the nearest graph node, and the straight
+walk to it is added at ACCESS_SPEED_KMH.
+"""
+import os
+import re
+import json
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.road_graph import RoadGraph, build_road_graph
+from utils.spatial_index import haversine_meters
+
+logger = logging.getLogger(__name__)
+
+# Average driving speeds by OSM highway class (km/h); other classes are not routed
+ROAD_SPEEDS_KMH = {
+    'motorway': 110, 'motorway_link': 60,
+    'trunk': 90, 'trunk_link': 50,
+    'primary': 70, 'primary_link': 45,
+    'secondary': 60, 'secondary_link': 40,
+    'tertiary': 50, 'tertiary_link': 35,
+    'unclassified': 40, 'residential': 30, 'living_street': 10,
+    'service': 20, 'track': 15,
+}
+
+# Speed between a point and its nearest graph node (driveway, farm track)
+ACCESS_SPEED_KMH = 20
+
+_graph = None
+_graph_mtime = None
+_graph_lock = threading.Lock()
+
+
+def _maxspeed_kmh(value: Optional[str]) -> Optional[float]:
+    """Numeric maxspeed tag in km/h ('50', '30 mph'); None for 'signals', 'none', etc."""
+    match = re.match(r'\s*(\d+(?:\.\d+)?)\s*(mph)?', value or '')
+    if not match:
+        return None
+    speed = float(match.group(1))
+    return speed * 1.609344 if match.group(2) else speed
+
+
+def _road_directions(tags: Dict) -> Tuple[bool, bool]:
+    """(forward, backward) travel allowed along the way's node order"""
+    oneway = (tags.get('oneway') or '').lower()
+    if oneway == '-1':
+        return False, True
+    if oneway in ('yes', 'true', '1'):
+        return True, False
+    if oneway == 'no':
+        return True, True
+    # Motorways and roundabouts are one-way unless tagged otherwise
+    implied = tags.get('highway') in ('motorway', 'motorway_link') or tags.get('junction') == 'roundabout'
+    return True, not implied
+
+
+def read_geojson_roads(path: str) -> Iterator[Tuple[List[Tuple[float, float]], Dict]]:
+    """Yield ([(lat, lon), ...], tags) for each LineString of a GeoJSON export of OSM ways
+
+    Tags may be top-level properties (osmium/ogr2ogr export) or nested under
+    properties.tags (overpass-turbo export). Ways join where they share
+    exact vertex coordinates, as OSM nodes do.
+    """
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    for feature in collection.get('features', []):
+        properties = feature.get('properties') or {}
+        tags = properties.get('tags') or properties
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'LineString':
+            lines = [geometry.get('coordinates')]
+        elif geometry.get('type') == 'MultiLineString':
+            lines = geometry.get('coordinates')
+        else:
+            continue
+        for line in lines or []:
+            if line and len(line) > 1:
+                yield [(pair[1], pair[0]) for pair in line], tags
+
+
+def read_pbf_roads(path: str) -> Iterator[Tuple[List[Tuple[float, float]], Dict]]:
+    """Yield ([(lat, lon), ...], tags) for each highway way of an OSM PBF extract (requires osmium)"""
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("Reading .pbf extracts requires the 'osmium' package; "
+                           "install it or convert the extract to GeoJSON")
+
+    ways = []
+
+    class RoadHandler(osmium.SimpleHandler):
+        def way(self, way):
+            if way.tags.get('highway') not in ROAD_SPEEDS_KMH:
+                return
+            points = [(n.location.lat, n.location.lon) for n in way.nodes if n.location.valid()]
+            if len(points) > 1:
+                ways.append((points, {tag.k: tag.v for tag in way.tags}))
+
+    RoadHandler().apply_file(path, locations=True)
+    return iter(ways)
+
+
+def build_road_network(ways: Iterator[Tuple[List[Tuple[float, float]], Dict]]
+                       ) -> Tuple[List[Tuple[float, float]], List[Tuple[int, int, float, float]]]:
+    """Nodes and directed (source, target, seconds, meters) edges of the largest connected road network
+
+    Unroutable highway classes are skipped, and so are islands (ferry-only
+    places, unconnected fragments at the extract border) that would catch
+    snapped points with no route out.
+    """
+    node_ids = {}
+    nodes = []
+    edges = []
+
+    for points, tags in ways:
+        speed = ROAD_SPEEDS_KMH.get(tags.get('highway'))
+        if not speed:
+            continue
+        maxspeed = _maxspeed_kmh(tags.get('maxspeed'))
+        if maxspeed:
+            speed = min(speed, maxspeed)
+        forward, backward = _road_directions(tags)
+
+        previous = None
+        for lat, lon in points:
+            key = (round(lat, 7), round(lon, 7))
+            node = node_ids.get(key)
+            if node is None:
+                node = node_ids[key] = len(nodes)
+                nodes.append((lat, lon))
+            if previous is not None and previous != node:
+                meters = haversine_meters(*nodes[previous], lat, lon)
+                seconds = meters / (speed / 3.6)
+                if forward:
+                    edges.append((previous, node, seconds, meters))
+                if backward:
+                    edges.append((node, previous, seconds, meters))
+            previous = node
+
+    # Largest weakly connected component (union-find)
+    parent = list(range(len(nodes)))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for source, target, _, _ in edges:
+        root_source, root_target = find(source), find(target)
+        if root_source != root_target:
+            parent[root_source] = root_target
+
+    sizes = {}
+    for node in range(len(nodes)):
+        root = find(node)
+        sizes[root] = sizes.get(root, 0) + 1
+    if not sizes:
+        return [], []
+    largest = max(sizes, key=sizes.get)
+
+    renumbered = {}
+    kept_nodes = []
+    for node in range(len(nodes)):
+        if find(node) == largest:
+            renumbered[node] = len(kept_nodes)
+            kept_nodes.append(nodes[node])
+    kept_edges = [(renumbered[source], renumbered[target], seconds, meters)
+                  for source, target, seconds, meters in edges if source in renumbered]
+
+    return kept_nodes, kept_edges
+
+
+def import_road_extract(source_path: str, graph_path: Optional[str] = None) -> Tuple[int, int]:
+    """Build the road graph from a GeoJSON or PBF extract; returns (nodes, edges)"""
+    from config import Config
+
+    graph_path = graph_path or Config.ROAD_GRAPH_PATH
+    ways = read_pbf_roads(source_path) if source_path.endswith('.pbf') else read_geojson_roads(source_path)
+    nodes, edges = build_road_network(ways)
+    node_count, edge_count = build_road_graph(nodes, edges, graph_path)
+    logger.info(f"Built road graph with {node_count} nodes and {edge_count} edges from {source_path} into {graph_path}")
+    return node_count, edge_count
+
+
+def road_graph_version() -> Optional[float]:
+    """Modification time of the road graph file (None if not built)"""
+    from config import Config
+
+    try:
+        return os.path.getmtime(Config.ROAD_GRAPH_PATH)
+    except OSError:
+        return None
+
+
+def get_road_graph() -> Optional[RoadGraph]:
+    """Process-wide road graph, reopened when the file is rebuilt (None if not built)"""
+    global _graph, _graph_mtime
+    from config import Config
+
+    path = Config.ROAD_GRAPH_PATH
+    mtime = road_graph_version()
+    if mtime is None:
+        return None
+
+    if _graph is None or _graph_mtime != mtime:
+        with _graph_lock:
+            if _graph is None or _graph_mtime != mtime:
+                try:
+                    _graph = RoadGraph(path)
+                    _graph_mtime = mtime
+                    logger.info(f"Loaded road graph with {len(_graph)} nodes from {path}")
+                except Exception as e:
+                    logger.error(f"Failed to open road graph {path}: {str(e)}")
+                    return None
+    return _graph
+
+
+def route_many(lat: float, lon: float, destinations: List[Tuple[float, float]]) -> Optional[List[Optional[Dict]]]:
+    """Driving time (min) and distance (km) from a point to each destination, in one graph search
+
+    Returns None when no road graph is built; destinations too far from any
+    road (ROAD_ROUTER_MAX_SNAP_METERS) or unreachable are None.
+    """
+    from config import Config
+
+    graph = get_road_graph()
+    if graph is None or not len(graph):
+        return None
+
+    max_snap = Config.ROAD_ROUTER_MAX_SNAP_METERS
+    source, source_snap = graph.nearest_node(lat, lon)
+    if source_snap > max_snap:
+        return [None] * len(destinations)
+
+    snapped = [graph.nearest_node(dest_lat, dest_lon) for dest_lat, dest_lon in destinations]
+    paths = graph.shortest_paths(source, {node for node, snap in snapped if snap <= max_snap})
+
+    results = []
+    for node, snap in snapped:
+        if snap > max_snap or node not in paths:
+            results.append(None)
+            continue
+        seconds, meters = paths[node]
+        access_meters = source_snap + snap
+        seconds += access_meters / (ACCESS_SPEED_KMH / 3.6)
+        meters += access_meters
+        results.append({
+            'time': round(seconds / 60),  # seconds to minutes
+            'distance': round(meters / 1000)  # meters to kilometers
+        })
+    return results
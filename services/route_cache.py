@@ -0,0 +1,216 @@
+"""Persistent travel time results in the route_cache table
+
+Routes are keyed by origin grid cell (ROUTE_CACHE_GRID_METERS), destination
+and mode, and are reused until ROUTE_CACHE_TTL_DAYS old. TravelTimeService
+reads them before calling any provider and writes back what Google and the
+local road graph return; estimates are never stored. Road graph routes
+older than the graph file are ignored, so rebuilding the graph takes effect
+at once.
+
+Each call uses its own short-lived session, so reading or writing the cache
+never flushes or commits the caller's pending changes (enrichment commits a
+land exactly once). Failures are logged and treated as misses.
+
+Warm starts: manage_route_cache.py exports the table to CSV and loads it
+back on another database.
+"""
+import csv
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from utils.cache import coordinate_cell
+
+logger = logging.getLogger(__name__)
+
+CSV_FIELDS = ['origin_cell', 'destination', 'mode', 'travel_time', 'distance', 'provider', 'fetched_at']
+QUERY_CHUNK = 500
+
+
+def route_cell(lat: float, lon: float) -> str:
+    """Cache key cell of an origin"""
+    from config import Config
+    return coordinate_cell(lat, lon, Config.ROUTE_CACHE_GRID_METERS)
+
+
+def _cutoff() -> datetime:
+    from config import Config
+    return datetime.utcnow() - timedelta(days=Config.ROUTE_CACHE_TTL_DAYS)
+
+
+def _valid_routes():
+    """Filter for unexpired routes, leaving out road graph routes computed before the current graph"""
+    from models import RouteCache
+    from services.road_router import road_graph_version
+
+    condition = RouteCache.fetched_at >= _cutoff()
+    graph_mtime = road_graph_version()
+    if graph_mtime is not None:
+        graph_built = datetime.fromtimestamp(graph_mtime, timezone.utc).replace(tzinfo=None)
+        condition = and_(condition, or_(RouteCache.provider != 'road_graph', RouteCache.fetched_at >= graph_built))
+    return condition
+
+
+def _chunks(items: List, size: int = QUERY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def get_cached_routes(origins: Iterable[Tuple[float, float]], destinations: Iterable[str],
+                      mode: str = 'driving') -> Dict[Tuple[float, float], Dict[str, Dict]]:
+    """Unexpired cached routes by (lat, lon) origin and destination, as {'time', 'distance'}"""
+    cells = {}
+    for lat, lon in dict.fromkeys(origins):
+        cells.setdefault(route_cell(lat, lon), []).append((lat, lon))
+    destinations = list(dict.fromkeys(destinations))
+    results = {origin: {} for cell_origins in cells.values() for origin in cell_origins}
+    if not cells or not destinations:
+        return results
+
+    try:
+        from app import db
+        from models import RouteCache
+
+        with Session(db.engine) as session:
+            for cell_chunk in _chunks(list(cells)):
+                rows = session.query(RouteCache).filter(
+                    RouteCache.origin_cell.in_(cell_chunk),
+                    RouteCache.destination.in_(destinations),
+                    RouteCache.mode == mode,
+                    _valid_routes()
+                ).all()
+                for row in rows:
+                    for origin in cells[row.origin_cell]:
+                        results[origin][row.destination] = {'time': row.travel_time, 'distance': row.distance}
+    except Exception as e:
+        logger.warning(f"Route cache lookup failed: {str(e)}")
+        return {origin: {} for origin in results}
+
+    return results
+
+
+def _upsert_routes(session: Session, rows: List[Dict]) -> int:
+    """Insert route rows, replacing older rows with the same key; returns the rows given"""
+    from models import RouteCache
+
+    rows = list({(row['origin_cell'], row['destination'], row['mode']): row for row in rows}.values())
+    for chunk in _chunks(rows):
+        existing = {
+            (route.origin_cell, route.destination, route.mode): route
+            for route in session.query(RouteCache).filter(
+                RouteCache.origin_cell.in_({row['origin_cell'] for row in chunk}),
+                RouteCache.destination.in_({row['destination'] for row in chunk})
+            )
+        }
+        for row in chunk:
+            route = existing.get((row['origin_cell'], row['destination'], row['mode']))
+            if route is None:
+                session.add(RouteCache(**row))
+            elif row['fetched_at'] >= route.fetched_at:
+                for field, value in row.items():
+                    setattr(route, field, value)
+    session.commit()
+    return len(rows)
+
+
+def store_routes(results: Dict[Tuple[float, float], Dict[str, Optional[Dict]]], provider: str,
+                 mode: str = 'driving') -> int:
+    """Cache routed results by (lat, lon) origin and destination; None results are skipped"""
+    now = datetime.utcnow()
+    rows = [
+        {'origin_cell': route_cell(lat, lon), 'destination': destination, 'mode': mode,
+         'travel_time': result['time'], 'distance': result.get('distance'), 'provider': provider, 'fetched_at': now}
+        for (lat, lon), origin_results in results.items()
+        for destination, result in origin_results.items() if result
+    ]
+    if not rows:
+        return 0
+
+    try:
+        from app import db
+
+        with Session(db.engine) as session:
+            return _upsert_routes(session, rows)
+    except Exception as e:
+        # Concurrent writers may race on a key; the route is simply fetched again later
+        logger.warning(f"Could not store {len(rows)} {provider} routes in the route cache: {str(e)}")
+        return 0
+
+
+def purge_expired_routes() -> int:
+    """Delete routes older than the TTL or the road graph; returns the number deleted"""
+    from app import db
+    from models import RouteCache
+
+    with Session(db.engine) as session:
+        deleted = session.query(RouteCache).filter(~_valid_routes()).delete(synchronize_session=False)
+        session.commit()
+    logger.info(f"Purged {deleted} expired routes from the route cache")
+    return deleted
+
+
+def export_routes(path: str) -> int:
+    """Write every unexpired route to a CSV file; returns the number of rows"""
+    from app import db
+    from models import RouteCache
+
+    count = 0
+    with Session(db.engine) as session, open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        query = session.query(RouteCache).filter(_valid_routes()).order_by(RouteCache.id)
+        for route in query.yield_per(QUERY_CHUNK):
+            row = {field: getattr(route, field) for field in CSV_FIELDS}
+            row['fetched_at'] = route.fetched_at.isoformat()
+            writer.writerow(row)
+            count += 1
+    logger.info(f"Exported {count} routes to {path}")
+    return count
+
+
+def load_routes(path: str, batch_size: int = 5000) -> int:
+    """Bulk-load routes from an export_routes CSV, keeping each row's fetched_at; returns the rows loaded
+
+    Routes already cached with the same key are replaced only by newer rows;
+    expired rows are skipped.
+    """
+    from app import db
+
+    cutoff = _cutoff()
+    loaded = 0
+    batch = []
+    with Session(db.engine) as session, open(path, newline='', encoding='utf-8') as f:
+        for record in csv.DictReader(f):
+            fetched_at = datetime.fromisoformat(record['fetched_at'])
+            if fetched_at < cutoff:
+                continue
+            batch.append({
+                'origin_cell': record['origin_cell'],
+                'destination': record['destination'],
+                'mode': record['mode'] or 'driving',
+                'travel_time': int(record['travel_time']) if record['travel_time'] else None,
+                'distance': int(record['distance']) if record['distance'] else None,
+                'provider': record['provider'],
+                'fetched_at': fetched_at,
+            })
+            if len(batch) >= batch_size:
+                loaded += _upsert_routes(session, batch)
+                batch = []
+        if batch:
+            loaded += _upsert_routes(session, batch)
+    logger.info(f"Loaded {loaded} routes from {path}")
+    return loaded
+
+
+def get_route_cache_stats() -> Dict:
+    """Route counts by provider, and how many have expired (purge_expired_routes deletes them)"""
+    from app import db
+    from models import RouteCache
+    from sqlalchemy import func
+
+    with Session(db.engine) as session:
+        by_provider = dict(session.query(RouteCache.provider, func.count(RouteCache.id))
+                           .group_by(RouteCache.provider).all())
+        expired = session.query(func.count(RouteCache.id)).filter(~_valid_routes()).scalar()
+    return {'total': sum(by_provider.values()), 'by_provider': by_provider, 'expired': expired}
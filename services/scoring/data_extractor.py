@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, Any, Optional
 from services.scoring.config_manager import ScoringConfigManager
+from utils.keyword_matcher import keyword_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +28,13 @@ class LandDataExtractor:
         
         # Then check description for missing utilities
         description = (land.description or "").lower()
+        missing = [utility for utility in result if not result[utility]]
         
-        for utility in result.keys():
-            if not result[utility]:  # Only check if not already found
-                keywords = self.config_manager.get_infrastructure_keywords(utility)
-                if any(keyword in description for keyword in keywords):
+        if missing:
+            matcher = keyword_matcher({utility: self.config_manager.get_infrastructure_keywords(utility)
+                                       for utility in result})
+            for utility in matcher.matches(description):
+                if not result[utility]:  # Only report utilities not already found
                     result[utility] = True
                     logger.debug(f"Found {utility} in description for land {land.id}")
         
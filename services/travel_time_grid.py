@@ -0,0 +1,280 @@
+"""Precomputed drive times from a regular grid over the region to every destination
+
+build_travel_time_grid.py runs one reverse search on the road graph per
+destination (every node's route *to* it) and samples the result at the centre
+of each grid cell, so a travel time query becomes an array lookup with
+bilinear interpolation between the four surrounding cell centres, and "lands
+within X minutes of Y" is answered from the grid with no routing at all.
+
+File layout: 8-byte magic, uint32 header length, JSON header (bounds, cell
+steps, rows, cols, destinations), padding to 8 bytes, then float32 minutes
+and float32 kilometers, each rows x cols x destinations. NaN marks cells
+with no route (sea, too far from a road).
+"""
+import os
+import json
+import math
+import struct
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.road_router import ACCESS_SPEED_KMH, get_road_graph
+from utils.spatial_index import METERS_PER_DEGREE
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TTGRID01'
+
+_grid = None
+_grid_mtime = None
+_grid_lock = threading.Lock()
+
+
+def build_travel_time_grid(path: Optional[str] = None) -> Tuple[int, int]:
+    """Route every grid cell to every destination on the road graph; returns (cells, destinations)"""
+    from config import Config
+    from services.travel_time_matrix import TravelTimeMatrix
+
+    path = path or Config.TRAVEL_TIME_GRID_PATH
+    graph = get_road_graph()
+    if graph is None or not len(graph):
+        raise RuntimeError("Building the travel time grid requires the road graph; run import_osm_roads.py first")
+
+    south, west, north, east = Config.TRAVEL_TIME_GRID_BOUNDS
+    cell_meters = Config.TRAVEL_TIME_GRID_CELL_METERS
+    lat_step = cell_meters / METERS_PER_DEGREE
+    lon_step = cell_meters / (METERS_PER_DEGREE * math.cos(math.radians((south + north) / 2)))
+    rows = max(1, math.ceil((north - south) / lat_step))
+    cols = max(1, math.ceil((east - west) / lon_step))
+
+    matrix = TravelTimeMatrix()
+    destinations = matrix.destinations
+    max_snap = Config.ROAD_ROUTER_MAX_SNAP_METERS
+    access_speed = ACCESS_SPEED_KMH / 3.6
+
+    # Snap every cell centre once; cells beyond the snap distance stay NaN
+    cells = []
+    for row in range(rows):
+        lat = south + (row + 0.5) * lat_step
+        for col in range(cols):
+            node, snap = graph.nearest_node(lat, west + (col + 0.5) * lon_step)
+            if snap <= max_snap:
+                cells.append((row * cols + col, node, snap))
+
+    minutes = np.full((rows * cols, len(destinations)), np.nan, dtype=np.float32)
+    kilometers = np.full((rows * cols, len(destinations)), np.nan, dtype=np.float32)
+
+    for column, (dest_lat, dest_lon) in enumerate(matrix.coordinates.tolist()):
+        dest_node, dest_snap = graph.nearest_node(dest_lat, dest_lon)
+        if dest_snap > max_snap:
+            logger.warning(f"{destinations[column]} is {dest_snap:.0f} m from the nearest road; left out of the grid")
+            continue
+        paths = graph.shortest_paths(dest_node, reverse=True)
+        for cell, node, snap in cells:
+            path_result = paths.get(node)
+            if path_result is None:
+                continue
+            seconds, meters = path_result
+            access_meters = snap + dest_snap
+            minutes[cell, column] = (seconds + access_meters / access_speed) / 60
+            kilometers[cell, column] = (meters + access_meters) / 1000
+        logger.info(f"Gridded travel times to {destinations[column]} ({column + 1}/{len(destinations)})")
+
+    header = json.dumps({
+        'south': south, 'west': west, 'lat_step': lat_step, 'lon_step': lon_step,
+        'rows': rows, 'cols': cols, 'destinations': destinations
+    }).encode('utf-8')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file and rename, so readers never see a partial grid
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(b'\0' * (-f.tell() % 8))
+        minutes.astype('<f4').tofile(f)
+        kilometers.astype('<f4').tofile(f)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Built travel time grid of {rows}x{cols} cells x {len(destinations)} destinations into {path}")
+    return rows * cols, len(destinations)
+
+
+class TravelTimeGrid:
+    """Read-only, memory-mapped travel time grid"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(8) != MAGIC:
+                raise ValueError(f"{path} is not a travel time grid file")
+            header_length = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+        self.south = header['south']
+        self.west = header['west']
+        self.lat_step = header['lat_step']
+        self.lon_step = header['lon_step']
+        self.rows = header['rows']
+        self.cols = header['cols']
+        self.destinations = header['destinations']
+        self.column_index = {destination: i for i, destination in enumerate(self.destinations)}
+
+        offset = 12 + header_length
+        offset += -offset % 8
+        shape = (self.rows, self.cols, len(self.destinations))
+        self.minutes = np.memmap(path, dtype='<f4', mode='r', offset=offset, shape=shape)
+        self.kilometers = np.memmap(path, dtype='<f4', mode='r', offset=offset + self.minutes.nbytes, shape=shape)
+
+    def __len__(self) -> int:
+        return self.rows * self.cols
+
+    def contains(self, lat: float, lon: float) -> bool:
+        return (self.south <= lat < self.south + self.rows * self.lat_step
+                and self.west <= lon < self.west + self.cols * self.lon_step)
+
+    def _interpolate(self, values: np.ndarray, lat: float, lon: float) -> np.ndarray:
+        """Bilinear value at a point for every destination column; NaN where no cell has a route
+
+        Where a surrounding cell centre has no route the nearest cell's value
+        is used as is.
+        """
+        y = min(max((lat - self.south) / self.lat_step - 0.5, 0.0), self.rows - 1.0)
+        x = min(max((lon - self.west) / self.lon_step - 0.5, 0.0), self.cols - 1.0)
+        row, col = min(int(y), max(self.rows - 2, 0)), min(int(x), max(self.cols - 2, 0))
+        dy, dx = y - row, x - col
+        row1, col1 = min(row + 1, self.rows - 1), min(col + 1, self.cols - 1)
+
+        result = (values[row, col] * (1 - dy) * (1 - dx) + values[row, col1] * (1 - dy) * dx
+                  + values[row1, col] * dy * (1 - dx) + values[row1, col1] * dy * dx)
+        nearest = values[int(round(y)), int(round(x))]
+        return np.where(np.isnan(result), nearest, result)
+
+    def travel_times(self, lat: float, lon: float) -> Dict[str, Optional[Dict]]:
+        """Travel time (min) and distance (km) to every gridded destination; empty outside the grid"""
+        if not self.contains(lat, lon):
+            return {}
+        minutes = self._interpolate(self.minutes, lat, lon)
+        kilometers = self._interpolate(self.kilometers, lat, lon)
+
+        results = {}
+        for destination, time, distance in zip(self.destinations, minutes.tolist(), kilometers.tolist()):
+            if math.isnan(time) or math.isnan(distance):
+                results[destination] = None
+            else:
+                results[destination] = {'time': round(time), 'distance': round(distance)}
+        return results
+
+    def lands_within(self, destinations: List[str], minutes: float) -> List[int]:
+        """Ids of lands whose interpolated time to the closest of destinations is at most minutes
+
+        The cells in reach bound the database query to a bounding box; only
+        the lands inside it are looked up individually. Call inside an app
+        context.
+        """
+        from app import db
+        from models import Land
+
+        columns = [self.column_index[d] for d in destinations if d in self.column_index]
+        if not columns:
+            return []
+
+        with np.errstate(invalid='ignore'):
+            reachable = np.fmin.reduce(self.minutes[:, :, columns], axis=2) <= minutes
+        rows = np.flatnonzero(reachable.any(axis=1))
+        cols = np.flatnonzero(reachable.any(axis=0))
+        if not len(rows):
+            return []
+
+        # Interpolation reaches half a cell past the outermost reachable centre
+        south = self.south + max(int(rows[0]) - 1, 0) * self.lat_step
+        north = self.south + min(int(rows[-1]) + 2, self.rows) * self.lat_step
+        west = self.west + max(int(cols[0]) - 1, 0) * self.lon_step
+        east = self.west + min(int(cols[-1]) + 2, self.cols) * self.lon_step
+
+        candidates = db.session.query(Land.id, Land.location_lat, Land.location_lon).filter(
+            Land.location_lat.between(south, north), Land.location_lon.between(west, east)
+        ).all()
+
+        land_ids = []
+        for land_id, lat, lon in candidates:
+            lat, lon = float(lat), float(lon)
+            if not self.contains(lat, lon):
+                continue
+            times = self._interpolate(self.minutes, lat, lon)[columns]
+            if np.nanmin(times, initial=np.inf) <= minutes:
+                land_ids.append(land_id)
+        return land_ids
+
+
+def travel_time_grid_version() -> Optional[float]:
+    """Modification time of the travel time grid file (None if not built)"""
+    from config import Config
+
+    try:
+        return os.path.getmtime(Config.TRAVEL_TIME_GRID_PATH)
+    except OSError:
+        return None
+
+
+def get_travel_time_grid() -> Optional[TravelTimeGrid]:
+    """Process-wide travel time grid, reopened when the file is rebuilt (None if not built)"""
+    global _grid, _grid_mtime
+    from config import Config
+
+    path = Config.TRAVEL_TIME_GRID_PATH
+    mtime = travel_time_grid_version()
+    if mtime is None:
+        return None
+
+    if _grid is None or _grid_mtime != mtime:
+        with _grid_lock:
+            if _grid is None or _grid_mtime != mtime:
+                try:
+                    _grid = TravelTimeGrid(path)
+                    _grid_mtime = mtime
+                    logger.info(f"Loaded travel time grid of {_grid.rows}x{_grid.cols} cells from {path}")
+                except Exception as e:
+                    logger.error(f"Failed to open travel time grid {path}: {str(e)}")
+                    return None
+    return _grid
+
+
+def grid_destinations(target: str) -> List[str]:
+    """Destinations a 'within X minutes of' target stands for
+
+    A key destination ('oviedo'), a facility type ('beach', 'airport', ...
+    meaning the closest one) or a full destination name.
+    """
+    from services.travel_time_service import TravelTimeService
+
+    travel_service = TravelTimeService()
+    key = target.strip().lower()
+    if key in travel_service.destinations:
+        return [travel_service.destinations[key]]
+    facility_lists = travel_service._facility_lists()
+    if key in facility_lists:
+        return list(facility_lists[key])
+    return [target.strip()]
+
+
+def land_ids_within_minutes(target: str, minutes: float) -> List[int]:
+    """Ids of lands within minutes of a target (see grid_destinations), answered from the grid
+
+    Raises ValueError when the grid is not built or does not cover the target.
+    """
+    grid = get_travel_time_grid()
+    if grid is None:
+        raise ValueError("Travel time grid not built; run build_travel_time_grid.py")
+
+    destinations = [d for d in grid_destinations(target) if d in grid.column_index]
+    if not destinations:
+        raise ValueError(f"Unknown travel time destination: {target}")
+    return grid.lands_within(destinations, minutes)
@@ -0,0 +1,142 @@
+"""Vectorized estimated travel times for whole-table recomputation
+
+TravelTimeService estimates one origin/destination pair at a time. Here all
+lands and destinations are handled at once: an N x 2 array of land
+coordinates and an M x 2 array of destination coordinates give N x M
+distance and time matrices through NumPy broadcasting, with the same speed
+tiers, detour factor and rounding as _calculate_fallback_travel_time.
+
+Used after the speed model changes or a destination is added:
+
+    python recompute_travel_times.py
+"""
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.travel_time_service import (
+    EARTH_RADIUS_KM, HIGHWAY_SPEED_KMH, ROAD_DETOUR_FACTOR, SPEED_TIERS_KMH, TravelTimeService
+)
+
+logger = logging.getLogger(__name__)
+
+
+def haversine_matrix(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km between N origins and M destinations ((lat, lon) rows) as N x M"""
+    origins = np.radians(np.asarray(origins, dtype=np.float64))
+    destinations = np.radians(np.asarray(destinations, dtype=np.float64))
+
+    lat1, lon1 = origins[:, 0:1], origins[:, 1:2]
+    lat2, lon2 = destinations[:, 0], destinations[:, 1]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS_KM
+
+
+def estimate_travel_matrix(origins: np.ndarray, destinations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Estimated road distance (km) and travel time (min) matrices, rounded like the scalar estimate"""
+    distance_km = haversine_matrix(origins, destinations)
+
+    speed = np.select([distance_km < max_km for max_km, _ in SPEED_TIERS_KMH],
+                      [speed for _, speed in SPEED_TIERS_KMH], HIGHWAY_SPEED_KMH)
+    road_km = distance_km * ROAD_DETOUR_FACTOR
+
+    # np.rint rounds half to even, as round() does
+    return np.rint(road_km).astype(np.int64), np.rint(road_km / speed * 60).astype(np.int64)
+
+
+class TravelTimeMatrix:
+    """Estimated travel time columns for many lands to TravelTimeService's destinations"""
+
+    def __init__(self, travel_service: Optional[TravelTimeService] = None):
+        self.travel_service = travel_service or TravelTimeService()
+
+        # Matrix columns: every destination with known coordinates
+        destinations = list(self.travel_service.destinations.values())
+        for facilities in self.travel_service._facility_lists().values():
+            destinations += facilities
+
+        self.destinations = []
+        coordinates = []
+        for destination in dict.fromkeys(destinations):
+            coords = self.travel_service._get_destination_coordinates(destination)
+            if coords:
+                self.destinations.append(destination)
+                coordinates.append(coords)
+            else:
+                logger.warning(f"No coordinates for {destination}; left out of estimated travel times")
+        self.coordinates = np.array(coordinates, dtype=np.float64).reshape(-1, 2)
+        self.column_index = {destination: i for i, destination in enumerate(self.destinations)}
+
+    def compute(self, origins: np.ndarray) -> List[Dict]:
+        """Travel time columns for each (lat, lon) origin row, as compute_travel_times would estimate them
+
+        Nearest facilities are chosen among all candidates of each type.
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+        distance, minutes = estimate_travel_matrix(origins, self.coordinates)
+        rows = np.arange(len(origins))
+        columns = {}
+
+        for key, column in (('oviedo', 'travel_time_oviedo'), ('gijon', 'travel_time_gijon')):
+            index = self.column_index.get(self.travel_service.destinations[key])
+            if index is not None:
+                columns[column] = minutes[:, index].tolist()
+
+        for facility_type, facilities in self.travel_service._facility_lists().items():
+            indexes = [self.column_index[f] for f in facilities if f in self.column_index]
+            if not indexes:
+                continue
+            # argmin keeps the first of equal times, like min() over the list
+            nearest = np.asarray(indexes)[np.argmin(minutes[:, indexes], axis=1)]
+
+            if facility_type == 'beach':
+                columns['travel_time_nearest_beach'] = minutes[rows, nearest].tolist()
+                names = [self.travel_service._beach_name(beach) for beach in self.destinations]
+                columns['nearest_beach_name'] = [names[i] for i in nearest.tolist()]
+            else:
+                columns[f'travel_time_{facility_type}'] = minutes[rows, nearest].tolist()
+                columns[f'distance_{facility_type}'] = distance[rows, nearest].tolist()
+
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def recompute_estimated_travel_times(batch_size: int = 5000, missing_only: bool = False) -> int:
+    """Overwrite every land's travel time columns with vectorized estimates
+
+    Google-routed values are replaced too; pass missing_only to fill only
+    lands without an Oviedo travel time. Call inside an app context.
+    Returns the number of lands updated.
+    """
+    from app import db
+    from models import Land
+
+    query = db.session.query(Land.id, Land.location_lat, Land.location_lon).filter(
+        Land.location_lat.isnot(None), Land.location_lon.isnot(None)
+    )
+    if missing_only:
+        query = query.filter(Land.travel_time_oviedo.is_(None))
+    rows = query.order_by(Land.id).all()
+
+    matrix = TravelTimeMatrix()
+    started = time.monotonic()
+    updated = 0
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        origins = np.array([(float(lat), float(lon)) for _, lat, lon in batch], dtype=np.float64)
+
+        mappings = matrix.compute(origins)
+        for (land_id, _, _), mapping in zip(batch, mappings):
+            mapping['id'] = land_id
+
+        db.session.bulk_update_mappings(Land, mappings)
+        db.session.commit()
+        updated += len(mappings)
+        logger.info(f"Recomputed travel times for {updated}/{len(rows)} lands")
+
+    logger.info(f"Recomputed travel times for {updated} lands x {len(matrix.destinations)} destinations "
+                f"in {time.monotonic() - started:.1f}s")
+    return updated
@@ -1,114 +1,77 @@
 import os
 import logging
-import requests
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence, Tuple
+from services.destination_catalog import get_destination_catalog
+from utils.circuit_breaker import report_provider_status
+from utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Estimated travel times (no routing): straight-line distance tiers with average
+# road speeds - <20 km local roads and traffic, 20-50 km mixed roads, beyond
+# that highways - and a detour factor for actual road routes vs straight line.
+# Shared with the vectorized engine in travel_time_matrix.
+SPEED_TIERS_KMH = ((20, 45), (50, 55))
+HIGHWAY_SPEED_KMH = 65
+ROAD_DETOUR_FACTOR = 1.2
+EARTH_RADIUS_KM = 6371
+
+# Distance Matrix per-request limits
+MATRIX_MAX_ORIGINS = 25
+MATRIX_MAX_DESTINATIONS = 25
+MATRIX_MAX_ELEMENTS = 100
+
 class TravelTimeService:
     def __init__(self):
         # Use existing secret names with fallback to standard names
         self.google_maps_key = os.environ.get("Google_api") or os.environ.get("GOOGLE_MAPS_API") or os.environ.get("GOOGLE_MAPS_API_KEY")
         
+        # Destinations by category from the catalog file (services.destination_catalog)
+        self.catalog = get_destination_catalog()
+        
         # Key destinations
-        self.destinations = {
-            'oviedo': 'Oviedo, Asturias, Spain',
-            'gijon': 'Gijón, Asturias, Spain'
-        }
+        self.destinations = dict(self.catalog.keys)
+        
+        # Beaches in Asturias and Cantabria, and key infrastructure locations
+        self.beaches = self.catalog.names('beach')
+        self.airports = self.catalog.names('airport')
+        self.train_stations = self.catalog.names('train_station')
+        self.hospitals = self.catalog.names('hospital')
+        self.police_stations = self.catalog.names('police')
         
-        # Popular beaches in Asturias and Cantabria
-        self.beaches = [
-            'Playa de San Lorenzo, Gijón, Spain',
-            'Playa de Rodiles, Villaviciosa, Spain',
-            'Playa de Gulpiyuri, Llanes, Spain',
-            'Playa del Sardinero, Santander, Spain',
-            'Playa de Comillas, Cantabria, Spain',
-            'Playa de Oyambre, Comillas, Spain',
-            'Playa de la Concha de Artedo, Cudillero, Spain',
-            'Playa de Ribadesella, Asturias, Spain'
-        ]
-        
-        # Key infrastructure locations
-        self.airports = [
-            'Santander Airport, Santander, Spain',
-            'Asturias Airport, Santiago del Monte, Spain',
-            'Bilbao Airport, Loiu, Spain'
-        ]
-        
-        self.train_stations = [
-            'Santander Railway Station, Santander, Spain',
-            'Oviedo Railway Station, Oviedo, Spain',
-            'Gijón Railway Station, Gijón, Spain'
-        ]
-        
-        self.hospitals = [
-            'Hospital Universitario Marqués de Valdecilla, Santander, Spain',
-            'Hospital Universitario Central de Asturias, Oviedo, Spain',
-            'Hospital Cabueñes, Gijón, Spain'
-        ]
-        
-        self.police_stations = [
-            'Policía Nacional Santander, Spain',
-            'Policía Nacional Oviedo, Spain', 
-            'Policía Nacional Gijón, Spain'
-        ]
-    
-    def calculate_travel_times(self, land_id: int) -> bool:
-        """Calculate travel times for a land property"""
+        # Google results by (lat, lon) and destination, fetched ahead of time by prefetch_travel_times
+        self._prefetched = {}
+    
+    def calculate_travel_times(self, land, commit: bool = True) -> bool:
+        """Calculate travel times for a land property
+        
+        Accepts a loaded Land (or its id). Pass commit=False to leave the
+        commit to a caller that is already updating the row.
+        """
+        land_id = getattr(land, 'id', land)
         try:
             from models import Land
             from app import db
             
-            land = Land.query.get(land_id)
+            if not isinstance(land, Land):
+                land = Land.query.get(land_id)
             if not land or not land.location_lat or not land.location_lon:
                 logger.warning(f"Land {land_id} has no coordinates")
                 return False
             
             logger.info(f"Calculating travel times for land {land_id}")
             
-            origin = f"{land.location_lat},{land.location_lon}"
-            
-            # Calculate times to Oviedo and Gijón
-            oviedo_time = self._get_travel_time(origin, self.destinations['oviedo'])
-            gijon_time = self._get_travel_time(origin, self.destinations['gijon'])
-            
-            # Find nearest beach
-            nearest_beach_data = self._find_nearest_beach(origin)
-            
-            # Calculate times and distances to key infrastructure (priority locations)
-            airport_data = self._find_nearest_facility_with_distance(origin, self.airports)
-            train_station_data = self._find_nearest_facility_with_distance(origin, self.train_stations)
-            hospital_data = self._find_nearest_facility_with_distance(origin, self.hospitals)
-            police_data = self._find_nearest_facility_with_distance(origin, self.police_stations)
-            
-            # Update land record
-            if oviedo_time is not None:
-                land.travel_time_oviedo = oviedo_time
-            if gijon_time is not None:
-                land.travel_time_gijon = gijon_time
-            if nearest_beach_data:
-                land.travel_time_nearest_beach = nearest_beach_data['time']
-                land.nearest_beach_name = nearest_beach_data['name']
-                
-            # Update priority infrastructure travel times and distances
-            if airport_data is not None:
-                land.travel_time_airport = airport_data['time']
-                land.distance_airport = airport_data['distance']
-            if train_station_data is not None:
-                land.travel_time_train_station = train_station_data['time']
-                land.distance_train_station = train_station_data['distance']
-            if hospital_data is not None:
-                land.travel_time_hospital = hospital_data['time']
-                land.distance_hospital = hospital_data['distance']
-            if police_data is not None:
-                land.travel_time_police = police_data['time']
-                land.distance_police = police_data['distance']
+            travel_data = self.compute_travel_times(float(land.location_lat), float(land.location_lon))
+            self.apply_travel_times(land, travel_data)
             
-            db.session.commit()
+            if commit:
+                db.session.commit()
             
             logger.info(f"Travel times updated for land {land_id}: "
-                       f"Oviedo: {oviedo_time}min, Gijón: {gijon_time}min, "
-                       f"Beach: {nearest_beach_data['time'] if nearest_beach_data else 'N/A'}min")
+                       f"Oviedo: {travel_data.get('travel_time_oviedo')}min, Gijón: {travel_data.get('travel_time_gijon')}min, "
+                       f"Beach: {travel_data.get('travel_time_nearest_beach', 'N/A')}min")
             
             return True
             
@@ -116,58 +79,382 @@ class TravelTimeService:
             logger.error(f"Failed to calculate travel times for land {land_id}: {str(e)}")
             return False
     
-    def _get_travel_time(self, origin: str, destination: str) -> Optional[int]:
+    def compute_travel_times(self, lat: float, lon: float) -> Dict:
+        """Compute travel time columns for a location without touching the database
+        
+        Returns a dict keyed by Land column name; only values that could be
+        determined are included. Safe to call from worker threads. Routes come
+        from the travel time grid, the route cache or the local road graph; the
+        rest go to Google as one Distance Matrix request, and whatever none of
+        them answers is estimated.
+        """
+        local_results = self._get_local_travel_times(lat, lon)
+        google_results = self._get_google_travel_times(lat, lon, local_results) if self.google_maps_key else {}
+        return self._build_travel_data(f"{lat},{lon}", {**google_results, **local_results})
+    
+    async def compute_travel_times_async(self, lat: float, lon: float, client) -> Dict:
+        """compute_travel_times with the Distance Matrix request sent on an AsyncHttpClient"""
+        import asyncio
+        
+        # Graph searches are CPU-bound and the route cache is a blocking query; keep them off the event loop
+        local_results = await asyncio.to_thread(self._get_local_travel_times, lat, lon)
+        google_results = await self._get_google_travel_times_async(lat, lon, client, local_results) \
+            if self.google_maps_key else {}
+        return self._build_travel_data(f"{lat},{lon}", {**google_results, **local_results})
+    
+    def prefetch_travel_times(self, locations: List[Tuple[float, float]]) -> int:
+        """Fetch Google travel times for many locations with multi-origin Distance Matrix requests
+        
+        Locations missing the same destinations from the route cache share
+        requests (up to the API's per-request element limit). Results are
+        stored in the route cache and used by later compute_travel_times()
+        calls on this service. Returns the number of requests sent; none when a local road
+        graph is built, since it answers first.
+        """
+        from services.road_router import get_road_graph
+        
+        self._prefetched = {}
+        if not self.google_maps_key or get_road_graph() is not None:
+            return 0
+        
+        from services.route_cache import get_cached_routes
+        
+        destinations = {(lat, lon): self._routed_destinations(f"{lat},{lon}") for lat, lon in locations}
+        cached = get_cached_routes(destinations, {d for routed in destinations.values() for d in routed})
+        
+        pending = {}
+        for location, routed in destinations.items():
+            self._prefetched[location] = cached[location]
+            missing = [destination for destination in routed if destination not in cached[location]]
+            if missing:
+                pending.setdefault(tuple(missing), []).append(location)
+        
+        request_count = 0
+        for missing, group in pending.items():
+            for origin_chunk, destination_chunk in self._matrix_chunks(group, list(missing)):
+                request_count += 1
+                fetched = self._fetch_google_matrix(origin_chunk, destination_chunk)
+                self._store_google_results(fetched)
+                for location, results in fetched.items():
+                    self._prefetched[location].update(results)
+        
+        if request_count:
+            logger.info(f"Prefetched travel times for {len(self._prefetched)} locations with {request_count} Distance Matrix requests")
+        return request_count
+    
+    def apply_travel_times(self, land, travel_data: Dict):
+        """Copy computed travel time columns onto a land record"""
+        for column, value in travel_data.items():
+            setattr(land, column, value)
+    
+    def _facility_lists(self) -> Dict[str, Sequence[str]]:
+        """Candidate facilities by type (keys of Config.TRAVEL_TIME_CANDIDATES)"""
+        return {
+            'beach': self.beaches,
+            'airport': self.airports,
+            'train_station': self.train_stations,
+            'hospital': self.hospitals,
+            'police': self.police_stations
+        }
+    
+    def _routed_destinations(self, origin: str) -> List[str]:
+        """Destinations looked up for an origin, in matrix column order"""
+        destinations = list(self.destinations.values())
+        for facility_type, facilities in self._facility_lists().items():
+            destinations += self._route_candidates(origin, facilities, facility_type)
+        return list(dict.fromkeys(destinations))
+    
+    def _route_candidates(self, origin: str, facilities: Sequence[str], facility_type: str) -> List[str]:
+        """The k nearest facilities by great-circle distance, the only ones worth routing to
+        
+        Facilities without known coordinates are always kept; the list order
+        is preserved. A catalog category is searched on its KD-tree.
+        """
+        from config import Config
+        
+        k = Config.TRAVEL_TIME_CANDIDATES.get(facility_type)
+        if not k or len(facilities) <= k:
+            return list(facilities)
+        
+        origin_lat, origin_lon = map(float, origin.split(','))
+        if facilities is self.catalog.names(facility_type):
+            nearest = self.catalog.nearest(origin_lat, origin_lon, facility_type, k)
+            return self.catalog.in_catalog_order(name for name, _ in nearest)
+        
+        ranked = []
+        for facility in facilities:
+            coords = self._get_destination_coordinates(facility)
+            if coords:
+                ranked.append((self._haversine_distance(origin_lat, origin_lon, *coords), facility))
+        
+        nearest = {facility for _, facility in sorted(ranked, key=lambda item: item[0])[:k]}
+        return [facility for facility in facilities
+                if facility in nearest or not self._get_destination_coordinates(facility)]
+    
+    def _build_travel_data(self, origin: str, routed_results: Dict[str, Optional[Dict]]) -> Dict:
+        """Travel time columns from Google results, estimating whatever Google did not answer"""
+        travel_data = {}
+        
+        # Calculate times to Oviedo and Gijón
+        oviedo_time = self._get_travel_time(origin, self.destinations['oviedo'], routed_results)
+        gijon_time = self._get_travel_time(origin, self.destinations['gijon'], routed_results)
+        
+        # Find nearest beach
+        nearest_beach_data = self._find_nearest_beach(origin, routed_results)
+        
+        # Calculate times and distances to key infrastructure (priority locations)
+        airport_data = self._find_nearest_facility_with_distance(origin, self.airports, routed_results, 'airport')
+        train_station_data = self._find_nearest_facility_with_distance(origin, self.train_stations, routed_results,
+                                                                       'train_station')
+        hospital_data = self._find_nearest_facility_with_distance(origin, self.hospitals, routed_results, 'hospital')
+        police_data = self._find_nearest_facility_with_distance(origin, self.police_stations, routed_results, 'police')
+        
+        if oviedo_time is not None:
+            travel_data['travel_time_oviedo'] = oviedo_time
+        if gijon_time is not None:
+            travel_data['travel_time_gijon'] = gijon_time
+        if nearest_beach_data:
+            travel_data['travel_time_nearest_beach'] = nearest_beach_data['time']
+            travel_data['nearest_beach_name'] = nearest_beach_data['name']
+        
+        # Priority infrastructure travel times and distances
+        for prefix, facility_data in (('airport', airport_data),
+                                      ('train_station', train_station_data),
+                                      ('hospital', hospital_data),
+                                      ('police', police_data)):
+            if facility_data is not None:
+                travel_data[f'travel_time_{prefix}'] = facility_data['time']
+                travel_data[f'distance_{prefix}'] = facility_data['distance']
+        
+        return travel_data
+    
+    def _get_travel_time(self, origin: str, destination: str, routed_results: Optional[Dict] = None) -> Optional[int]:
         """Get travel time in minutes between origin and destination"""
-        result = self._get_travel_time_and_distance(origin, destination)
+        result = self._get_travel_time_and_distance(origin, destination, routed_results)
         return result['time'] if result else None
     
-    def _get_travel_time_and_distance(self, origin: str, destination: str) -> Optional[Dict]:
-        """Get travel time in minutes and distance in km between origin and destination"""
-        # Try Google API first if available
-        if self.google_maps_key:
-            result = self._get_google_travel_time(origin, destination)
-            if result:
-                return result
+    def _get_travel_time_and_distance(self, origin: str, destination: str,
+                                      routed_results: Optional[Dict] = None) -> Optional[Dict]:
+        """Get travel time in minutes and distance in km between origin and destination
+        
+        routed_results holds the origin's road-routed results (local graph or
+        Google) by destination; without it the destination is routed on its own.
+        """
+        if routed_results is not None:
+            result = routed_results.get(destination)
+        else:
+            # Local road graph first, then Google if available
+            result = self._get_local_travel_time(origin, destination)
+            if not result and self.google_maps_key:
+                result = self._get_google_travel_time(origin, destination)
+        if result:
+            return result
         
         # Fallback to mathematical estimation
         logger.info("Using fallback travel time calculation")
         return self._calculate_fallback_travel_time(origin, destination)
+    
+    def _get_local_travel_times(self, lat: float, lon: float) -> Dict[str, Dict]:
+        """Results for every destination without asking Google: travel time grid, route cache, local road graph
         
-        return self._calculate_fallback_travel_time(origin, destination)
+        Graph routes are stored in the route cache. Empty when none of them has any.
+        """
+        from services.road_router import route_many
+        from services.route_cache import get_cached_routes, store_routes
+        
+        destinations = [destination for destination in self._routed_destinations(f"{lat},{lon}")
+                        if self._get_destination_coordinates(destination)]
+        grid_results = self._get_grid_travel_times(lat, lon)
+        local_results = {destination: grid_results[destination] for destination in destinations
+                         if grid_results.get(destination)}
+        
+        pending = [destination for destination in destinations if destination not in local_results]
+        if pending:
+            local_results.update(get_cached_routes([(lat, lon)], pending)[(lat, lon)])
+        
+        # Destinations the grid has no route to are not routed again
+        destinations = [destination for destination in pending
+                        if destination not in local_results and destination not in grid_results]
+        if not destinations:
+            return local_results
+        try:
+            results = route_many(lat, lon, [self._get_destination_coordinates(d) for d in destinations])
+        except Exception as e:
+            logger.error(f"Local routing failed for {lat},{lon}: {str(e)}")
+            return local_results
+        
+        routed = {destination: result for destination, result in zip(destinations, results or []) if result}
+        store_routes({(lat, lon): routed}, 'road_graph')
+        local_results.update(routed)
+        return local_results
     
-    def _get_google_travel_time(self, origin: str, destination: str) -> Optional[Dict]:
-        """Get travel time using Google Maps API"""
+    def _get_grid_travel_times(self, lat: float, lon: float) -> Dict[str, Optional[Dict]]:
+        """Interpolated results from the precomputed travel time grid, None where it has no route
+        
+        Empty without a grid or outside it.
+        """
+        from services.travel_time_grid import get_travel_time_grid
+        
+        grid = get_travel_time_grid()
+        if grid is None:
+            return {}
         try:
-            url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-            params = {
-                'origins': origin,
-                'destinations': destination,
-                'mode': 'driving',
-                'units': 'metric',
-                'key': self.google_maps_key
-            }
-            
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get('status') == 'OK' and data.get('rows'):
-                    elements = data['rows'][0].get('elements', [])
-                    if elements and elements[0].get('status') == 'OK':
-                        duration = elements[0]['duration']['value']  # seconds
-                        distance = elements[0]['distance']['value']  # meters
-                        
-                        return {
-                            'time': round(duration / 60),  # convert to minutes
-                            'distance': round(distance / 1000)  # convert to kilometers
-                        }
-            
-            logger.warning(f"Google API failed for {origin} to {destination}: {data.get('status') if 'data' in locals() else 'No response'}")
+            return grid.travel_times(lat, lon)
+        except Exception as e:
+            logger.error(f"Travel time grid lookup failed for {lat},{lon}: {str(e)}")
+            return {}
+    
+    def _get_local_travel_time(self, origin: str, destination: str) -> Optional[Dict]:
+        """Travel time from the travel time grid, the route cache or the local road graph (None if none has it)"""
+        from services.road_router import route_many
+        from services.route_cache import get_cached_routes, store_routes
+        
+        dest_coords = self._get_destination_coordinates(destination)
+        if not dest_coords:
             return None
-            
+        origin_lat, origin_lon = map(float, origin.split(','))
+        grid_results = self._get_grid_travel_times(origin_lat, origin_lon)
+        if grid_results.get(destination):
+            return grid_results[destination]
+        
+        cached = get_cached_routes([(origin_lat, origin_lon)], [destination])[(origin_lat, origin_lon)]
+        if destination in cached or destination in grid_results:
+            return cached.get(destination)
+        try:
+            results = route_many(origin_lat, origin_lon, [dest_coords])
         except Exception as e:
-            logger.error(f"Google Maps API error: {str(e)}")
+            logger.error(f"Local routing failed for {origin} to {destination}: {str(e)}")
             return None
+        
+        result = results[0] if results else None
+        store_routes({(origin_lat, origin_lon): {destination: result}}, 'road_graph')
+        return result
+    
+    def _get_google_travel_time(self, origin: str, destination: str) -> Optional[Dict]:
+        """Get travel time using Google Maps API (stored in the route cache)"""
+        origin_lat, origin_lon = map(float, origin.split(','))
+        fetched = self._fetch_google_matrix([(origin_lat, origin_lon)], [destination])
+        self._store_google_results(fetched)
+        return fetched.get((origin_lat, origin_lon), {}).get(destination)
+    
+    def _get_google_travel_times(self, lat: float, lon: float, known: Dict = None) -> Dict[str, Optional[Dict]]:
+        """Google results for every destination not in known: prefetched, or one matrix request for the rest
+        
+        known includes the route cache's results (see _get_local_travel_times).
+        """
+        results, missing = self._google_results_to_fetch(lat, lon, known)
+        if missing:
+            fetched = self._fetch_google_matrix([(lat, lon)], missing)
+            self._store_google_results(fetched)
+            results.update(fetched.get((lat, lon), {}))
+        return results
+    
+    async def _get_google_travel_times_async(self, lat: float, lon: float, client,
+                                             known: Dict = None) -> Dict[str, Optional[Dict]]:
+        import asyncio
+        
+        results, missing = self._google_results_to_fetch(lat, lon, known)
+        if missing:
+            fetched = await self._fetch_google_matrix_async([(lat, lon)], missing, client)
+            await asyncio.to_thread(self._store_google_results, fetched)
+            results.update(fetched.get((lat, lon), {}))
+        return results
+    
+    def _google_results_to_fetch(self, lat: float, lon: float,
+                                 known: Dict = None) -> Tuple[Dict[str, Optional[Dict]], List[str]]:
+        """Google results already at hand for a location and the destinations still to request"""
+        known = known or {}
+        results = dict(self._prefetched.get((lat, lon), {}))
+        pending = [destination for destination in self._routed_destinations(f"{lat},{lon}")
+                   if destination not in results and destination not in known]
+        return results, pending
+    
+    def _store_google_results(self, fetched: Dict[Tuple[float, float], Dict[str, Optional[Dict]]]):
+        """Store fetched results in the route cache"""
+        from services.route_cache import store_routes
+        
+        store_routes(fetched, 'google')
+    
+    def _matrix_chunks(self, origins: List[Tuple[float, float]], destinations: List[str]):
+        """Split an origins x destinations matrix into requests within the API limits"""
+        for d in range(0, len(destinations), MATRIX_MAX_DESTINATIONS):
+            destination_chunk = destinations[d:d + MATRIX_MAX_DESTINATIONS]
+            origins_per_request = max(1, min(MATRIX_MAX_ORIGINS, MATRIX_MAX_ELEMENTS // len(destination_chunk)))
+            for o in range(0, len(origins), origins_per_request):
+                yield origins[o:o + origins_per_request], destination_chunk
+    
+    def _fetch_google_matrix(self, origins: List[Tuple[float, float]],
+                             destinations: List[str]) -> Dict[Tuple[float, float], Dict[str, Optional[Dict]]]:
+        """Call the Distance Matrix API for every origin/destination pair
+        
+        Returns {(lat, lon): {destination: {'time', 'distance'} or None}};
+        origins of a request that failed outright are left out.
+        """
+        fetched = {}
+        for origin_chunk, destination_chunk in self._matrix_chunks(origins, destinations):
+            try:
+                response = get_http_client().get(DISTANCE_MATRIX_URL,
+                                                 params=self._distance_matrix_params(origin_chunk, destination_chunk),
+                                                 timeout=15, provider='google_distance_matrix')
+                fetched.update(self._parse_google_matrix(response, origin_chunk, destination_chunk))
+                
+            except Exception as e:
+                logger.error(f"Google Maps API error: {str(e)}")
+        return fetched
+    
+    async def _fetch_google_matrix_async(self, origins: List[Tuple[float, float]], destinations: List[str],
+                                         client) -> Dict[Tuple[float, float], Dict[str, Optional[Dict]]]:
+        fetched = {}
+        for origin_chunk, destination_chunk in self._matrix_chunks(origins, destinations):
+            try:
+                response = await client.get(DISTANCE_MATRIX_URL,
+                                            params=self._distance_matrix_params(origin_chunk, destination_chunk),
+                                            timeout=15, provider='google_distance_matrix')
+                fetched.update(self._parse_google_matrix(response, origin_chunk, destination_chunk))
+                
+            except Exception as e:
+                logger.error(f"Google Maps API error: {str(e)}")
+        return fetched
+    
+    def _distance_matrix_params(self, origins: List[Tuple[float, float]], destinations: List[str]) -> Dict:
+        return {
+            'origins': '|'.join(f"{lat},{lon}" for lat, lon in origins),
+            'destinations': '|'.join(destinations),
+            'mode': 'driving',
+            'units': 'metric',
+            'key': self.google_maps_key
+        }
+    
+    def _parse_google_matrix(self, response, origins: List[Tuple[float, float]],
+                             destinations: List[str]) -> Dict[Tuple[float, float], Dict[str, Optional[Dict]]]:
+        """Travel time (min) and distance (km) per origin and destination from a Distance Matrix response
+        
+        Rows follow the order of origins and elements the order of destinations;
+        pairs Google could not route are None.
+        """
+        data = response.json() if response.status_code == 200 else {}
+        rows = data.get('rows') or []
+        
+        if data.get('status') != 'OK' or len(rows) != len(origins):
+            logger.warning(f"Google Distance Matrix failed for {len(origins)} origins x {len(destinations)} destinations: "
+                           f"{data.get('status') or f'HTTP {response.status_code}'}")
+            report_provider_status('google_distance_matrix', data.get('status'))
+            return {}
+        
+        fetched = {}
+        for origin, row in zip(origins, rows):
+            results = {}
+            for destination, element in zip(destinations, row.get('elements', [])):
+                if element.get('status') == 'OK':
+                    results[destination] = {
+                        'time': round(element['duration']['value'] / 60),  # seconds to minutes
+                        'distance': round(element['distance']['value'] / 1000)  # meters to kilometers
+                    }
+                else:
+                    logger.warning(f"Google API failed for {origin} to {destination}: {element.get('status')}")
+                    results[destination] = None
+            fetched[origin] = results
+        return fetched
     
     def _calculate_fallback_travel_time(self, origin: str, destination: str) -> Optional[Dict]:
         """Calculate travel time using mathematical distance estimation"""
@@ -190,21 +477,11 @@ class TravelTimeService:
             # Calculate straight-line distance using Haversine formula
             distance_km = self._haversine_distance(origin_lat, origin_lon, dest_lat, dest_lon)
             
-            # Estimate travel time based on distance and road type
-            # Use realistic speed estimates: 
-            # - Short distances (<20km): 45 km/h average (local roads, traffic)
-            # - Medium distances (20-50km): 55 km/h average (mixed roads)
-            # - Long distances (>50km): 65 km/h average (highways)
-            
-            if distance_km < 20:
-                avg_speed = 45
-            elif distance_km < 50:
-                avg_speed = 55
-            else:
-                avg_speed = 65
+            # Estimate travel time based on distance and road type (see SPEED_TIERS_KMH)
+            avg_speed = next((speed for max_km, speed in SPEED_TIERS_KMH if distance_km < max_km), HIGHWAY_SPEED_KMH)
             
             # Add 20% to account for actual road routes vs straight line
-            actual_distance = distance_km * 1.2
+            actual_distance = distance_km * ROAD_DETOUR_FACTOR
             travel_time = round((actual_distance / avg_speed) * 60)  # Convert to minutes
             
             return {
@@ -229,64 +506,23 @@ class TravelTimeService:
         a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
         c = 2 * math.asin(math.sqrt(a))
         
-        # Radius of earth in kilometers
-        r = 6371
-        
-        return c * r
+        return c * EARTH_RADIUS_KM
     
     def _get_destination_coordinates(self, destination: str) -> Optional[tuple]:
-        """Get coordinates for common destinations"""
-        # Predefined coordinates for major destinations
-        coords_map = {
-            'Oviedo, Asturias, Spain': (43.3614, -5.8593),
-            'Gijón, Asturias, Spain': (43.5322, -5.6611),
-            'Santander, Cantabria, Spain': (43.4623, -3.8099),
-            
-            # Beaches
-            'Playa de San Lorenzo, Gijón, Spain': (43.5390, -5.6531),
-            'Playa de Rodiles, Villaviciosa, Spain': (43.4844, -5.3869),
-            'Playa de Gulpiyuri, Llanes, Spain': (43.4222, -4.7558),
-            'Playa del Sardinero, Santander, Spain': (43.4816, -3.7886),
-            'Playa de Comillas, Cantabria, Spain': (43.3878, -4.2894),
-            'Playa de Oyambre, Comillas, Spain': (43.3756, -4.2736),
-            'Playa de la Concha de Artedo, Cudillero, Spain': (43.5667, -6.1500),
-            'Playa de Ribadesella, Asturias, Spain': (43.4628, -5.0589),
-            
-            # Airports
-            'Santander Airport, Santander, Spain': (43.4270, -3.8201),
-            'Asturias Airport, Santiago del Monte, Spain': (43.5637, -6.0346),
-            'Bilbao Airport, Loiu, Spain': (43.3011, -2.9106),
-            
-            # Train stations
-            'Santander Railway Station, Santander, Spain': (43.4616, -3.8048),
-            'Oviedo Railway Station, Oviedo, Spain': (43.3656, -5.8515),
-            'Gijón Railway Station, Gijón, Spain': (43.5406, -5.6606),
-            
-            # Hospitals
-            'Hospital Universitario Marqués de Valdecilla, Santander, Spain': (43.4559, -3.8049),
-            'Hospital Universitario Central de Asturias, Oviedo, Spain': (43.3378, -5.8515),
-            'Hospital Cabueñes, Gijón, Spain': (43.5211, -5.6069),
-            
-            # Police stations (approximate city center locations)
-            'Policía Nacional Santander, Spain': (43.4623, -3.8099),
-            'Policía Nacional Oviedo, Spain': (43.3614, -5.8593),
-            'Policía Nacional Gijón, Spain': (43.5322, -5.6611)
-        }
-        
-        return coords_map.get(destination)
+        """Get coordinates of a catalog destination"""
+        return self.catalog.coordinates(destination)
     
-    def _find_nearest_beach(self, origin: str) -> Optional[Dict]:
+    def _find_nearest_beach(self, origin: str, routed_results: Optional[Dict] = None) -> Optional[Dict]:
         """Find nearest beach and travel time"""
         try:
-            # Calculate times to all beaches using available method
+            # Calculate times to the nearest candidate beaches using available method
             beach_times = []
             
-            for beach in self.beaches:
-                travel_data = self._get_travel_time_and_distance(origin, beach)
+            for beach in self._route_candidates(origin, self.beaches, 'beach'):
+                travel_data = self._get_travel_time_and_distance(origin, beach, routed_results)
                 if travel_data:
-                    beach_name = beach.split(',')[0].replace('Playa de ', '').replace('Playa del ', '')
                     beach_times.append({
-                        'name': beach_name,
+                        'name': self._beach_name(beach),
                         'time': travel_data['time'],
                         'distance': travel_data['distance'],
                         'full_name': beach
@@ -304,22 +540,34 @@ class TravelTimeService:
             logger.error(f"Error finding nearest beach: {str(e)}")
             return None
     
+    def _beach_name(self, beach: str) -> str:
+        """Short beach name stored on lands ('Playa de Rodiles, Villaviciosa, Spain' -> 'Rodiles')"""
+        return self.catalog.short_name(beach) or beach.split(',')[0].replace('Playa de ', '').replace('Playa del ', '')
+    
     def _find_nearest_facility(self, origin: str, facilities: List[str]) -> Optional[int]:
         """Find travel time to nearest facility from a list (legacy for backward compatibility)"""
         result = self._find_nearest_facility_with_distance(origin, facilities)
         return result['time'] if result else None
     
-    def _find_nearest_facility_with_distance(self, origin: str, facilities: List[str]) -> Optional[Dict]:
-        """Find travel time and distance to nearest facility from a list"""
+    def _find_nearest_facility_with_distance(self, origin: str, facilities: List[str],
+                                             routed_results: Optional[Dict] = None,
+                                             facility_type: Optional[str] = None) -> Optional[Dict]:
+        """Find travel time and distance to nearest facility from a list
+        
+        With a facility_type only its k nearest candidates are considered.
+        """
         if not facilities:
             return None
         
         try:
-            # Calculate times and distances to all facilities using available method
+            if facility_type:
+                facilities = self._route_candidates(origin, facilities, facility_type)
+            
+            # Calculate times and distances to the candidate facilities using available method
             facility_data = []
             
             for facility in facilities:
-                result = self._get_travel_time_and_distance(origin, facility)
+                result = self._get_travel_time_and_distance(origin, facility, routed_results)
                 if result is not None:
                     facility_data.append(result)
             
@@ -0,0 +1,86 @@
+"""
+Tests for batched Places amenity lookups.
+"""
+
+import asyncio
+from unittest.mock import Mock, patch, AsyncMock
+from services.amenity_lookup import AmenityLookupService, RecentSearches
+
+
+class TestAmenityLookupService:
+    """Test cases for AmenityLookupService"""
+    
+    @patch('utils.cache.get_cached_enrichment_data', return_value=None)
+    @patch('utils.http_client.HttpClient.post')
+    def test_amenity_lookup_batches_categories(self, mock_post, mock_cached):
+        """Test all amenity categories come from one nearby search"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'places': [
+                {
+                    'displayName': {'text': 'Test Restaurant'},
+                    'rating': 4.5,
+                    'id': 'restaurant_id',
+                    'types': ['restaurant', 'cafe'],
+                    'location': {'latitude': 39.4700, 'longitude': -0.3760}
+                },
+                {
+                    'displayName': {'text': 'Test Airport'},
+                    'id': 'airport_id',
+                    'types': ['airport'],
+                    'location': {'latitude': 39.4890, 'longitude': -0.3900}
+                }
+            ]
+        }
+        mock_post.return_value = mock_response
+        
+        amenities = AmenityLookupService('test_key').lookup(39.4699, -0.3763)
+        
+        assert mock_post.call_count == 1
+        assert amenities['restaurant']['avg_rating'] == 4.5
+        assert amenities['cafe']['distance'] == amenities['restaurant']['distance']
+        assert amenities['airport']['distance'] > 0
+        assert 'hospital' not in amenities
+    
+    @patch('utils.cache.get_cached_enrichment_data', return_value=None)
+    @patch('utils.http_client.HttpClient.post')
+    def test_amenity_lookup_async_matches_sync(self, mock_post, mock_cached):
+        """Test the asyncio driver runs the same lookup plan as the blocking one"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'places': [
+                {
+                    'displayName': {'text': 'Test School'},
+                    'id': 'school_id',
+                    'types': ['school'],
+                    'location': {'latitude': 39.4710, 'longitude': -0.3763}
+                }
+            ]
+        }
+        mock_post.return_value = mock_response
+        async_client = Mock()
+        async_client.post = AsyncMock(return_value=mock_response)
+        
+        expected = AmenityLookupService('test_key').lookup(39.4699, -0.3763)
+        amenities = asyncio.run(AmenityLookupService('test_key').lookup_async(39.4699, -0.3763, async_client))
+        
+        assert amenities == expected
+        assert async_client.post.call_count == mock_post.call_count
+    
+    def test_recent_searches_match_types_radius_and_offset(self):
+        """Test a recent search is reused only for the same types and radius within the offset"""
+        searches = RecentSearches(maxlen=2)
+        places = [{'name': 'Cafe'}]
+        searches.add(39.4699, -0.3763, 'cafe', 5000, places)
+        
+        assert searches.find(39.4700, -0.3763, 'cafe', 5000, max_offset=50) is places
+        assert searches.find(39.4750, -0.3763, 'cafe', 5000, max_offset=50) is None
+        assert searches.find(39.4699, -0.3763, 'school', 5000, max_offset=50) is None
+        assert searches.find(39.4699, -0.3763, 'cafe', 50000, max_offset=50) is None
+        
+        searches.add(40.0, -3.0, 'cafe', 5000, [])
+        searches.add(41.0, -3.0, 'cafe', 5000, [])
+        assert len(searches) == 2
+        assert searches.find(39.4699, -0.3763, 'cafe', 5000, max_offset=50) is None
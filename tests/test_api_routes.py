@@ -389,6 +389,61 @@ class TestSchedulerStatus:
         assert 'Scheduler error' in data['error']
 
 
+class TestEnrichmentJobsAPI:
+    """Test background bulk enrichment job endpoints"""
+    
+    @patch('services.enrichment_job_service._launch_job')
+    def test_enrich_all_returns_job(self, mock_launch, client, test_lands, monkeypatch):
+        """Test bulk enrichment starts a job instead of enriching inline"""
+        monkeypatch.setenv('DEV_MODE', 'true')
+        
+        response = client.post('/api/lands/enrich-all')
+        
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert data['success'] is True
+        assert data['job']['status'] == 'pending'
+        assert data['job']['total_count'] == len(test_lands)
+        mock_launch.assert_called_once_with(data['job_id'])
+        
+        status = client.get(data['status_url'])
+        assert json.loads(status.data)['job']['id'] == data['job_id']
+
+    
+    @patch('services.enrichment_service.EnrichmentService')
+    def test_job_counts_survive_failed_lands(self, mock_service_class, app, test_lands):
+        """Test a failed land's rollback does not lose the job's progress"""
+        from models import EnrichmentJob
+        from services.enrichment_job_service import _run_job
+        
+        land_ids = sorted(land.id for land in Land.query.all())
+        
+        def enrich_land(land_id):
+            land = Land.query.get(land_id)
+            land.environment = {'enriched': True}
+            if land_id == land_ids[0]:
+                db.session.commit()
+                return True
+            # Failures leave uncommitted changes behind for the job to roll back
+            return False
+        mock_service_class.return_value.enrich_land.side_effect = enrich_land
+        
+        job = EnrichmentJob(status='pending', chunk_size=10, total_count=len(land_ids), last_land_id=0)
+        db.session.add(job)
+        db.session.commit()
+        
+        _run_job(app, job.id)
+        
+        db.session.expire_all()
+        job = EnrichmentJob.query.get(job.id)
+        assert job.status == 'completed'
+        assert job.processed_count == 3
+        assert job.success_count == 1
+        assert job.error_count == 2
+        assert job.last_land_id == land_ids[-1]
+        assert job.heartbeat_at is not None
+        assert Land.query.get(land_ids[1]).environment is None
+
 class TestStatsAPI:
     """Test statistics API endpoint"""
     
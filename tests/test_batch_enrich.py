@@ -0,0 +1,107 @@
+"""
+Tests for the batch enrichment script's id ranges and worker progress.
+"""
+
+import queue
+import pytest
+from unittest.mock import Mock, patch
+import batch_enrich
+from batch_enrich import split_into_ranges, parallel_enrich_lands, batch_enrich_lands
+
+
+class FakeProcess:
+    """Stand-in for a spawned worker that reports from start() according to a script"""
+
+    # worker_index -> (lands to report before stopping, whether 'done' is sent, exit code)
+    scripts = {}
+
+    def __init__(self, target, args, name):
+        self.worker_index, self.land_ids, self.progress_queue, self.force = args
+        self.name = name
+        self.exitcode = None
+
+    def start(self):
+        reported, sends_done, exitcode = self.scripts.get(self.worker_index, (len(self.land_ids), True, 0))
+        for land_id in self.land_ids[:reported]:
+            self.progress_queue.put(('result', self.worker_index, land_id, land_id % 2 == 0))
+        if sends_done:
+            self.progress_queue.put(('done', self.worker_index, None, None))
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return False
+
+    def join(self):
+        pass
+
+
+@pytest.fixture
+def fake_workers(monkeypatch):
+    """Run parallel_enrich_lands against in-process fake workers"""
+    context = Mock()
+    context.Queue = queue.Queue
+    context.Process = FakeProcess
+    monkeypatch.setattr(batch_enrich, 'WORKER_POLL_SECONDS', 0.01)
+    monkeypatch.setenv('RATE_LIMIT_PROCESSES', '1')
+    FakeProcess.scripts = {}
+    with patch('batch_enrich.multiprocessing.get_context', return_value=context):
+        yield FakeProcess.scripts
+
+
+class TestSplitIntoRanges:
+    """Test cases for splitting ids between workers"""
+
+    def test_disjoint_contiguous_ranges(self):
+        """Test every id lands in exactly one range, in order"""
+        land_ids = list(range(1, 11))
+
+        ranges = split_into_ranges(land_ids, 3)
+
+        assert ranges == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+        assert [land_id for id_range in ranges for land_id in id_range] == land_ids
+
+    def test_fewer_ids_than_workers(self):
+        """Test no empty ranges are created when there are more workers than ids"""
+        assert split_into_ranges([7, 8], 4) == [[7], [8]]
+
+    def test_single_worker(self):
+        """Test one worker gets the whole list"""
+        assert split_into_ranges([1, 2, 3], 1) == [[1, 2, 3]]
+
+
+class TestParallelEnrichLands:
+    """Test cases for merging worker progress reports"""
+
+    def test_merges_all_workers(self, fake_workers):
+        """Test results from every worker are counted once"""
+        success_count, error_count = parallel_enrich_lands(list(range(1, 11)), 3)
+
+        assert (success_count, error_count) == (5, 5)
+
+    def test_worker_killed_without_done(self, fake_workers):
+        """Test a worker that dies without 'done' is detected and its unreported lands count as errors"""
+        fake_workers[1] = (1, False, -9)
+
+        success_count, error_count = parallel_enrich_lands(list(range(1, 11)), 3)
+
+        # Worker 1 reported land 5 (an error) and never reported 6, 7 and 8
+        assert success_count == 3
+        assert error_count == 7
+
+    def test_crashed_worker_sends_done(self, fake_workers):
+        """Test lands a crashed worker skipped before sending 'done' count as errors"""
+        fake_workers[0] = (2, True, 0)
+
+        success_count, error_count = parallel_enrich_lands(list(range(1, 11)), 3)
+
+        assert success_count + error_count == 10
+        assert success_count == 4
+
+
+class TestBatchEnrichLands:
+    """Test cases for the batch entry point"""
+
+    def test_workers_and_async_rejected(self):
+        """Test asking for both worker processes and the async engine fails instead of ignoring one"""
+        with pytest.raises(ValueError):
+            batch_enrich_lands(workers=2, use_async=True)
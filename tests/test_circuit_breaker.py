@@ -0,0 +1,104 @@
+"""
+Tests for per-provider circuit breakers.
+"""
+
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from utils.circuit_breaker import CircuitBreaker, report_provider_status, CLOSED, OPEN, HALF_OPEN
+from utils.http_client import HttpClient, CircuitOpen
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker state transitions"""
+    
+    def test_opens_after_consecutive_failures(self):
+        """Test the breaker opens only after the threshold of consecutive failures"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        
+        breaker.record_failure('overpass', 'HTTP 503')
+        breaker.record_failure('overpass', 'HTTP 503')
+        breaker.record_success('overpass')
+        breaker.record_failure('overpass', 'HTTP 503')
+        assert breaker.allow('overpass')
+        
+        breaker.record_failure('overpass', 'HTTP 503')
+        breaker.record_failure('overpass', 'HTTP 503')
+        assert not breaker.allow('overpass')
+        
+        stats = breaker.get_stats()['overpass']
+        assert stats['state'] == OPEN
+        assert stats['trips'] == 1
+        assert stats['rejected'] == 1
+        assert stats['last_failure'] == 'HTTP 503'
+    
+    def test_half_open_allows_one_probe(self):
+        """Test only one probe is let through after the reset period, and a failed probe reopens"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        breaker.record_failure('nominatim', 'timeout')
+        breaker.providers['nominatim']['opened_at'] -= 60
+        
+        assert breaker.allow('nominatim')
+        assert breaker.get_stats()['nominatim']['state'] == HALF_OPEN
+        assert not breaker.allow('nominatim')
+        
+        breaker.record_failure('nominatim', 'timeout')
+        assert breaker.get_stats()['nominatim']['state'] == OPEN
+        assert breaker.get_stats()['nominatim']['trips'] == 2
+    
+    def test_providers_are_independent(self):
+        """Test one provider's failures do not affect another"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        breaker.record_failure('google_places', 'HTTP 500')
+        
+        assert not breaker.allow('google_places')
+        assert breaker.allow('google_geocoding')
+    
+    def test_reset(self):
+        """Test reset closes one provider's breaker or all of them"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        breaker.record_failure('google_places', 'HTTP 500')
+        breaker.record_failure('overpass', 'HTTP 500')
+        
+        breaker.reset('google_places')
+        assert breaker.allow('google_places')
+        assert not breaker.allow('overpass')
+        
+        breaker.reset()
+        assert breaker.allow('overpass')
+        assert breaker.get_stats()['overpass']['state'] == CLOSED
+    
+    def test_outage_status_trips_breaker(self):
+        """Test quota and key errors in a response open the breaker at once"""
+        breaker = CircuitBreaker(failure_threshold=5, reset_seconds=60)
+        
+        with patch('utils.circuit_breaker.get_circuit_breaker', return_value=breaker):
+            report_provider_status('google_distance_matrix', 'OK')
+            assert breaker.allow('google_distance_matrix')
+            
+            report_provider_status('google_distance_matrix', 'OVER_QUERY_LIMIT')
+            assert not breaker.allow('google_distance_matrix')
+            assert breaker.get_stats()['google_distance_matrix']['last_failure'] == 'OVER_QUERY_LIMIT'
+    
+    def test_circuit_breaker_fails_fast_and_probes_after_reset(self):
+        """Test an open breaker rejects requests without sending, then closes after a good probe"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        client = HttpClient(max_retries=0)
+        ok = Mock(status_code=200)
+        
+        with patch('utils.http_client.get_circuit_breaker', return_value=breaker), \
+             patch.object(client.session, 'request', side_effect=requests.ConnectionError('refused')) as mock_request:
+            for _ in range(2):
+                with pytest.raises(requests.ConnectionError):
+                    client.get('https://maps.googleapis.com/x', provider='google_geocoding')
+            
+            with pytest.raises(CircuitOpen):
+                client.get('https://maps.googleapis.com/x', provider='google_geocoding')
+            assert mock_request.call_count == 2
+            assert breaker.get_stats()['google_geocoding']['state'] == 'open'
+            
+            breaker.providers['google_geocoding']['opened_at'] -= 60
+            mock_request.side_effect = None
+            mock_request.return_value = ok
+            assert client.get('https://maps.googleapis.com/x', provider='google_geocoding') is ok
+            assert breaker.get_stats()['google_geocoding']['state'] == 'closed'
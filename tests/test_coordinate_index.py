@@ -0,0 +1,59 @@
+"""
+Tests for the in-memory coordinate grid index.
+"""
+
+import math
+import random
+from decimal import Decimal
+from utils.coordinate_index import CoordinateIndex
+from utils.spatial_index import METERS_PER_DEGREE, haversine_meters
+
+
+class TestCoordinateIndex:
+    """Test cases for CoordinateIndex"""
+    
+    def test_nearby_matches_brute_force(self):
+        """Test nearby returns exactly the points within the tolerance"""
+        rng = random.Random(25)
+        points = [(rng.uniform(43.0, 43.7), rng.uniform(-7.2, -3.1)) for _ in range(3000)]
+        coordinate_index = CoordinateIndex(500)
+        for point_id, (lat, lon) in enumerate(points):
+            coordinate_index.add(point_id, lat, lon)
+        assert len(coordinate_index) == 3000
+        
+        for lat, lon in points[:100]:
+            lat, lon = lat + rng.uniform(-0.005, 0.005), lon + rng.uniform(-0.005, 0.005)
+            expected = {i for i, (other_lat, other_lon) in enumerate(points)
+                        if haversine_meters(lat, lon, other_lat, other_lon) <= 500}
+            assert {point_id for point_id, _ in coordinate_index.nearby(lat, lon)} == expected
+    
+    def test_has_other_uses_tolerance_and_excludes_self(self):
+        """Test has_other finds other points within the tolerance only"""
+        coordinate_index = CoordinateIndex(2)
+        coordinate_index.add(1, 43.3901, -5.6612)
+        
+        assert coordinate_index.has_other(43.39010004, -5.66120003, 2)
+        assert coordinate_index.has_other(43.39010004, -5.66120003)
+        assert not coordinate_index.has_other(43.39010004, -5.66120003, 1)
+        assert not coordinate_index.has_other(43.3902, -5.6612, 2)
+    
+    def test_cell_edges_and_high_latitudes(self):
+        """Test points in neighbouring cells, and far north where longitude cells widen, are found"""
+        for lat in (43.0, 69.5):
+            coordinate_index = CoordinateIndex(100)
+            step = coordinate_index._lat_step
+            edge_lat = (int(lat / step) + 1) * step
+            coordinate_index.add(1, edge_lat - 1e-7, -5.0)
+            
+            assert coordinate_index.has_other(edge_lat + 1e-7, -5.0)
+            # 90 m east
+            east_lon = -5.0 + 90 / (METERS_PER_DEGREE * math.cos(math.radians(edge_lat)))
+            assert coordinate_index.has_other(edge_lat, east_lon)
+            assert not coordinate_index.has_other(edge_lat, -5.0 + 2 * (east_lon + 5.0))
+    
+    def test_accepts_decimal_coordinates(self):
+        """Test Numeric columns (Decimal) can be added and queried"""
+        coordinate_index = CoordinateIndex(2)
+        coordinate_index.add(1, Decimal('43.3901000'), Decimal('-5.6612000'))
+        
+        assert coordinate_index.has_other(Decimal('43.3901'), Decimal('-5.6612'), 2)
@@ -3,7 +3,8 @@ Tests for enrichment service functionality.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import requests
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from decimal import Decimal
 from app import create_app, db
 from models import Land
@@ -113,30 +114,28 @@ class TestEnrichmentService:
             mock_analyze.assert_called_once()
             mock_scoring_instance.calculate_score.assert_called_once()
     
-    @patch('services.enrichment_service.requests.get')
-    def test_enrich_with_google_places_success(self, mock_get, app, enrichment_service, test_land):
+    @patch('utils.http_client.HttpClient.post')
+    def test_enrich_with_google_places_success(self, mock_post, app, enrichment_service, test_land):
         """Test Google Places enrichment"""
         with app.app_context():
             # Mock successful API response
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = {
-                'results': [
+                'places': [
                     {
-                        'name': 'Test Supermarket',
+                        'displayName': {'text': 'Test Supermarket'},
                         'rating': 4.2,
-                        'place_id': 'test_place_id',
+                        'id': 'test_place_id',
                         'types': ['supermarket'],
-                        'geometry': {
-                            'location': {
-                                'lat': 39.4700,
-                                'lng': -0.3760
-                            }
+                        'location': {
+                            'latitude': 39.4700,
+                            'longitude': -0.3760
                         }
                     }
                 ]
             }
-            mock_get.return_value = mock_response
+            mock_post.return_value = mock_response
             
             # Set API key for test
             enrichment_service.google_places_key = 'test_places_key'
@@ -146,7 +145,7 @@ class TestEnrichmentService:
             
             # Check that infrastructure_extended was updated
             assert land.infrastructure_extended is not None
-            assert 'supermarket_available' in land.infrastructure_extended
+            assert 'supermarket_distance' in land.infrastructure_extended
     
     def test_enrich_with_google_places_no_api_key(self, app, enrichment_service, test_land):
         """Test Google Places enrichment without API key"""
@@ -161,7 +160,7 @@ class TestEnrichmentService:
             # Should not change anything without API key
             assert land.infrastructure_extended == original_infrastructure
     
-    @patch('services.enrichment_service.requests.get')
+    @patch('utils.http_client.HttpClient.get')
     def test_enrich_with_google_maps_success(self, mock_get, app, enrichment_service, test_land):
         """Test Google Maps enrichment"""
         with app.app_context():
@@ -189,7 +188,7 @@ class TestEnrichmentService:
             assert land.transport is not None
             assert any('distance_to_' in key for key in land.transport.keys())
     
-    @patch('services.enrichment_service.requests.post')
+    @patch('utils.http_client.HttpClient.post')
     def test_enrich_with_osm_data_success(self, mock_post, app, enrichment_service, test_land):
         """Test OSM data enrichment"""
         with app.app_context():
@@ -279,43 +278,39 @@ class TestEnrichmentService:
         
         assert distance == 0.0
     
-    @patch('services.enrichment_service.requests.get')
-    def test_search_nearby_places_success(self, mock_get, enrichment_service):
-        """Test successful nearby places search"""
-        # Mock successful response
+    @patch('utils.cache.get_cached_enrichment_data', return_value=None)
+    @patch('utils.http_client.HttpClient.post')
+    def test_amenity_searches_shared_per_batch(self, mock_post, mock_cached):
+        """Test overlapping searches are shared within a service's batch only"""
+        from services.amenity_lookup import AmenityLookupService
+        
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'results': [
-                {
-                    'name': 'Test Restaurant',
-                    'rating': 4.5,
-                    'place_id': 'test_place_id',
-                    'types': ['restaurant'],
-                    'geometry': {
-                        'location': {
-                            'lat': 39.4700,
-                            'lng': -0.3760
-                        }
-                    }
-                }
-            ]
-        }
-        mock_get.return_value = mock_response
+        mock_response.json.return_value = {'places': []}
+        mock_post.return_value = mock_response
         
-        # Set API key
-        enrichment_service.google_places_key = 'test_key'
+        service = EnrichmentService()
+        AmenityLookupService('test_key', service.amenity_searches).lookup(39.4699, -0.3763)
+        calls = mock_post.call_count
+        AmenityLookupService('test_key', service.amenity_searches).lookup(39.4700, -0.3763)
+        assert mock_post.call_count == calls
         
-        places = enrichment_service._search_nearby_places(
-            39.4699, -0.3763, ['restaurant']
-        )
+        AmenityLookupService('test_key', EnrichmentService().amenity_searches).lookup(39.4700, -0.3763)
+        assert mock_post.call_count == 2 * calls
         
-        assert len(places) == 1
-        assert places[0]['name'] == 'Test Restaurant'
-        assert places[0]['rating'] == 4.5
-        assert 'distance' in places[0]
+        service.amenity_searches.clear()
+        assert len(service.amenity_searches) == 0
     
-    @patch('services.enrichment_service.requests.get')
+    def test_prefetch_lands_forgets_previous_batch_geocodes(self, app, enrichment_service):
+        """Test geocode results (including misses) are only reused within a batch"""
+        enrichment_service.geocoding_service._results['nowhere, asturias, spain'] = None
+        
+        with app.app_context():
+            enrichment_service.prefetch_lands([])
+        
+        assert enrichment_service.geocoding_service._results == {}
+        
+    @patch('utils.http_client.HttpClient.get')
     def test_get_distance_matrix_success(self, mock_get, enrichment_service):
         """Test successful distance matrix request"""
         mock_response = Mock()
@@ -342,7 +337,7 @@ class TestEnrichmentService:
         assert result['distance'] == 15000
         assert result['duration'] == 1200
     
-    @patch('services.enrichment_service.requests.get')
+    @patch('utils.http_client.HttpClient.get')
     def test_get_distance_matrix_failure(self, mock_get, enrichment_service):
         """Test distance matrix request failure"""
         mock_response = Mock()
@@ -373,3 +368,346 @@ class TestEnrichmentService:
             result = enrichment_service.enrich_land(test_land)
             
             assert result is False
+    
+    def test_run_enrichment_stages_concurrently(self, app, test_land):
+        """Test concurrent stages are merged in stage order"""
+        with app.app_context():
+            service = EnrichmentService(max_workers=5)
+            land = Land.query.get(test_land)
+            land.infrastructure_extended = {'existing': True}
+            
+            def places(snapshot):
+                snapshot.infrastructure_extended['supermarket_distance'] = 800
+            
+            def osm(snapshot):
+                snapshot.infrastructure_extended['osm_amenities'] = {'cafe': 2}
+            
+            with patch.object(service, '_enrich_with_google_places', side_effect=places), \
+                 patch.object(service, '_enrich_with_google_maps'), \
+                 patch.object(service, '_enrich_with_osm_data', side_effect=osm), \
+                 patch.object(service, '_compute_travel_times'):
+                results = service._run_enrichment_stages(land)
+                service._merge_stage_results(land, results)
+            
+            assert land.infrastructure_extended == {
+                'existing': True,
+                'supermarket_distance': 800,
+                'osm_amenities': {'cafe': 2}
+            }
+            assert 'sea_view' in land.environment
+    
+    def test_unchanged_steps_are_skipped(self, app, test_land):
+        """Test re-enrichment only reruns steps whose inputs changed"""
+        with app.app_context():
+            service = EnrichmentService(max_workers=1)
+            
+            def places(snapshot):
+                snapshot.infrastructure_extended['supermarket_distance'] = 800
+            
+            with patch.object(service, '_enrich_with_google_places', side_effect=places) as mock_places, \
+                 patch.object(service, '_enrich_with_google_maps'), \
+                 patch.object(service, '_enrich_with_osm_data'), \
+                 patch.object(service, '_compute_travel_times'):
+                assert service.enrich_land(test_land)
+                assert service.enrich_land(test_land)
+                assert mock_places.call_count == 1
+                
+                land = Land.query.get(test_land)
+                land.description = 'Parcela con vista al mar'
+                db.session.commit()
+                assert service.enrich_land(test_land)
+                assert mock_places.call_count == 1
+                
+                assert service.enrich_land(test_land, force=True)
+                assert mock_places.call_count == 2
+            
+            steps = Land.query.get(test_land).environment['enrichment_steps']
+            assert {'google_places', 'environment', 'scoring'} <= set(steps)
+    
+    def test_travel_time_inputs_follow_catalog_graph_and_grid(self, enrichment_service, tmp_path):
+        """Test editing the destination catalog or building a road graph or grid makes stored travel times stale"""
+        import os
+        
+        catalog_path = tmp_path / 'destinations.json'
+        catalog_path.write_text('{"destinations": []}', encoding='utf-8')
+        graph_path, grid_path = tmp_path / 'roads.graph', tmp_path / 'travel_times.grid'
+        land = Mock(location_lat=Decimal('43.5322'), location_lon=Decimal('-5.6611'))
+        
+        with patch('config.Config.DESTINATION_CATALOG_PATH', str(catalog_path)), \
+             patch('config.Config.ROAD_GRAPH_PATH', str(graph_path)), \
+             patch('config.Config.TRAVEL_TIME_GRID_PATH', str(grid_path)):
+            fingerprints = [enrichment_service._step_fingerprint('travel_times', land)]
+            
+            os.utime(catalog_path, (1, 1))
+            graph_path.write_bytes(b'graph')
+            fingerprints.append(enrichment_service._step_fingerprint('travel_times', land))
+            grid_path.write_bytes(b'grid')
+            fingerprints.append(enrichment_service._step_fingerprint('travel_times', land))
+            fingerprints.append(enrichment_service._step_fingerprint('travel_times', land))
+        
+        assert len(set(fingerprints[:3])) == 3
+        assert fingerprints[3] == fingerprints[2]
+    
+    def test_enrich_land_commits_once(self, app, test_land):
+        """Test a full enrichment run is flushed in a single commit"""
+        with app.app_context():
+            service = EnrichmentService(max_workers=1)
+            
+            with patch.object(service, '_enrich_with_google_places'), \
+                 patch.object(service, '_enrich_with_google_maps'), \
+                 patch.object(service, '_enrich_with_osm_data'), \
+                 patch.object(service, '_compute_travel_times'), \
+                 patch.object(db.session, 'commit', wraps=db.session.commit) as mock_commit:
+                assert service.enrich_land(test_land)
+            
+            assert mock_commit.call_count == 1
+    
+    @patch('utils.http_client.HttpClient.post')
+    def test_osm_counts_use_local_poi_index(self, mock_post, app, enrichment_service, tmp_path):
+        """Test amenity counts come from the offline index without calling Overpass"""
+        from utils.spatial_index import build_spatial_index
+        
+        index_path = str(tmp_path / 'pois.idx')
+        build_spatial_index([
+            (43.5322, -5.6611, 'cafe'),
+            (43.5330, -5.6620, 'cafe'),
+            (43.5340, -5.6600, 'school'),
+            (43.6500, -5.6611, 'cafe'),   # ~13 km away
+            (43.5322, -5.6611, 'bench'),  # not a counted type
+        ], index_path)
+        
+        with app.app_context(), patch('config.Config.OSM_POI_INDEX_PATH', index_path):
+            land = Mock(location_lat=43.5322, location_lon=-5.6611, infrastructure_extended=None)
+            enrichment_service._enrich_with_osm_data(land)
+        
+        assert land.infrastructure_extended['osm_amenities'] == {'cafe': 2, 'school': 1}
+        mock_post.assert_not_called()
+    
+    @patch('utils.http_client.HttpClient.post')
+    def test_osm_lookup_is_cached_per_grid_cell(self, mock_post, app, enrichment_service):
+        """Test nearby lands in the same grid cell reuse the Overpass response"""
+        with app.app_context():
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {'elements': [{'tags': {'amenity': 'cafe'}}]}
+            mock_post.return_value = mock_response
+            
+            first = Mock(location_lat=43.5322001, location_lon=-5.6611001, infrastructure_extended=None)
+            second = Mock(location_lat=43.5322002, location_lon=-5.6611002, infrastructure_extended=None)
+            enrichment_service._enrich_with_osm_data(first)
+            enrichment_service._enrich_with_osm_data(second)
+            
+            assert mock_post.call_count == 1
+            assert second.infrastructure_extended['osm_amenities'] == {'cafe': 1}
+    
+    @patch('utils.http_client.HttpClient.post')
+    def test_osm_batch_uses_one_bounding_box_query(self, mock_post, app, enrichment_service):
+        """Test nearby lands share one Overpass query and keep their own radius counts"""
+        with app.app_context(), patch('config.Config.OSM_POI_INDEX_PATH', '/nonexistent/pois.idx'):
+            land_ids = []
+            for i, (lat, lon) in enumerate([(43.5322, -5.6611), (43.5400, -5.6611), (43.5322, -5.6500)]):
+                land = Land(source_email_id=f'osm_batch_{i}', title='Finca', municipality='Gijón',
+                            location_lat=Decimal(str(lat)), location_lon=Decimal(str(lon)))
+                db.session.add(land)
+                db.session.commit()
+                land_ids.append(land.id)
+            
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {'elements': [
+                {'type': 'node', 'lat': 43.5330, 'lon': -5.6611, 'tags': {'amenity': 'cafe'}},
+                # ~2.2 km north of the first land, ~1.3 km from the second
+                {'type': 'node', 'lat': 43.5520, 'lon': -5.6611, 'tags': {'amenity': 'school'}},
+                # Polygon reaching ~3 km east of the first land, nearest corner within 2 km
+                {'type': 'way', 'tags': {'amenity': 'hospital'}, 'geometry': [
+                    {'lat': 43.5322, 'lon': -5.6380}, {'lat': 43.5322, 'lon': -5.6230},
+                    {'lat': 43.5340, 'lon': -5.6230}
+                ]},
+            ]}
+            mock_post.return_value = mock_response
+            
+            assert enrichment_service.prefetch_osm_amenities(land_ids) == 1
+            
+            counts = []
+            for land_id in land_ids:
+                land = Land.query.get(land_id)
+                snapshot = Mock(location_lat=land.location_lat, location_lon=land.location_lon,
+                                infrastructure_extended=None)
+                enrichment_service._enrich_with_osm_data(snapshot)
+                counts.append(snapshot.infrastructure_extended['osm_amenities'])
+            
+            assert mock_post.call_count == 1
+            assert counts == [
+                {'cafe': 1, 'hospital': 1},
+                {'cafe': 1, 'school': 1},
+                {'cafe': 1, 'hospital': 1},
+            ]
+    
+    @patch('utils.http_client.HttpClient.get')
+    def test_travel_times_use_matrix_requests(self, mock_get, app):
+        """Test a land's travel times take one Distance Matrix request and a batch shares multi-origin requests
+        
+        Only the nearest candidates of each facility type are routed.
+        """
+        from config import Config
+        from services.travel_time_service import TravelTimeService
+        
+        def matrix_response(url, params=None, **kwargs):
+            destinations = params['destinations'].split('|')
+            response = Mock(status_code=200)
+            response.json.return_value = {'status': 'OK', 'rows': [
+                {'elements': [{'status': 'OK', 'duration': {'value': 60 * (10 + i)}, 'distance': {'value': 1000 * (10 + i)}}
+                              for i, _ in enumerate(destinations)]}
+                for _ in params['origins'].split('|')
+            ]}
+            return response
+        mock_get.side_effect = matrix_response
+        
+        with app.app_context(), patch('utils.cache.get_cached_enrichment_data', return_value=None):
+            travel_service = TravelTimeService()
+            travel_service.google_maps_key = 'test-key'
+            travel_data = travel_service.compute_travel_times(43.5322, -5.6611)
+            assert mock_get.call_count == 1
+            destinations = mock_get.call_args.kwargs['params']['destinations'].split('|')
+            assert len(destinations) == 2 + sum(Config.TRAVEL_TIME_CANDIDATES.values())
+            assert 'Bilbao Airport, Loiu, Spain' not in destinations
+            assert travel_data['travel_time_oviedo'] == 10
+            assert travel_data['travel_time_gijon'] == 11
+            assert travel_data['nearest_beach_name'] == 'San Lorenzo'
+            
+            mock_get.reset_mock()
+            locations = [(43.53 + i / 1000, -5.66) for i in range(12)]
+            requests_sent = travel_service.prefetch_travel_times(locations)
+            
+            origins_per_request = 100 // len(destinations)
+            assert requests_sent == mock_get.call_count == -(-len(locations) // origins_per_request)
+            for lat, lon in locations:
+                assert travel_service.compute_travel_times(lat, lon) == travel_data
+            assert mock_get.call_count == requests_sent
+    
+    def test_recomputed_travel_times_match_scalar_estimates(self, app):
+        """Test the vectorized recompute writes the same columns as the per-pair estimate"""
+        from services.travel_time_service import TravelTimeService
+        from services.travel_time_matrix import recompute_estimated_travel_times
+        
+        with app.app_context(), patch('config.Config.TRAVEL_TIME_CANDIDATES', {}):
+            coordinates = [(43.5322, -5.6611), (43.3614, -5.8593), (43.4623, -3.8099), (43.05, -6.95)]
+            land_ids = []
+            for i, (lat, lon) in enumerate(coordinates):
+                land = Land(source_email_id=f'travel_matrix_{i}', title='Finca', municipality='Gijón',
+                            location_lat=Decimal(str(lat)), location_lon=Decimal(str(lon)))
+                db.session.add(land)
+                db.session.commit()
+                land_ids.append(land.id)
+            
+            assert recompute_estimated_travel_times(batch_size=3) >= len(land_ids)
+            
+            travel_service = TravelTimeService()
+            travel_service.google_maps_key = None
+            for land_id in land_ids:
+                land = Land.query.get(land_id)
+                expected = travel_service.compute_travel_times(float(land.location_lat), float(land.location_lon))
+                assert {column: getattr(land, column) for column in expected} == expected
+    
+    def test_destination_catalog_scales_nearest_candidates(self, app, tmp_path):
+        """Test a catalog with thousands of beaches is loaded from file and its KD-tree picks the nearest candidates"""
+        import json
+        import random
+        from services.travel_time_service import TravelTimeService
+        from utils.spatial_index import haversine_meters
+        
+        random.seed(21)
+        entries = [{'name': 'Oviedo, Asturias, Spain', 'category': 'city', 'key': 'oviedo', 'lat': 43.3614, 'lon': -5.8593},
+                   {'name': 'Gijón, Asturias, Spain', 'category': 'city', 'key': 'gijon', 'lat': 43.5322, 'lon': -5.6611}]
+        entries += [{'name': f'Playa {i}, Asturias, Spain', 'category': 'beach', 'short_name': f'Playa {i}',
+                     'lat': random.uniform(43.3, 43.7), 'lon': random.uniform(-7.2, -3.1)} for i in range(3000)]
+        catalog_path = tmp_path / 'destinations.json'
+        catalog_path.write_text(json.dumps({'destinations': entries}))
+        
+        with app.app_context(), patch('config.Config.DESTINATION_CATALOG_PATH', str(catalog_path)), \
+             patch('config.Config.TRAVEL_TIME_CANDIDATES', {'beach': 3}):
+            travel_service = TravelTimeService()
+            travel_service.google_maps_key = None
+            assert len(travel_service.beaches) == 3000 and travel_service.airports == ()
+            
+            for lat, lon in ((43.45, -5.5), (43.6, -7.1), (43.2, -3.0)):
+                candidates = travel_service._route_candidates(f'{lat},{lon}', travel_service.beaches, 'beach')
+                expected = sorted(entries[2:], key=lambda e: haversine_meters(lat, lon, e['lat'], e['lon']))[:3]
+                assert sorted(candidates) == sorted(entry['name'] for entry in expected)
+            
+            travel_data = travel_service.compute_travel_times(43.45, -5.5)
+            assert travel_data['nearest_beach_name'].startswith('Playa ')
+            assert 'travel_time_airport' not in travel_data
+    
+    @patch('utils.http_client.HttpClient.get')
+    def test_geocode_lands_batches_addresses_and_checks_duplicates_in_memory(self, mock_get, app):
+        """Test a batch geocodes each distinct address once, in parallel, and rejects duplicate precise coordinates"""
+        import threading
+        
+        coordinates = {'Calle Mayor 3, Llanes, Spain': (43.4211, -4.7561), 'Calle Real 1, Siero, Spain': (43.3901, -5.6612)}
+        threads = set()
+        
+        def geocode_response(url, params=None, **kwargs):
+            threads.add(threading.current_thread().name)
+            lat, lng = coordinates[params['address']]
+            response = Mock(status_code=200)
+            response.json.return_value = {'status': 'OK', 'results': [{
+                'geometry': {'location': {'lat': lat, 'lng': lng}}, 'formatted_address': params['address']
+            }]}
+            return response
+        mock_get.side_effect = geocode_response
+        
+        with app.app_context():
+            existing = Land(source_email_id='geocoded', title='Existing', municipality='Siero',
+                            location_lat=Decimal('43.3901'), location_lon=Decimal('-5.6612'))
+            lands = [Land(source_email_id=f'batch_{i}', title=f'Land {i}', municipality=municipality)
+                     for i, municipality in enumerate(['Calle Mayor 3, Llanes', 'Calle Mayor 3, Llanes', 'Calle Real 1, Siero'])]
+            db.session.add_all([existing] + lands)
+            db.session.commit()
+            
+            enrichment_service = EnrichmentService()
+            enrichment_service.geocoding_service.google_maps_key = 'test-key'
+            with patch.object(EnrichmentService, '_is_duplicate_coordinates', side_effect=AssertionError):
+                assert enrichment_service.prefetch_geocodes([land.id for land in lands] + [existing.id]) == 3
+            
+            assert mock_get.call_count == 2
+            assert all(name.startswith('geocode') for name in threads)
+            
+            locations = [enrichment_service._locate_land(land) for land in lands]
+            assert locations[0] == {'lat': 43.4211, 'lng': -4.7561, 'accuracy': 'precise'}
+            # Same precise coordinates as an earlier land of the batch, or a stored land
+            assert locations[1] == {'lat': 43.4211, 'lng': -4.7561, 'accuracy': 'approximate'}
+            assert locations[2] == {'lat': 43.3901, 'lng': -5.6612, 'accuracy': 'approximate'}
+            assert enrichment_service._geocode_prefetched == {}
+    
+    def test_duplicate_coordinates_use_tolerance(self, app):
+        """Test duplicate-coordinate checks use a distance tolerance, from the grid index and from the database"""
+        with app.app_context():
+            existing = Land(source_email_id='located', title='Located', municipality='Siero',
+                            location_lat=Decimal('43.3901000'), location_lon=Decimal('-5.6612000'))
+            db.session.add(existing)
+            db.session.commit()
+            
+            enrichment_service = EnrichmentService()
+            assert enrichment_service._is_duplicate_coordinates(43.39010004, -5.66120003, existing.id + 1)
+            assert not enrichment_service._is_duplicate_coordinates(43.39010004, -5.66120003, existing.id)
+            assert not enrichment_service._is_duplicate_coordinates(43.3902, -5.6612, existing.id + 1)
+            with patch('config.Config.DUPLICATE_COORDINATE_TOLERANCE_METERS', 20.0):
+                assert enrichment_service._is_duplicate_coordinates(43.3902, -5.6612, existing.id + 1)
+                
+                # A batch loads the index and answers from it, including lands located since
+                coordinate_index = enrichment_service._load_coordinate_index()
+                assert coordinate_index.has_other(43.3902, -5.6612)
+                coordinate_index.add(existing.id + 5, 43.5, -5.5)
+                assert enrichment_service._is_duplicate_coordinates(43.5, -5.5, existing.id + 1)
+                
+                # The next batch sees coordinates stored by other workers in the meantime
+                other = Land(source_email_id='located_elsewhere', title='Other', municipality='Llanes',
+                             location_lat=Decimal('43.4211000'), location_lon=Decimal('-4.7561000'))
+                db.session.add(other)
+                db.session.commit()
+                assert not enrichment_service._is_duplicate_coordinates(43.4211, -4.7561, other.id + 1)
+                enrichment_service.geocode_lands([])
+                assert enrichment_service._is_duplicate_coordinates(43.4211, -4.7561, other.id + 1)
+                enrichment_service.prefetch_lands([])
+                assert enrichment_service._coordinate_index is None
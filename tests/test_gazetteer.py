@@ -0,0 +1,142 @@
+"""
+Tests for the offline place-name gazetteer.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from app import create_app, db
+from config import Config
+from services.enrichment_service import EnrichmentService
+from services.gazetteer import Gazetteer, import_geonames, trigrams
+from services.geocode_cache import normalize_address
+from tests import setup_test_environment
+from utils.geocoding import GeocodingService
+
+
+@pytest.fixture
+def app():
+    """Create test Flask application"""
+    setup_test_environment()
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+PLACES = [
+    {'name': 'Asturias', 'type': 'province', 'province': 'Asturias', 'lat': 43.3614, 'lon': -5.8593},
+    {'name': 'Llanes', 'type': 'municipality', 'province': 'Asturias', 'municipality': 'Llanes',
+     'aliases': ['Concejo de Llanes'], 'lat': 43.42, 'lon': -4.755},
+    {'name': 'Villaviciosa', 'type': 'municipality', 'province': 'Asturias', 'municipality': 'Villaviciosa',
+     'lat': 43.481, 'lon': -5.435},
+    {'name': 'Cangas de Onís', 'type': 'municipality', 'province': 'Asturias', 'municipality': 'Cangas de Onís',
+     'lat': 43.351, 'lon': -5.129},
+    {'name': 'San Martín', 'type': 'locality', 'province': 'Asturias', 'municipality': 'Llanes',
+     'lat': 43.41, 'lon': -4.80},
+    {'name': 'San Martín', 'type': 'locality', 'province': 'Asturias', 'municipality': 'Villaviciosa',
+     'lat': 43.47, 'lon': -5.40},
+    {'name': 'Barro', 'type': 'parish', 'province': 'Asturias', 'municipality': 'Llanes', 'parish': 'Barro',
+     'lat': 43.436, 'lon': -4.834},
+    {'name': 'Poo-Celorio', 'type': 'parish', 'province': 'Asturias', 'municipality': 'Llanes',
+     'parish': 'Poo-Celorio', 'lat': 43.428, 'lon': -4.800},
+]
+
+
+@pytest.fixture
+def gazetteer():
+    return Gazetteer(PLACES, Config.GAZETTEER_MIN_SIMILARITY)
+
+
+def similarity(a, b):
+    """Dice similarity of the trigrams of two names, as the gazetteer scores misspellings"""
+    a, b = trigrams(normalize_address(a)), trigrams(normalize_address(b))
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class TestGazetteer:
+    """Test cases for resolving addresses to places"""
+
+    def test_same_name_in_two_municipalities(self, gazetteer):
+        """Test a name shared by places of two municipalities is only resolved with its municipality"""
+        assert gazetteer.resolve('San Martín') is None
+        assert gazetteer.resolve('San Martín, Asturias, Spain') is None
+        assert gazetteer.resolve('San Martin, Llanes, Spain')['lat'] == 43.41
+        assert gazetteer.resolve('San Martín, Villaviciosa')['lat'] == 43.47
+
+    def test_misspelling_below_min_similarity(self, gazetteer):
+        """Test misspellings are matched down to GAZETTEER_MIN_SIMILARITY and no further"""
+        close, far = 'Villavicosa', 'Vilavicosa'
+        assert similarity(close, 'Villaviciosa') >= Config.GAZETTEER_MIN_SIMILARITY
+        assert Config.GAZETTEER_MIN_SIMILARITY - 0.05 < similarity(far, 'Villaviciosa') < Config.GAZETTEER_MIN_SIMILARITY
+
+        assert gazetteer.resolve(f'{close}, Asturias')['name'] == 'Villaviciosa'
+        assert gazetteer.resolve(f'{far}, Asturias') is None
+
+    def test_hyphenated_parishes(self, gazetteer):
+        """Test hyphenated names match whole, and compound names not in the gazetteer match by their pieces"""
+        assert gazetteer.resolve('Poo-Celorio, Llanes')['name'] == 'Poo-Celorio'
+        assert gazetteer.resolve('Barro-Niembro, Llanes, Asturias')['name'] == 'Barro'
+        assert gazetteer.resolve('Barro-Niembro, Villaviciosa') is None
+
+    def test_alias_matches(self, gazetteer):
+        """Test aliases resolve to their place"""
+        place = gazetteer.resolve('Concejo de Llanes, Spain')
+
+        assert place['name'] == 'Llanes'
+        assert gazetteer.geocode('Concejo de Llanes')['formatted_address'] == 'Llanes, Asturias, Spain'
+
+    def test_municipality_address_from_free_text(self, gazetteer):
+        """Test a municipality named anywhere in text without address parts is found"""
+        assert gazetteer.municipality_address('Parcela rústica en Cangas de Onís con vistas') == \
+            'Cangas de Onís, Asturias, Spain'
+        assert gazetteer.municipality_address('Terreno en llanes') == 'Llanes, Asturias, Spain'
+        assert gazetteer.municipality_address('Finca junto a la playa') is None
+
+    @patch('utils.http_client.HttpClient.get')
+    def test_gazetteer_geocodes_places_offline(self, mock_get, app, tmp_path):
+        """Test place names resolve from the gazetteer without network calls, street addresses still go to providers"""
+        rows = [
+            ['1', 'Asturias', 'Asturias', '', '43.3614', '-5.8593', 'A', 'ADM2', 'ES', '', '34', 'O', '', ''],
+            ['2', 'Llanes', 'Llanes', 'Concejo de Llanes', '43.42', '-4.755', 'A', 'ADM3', 'ES', '', '34', 'O', '33036', ''],
+            ['3', 'Posada', 'Posada', 'Posada de Llanes', '43.425', '-4.857', 'P', 'PPL', 'ES', '', '34', 'O', '33036', ''],
+            ['4', 'Santander', 'Santander', '', '43.4623', '-3.8099', 'A', 'ADM3', 'ES', '', '39', 'S', '39075', ''],
+            ['5', 'Madrid', 'Madrid', '', '40.4165', '-3.7026', 'P', 'PPLC', 'ES', '', '29', 'M', '28079', ''],
+        ]
+        dump = tmp_path / 'ES.txt'
+        dump.write_text('\n'.join('\t'.join(row) for row in rows) + '\n', encoding='utf-8')
+        gazetteer_path = str(tmp_path / 'gazetteer.json')
+        assert import_geonames(str(dump), gazetteer_path) == 4
+
+        def no_results(url, **kwargs):
+            if 'googleapis' in url:
+                return Mock(status_code=200, json=Mock(return_value={'status': 'ZERO_RESULTS', 'results': []}))
+            return Mock(status_code=200, json=Mock(return_value=[]))
+        mock_get.side_effect = no_results
+
+        def providers_called():
+            return ['google' if 'googleapis' in call.args[0] else 'nominatim' for call in mock_get.call_args_list]
+
+        with app.app_context(), patch('config.Config.GAZETTEER_PATH', gazetteer_path):
+            geocoding = GeocodingService()
+            geocoding.google_maps_key = 'test-key'
+            result = geocoding.geocode_address('Posada de Llanes - Asturias, Spain')
+            assert (result['lat'], result['lng'], result['provider']) == (43.425, -4.857, 'gazetteer')
+            assert result['formatted_address'] == 'Posada, Llanes, Asturias, Spain'
+            assert geocoding.geocode_address('Llanez, Spain')['lat'] == 43.42
+            assert geocoding.geocode_address('Asturias, Spain')['lng'] == -5.8593
+            assert mock_get.call_count == 0
+
+            # A known place under the wrong municipality is not guessed: it goes to Google, then Nominatim
+            assert geocoding.geocode_address('Posada, Santander, Spain') is None
+            assert providers_called() == ['google', 'nominatim']
+
+            geocoding.geocode_address('Calle Mayor 3, Llanes, Spain')
+            assert providers_called() == ['google', 'nominatim', 'google', 'nominatim']
+
+            enrichment_service = EnrichmentService()
+            assert enrichment_service._get_regional_fallbacks('Parcela en Posada de Llanes') == ['Llanes, Asturias, Spain']
+            assert enrichment_service._get_regional_fallbacks('Torrelavega') == ['Asturias, Spain', 'Cantabria, Spain']
@@ -0,0 +1,111 @@
+"""
+Tests for the persistent geocode cache.
+"""
+
+import pytest
+import requests
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from app import create_app, db
+from models import GeocodeCache
+from services.geocode_cache import normalize_address
+from tests import setup_test_environment
+from utils.geocoding import GeocodingService
+
+
+@pytest.fixture
+def app():
+    """Create test Flask application"""
+    setup_test_environment()
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+class TestGeocodeCache:
+    """Test cases for cached geocoding results"""
+
+    @patch('utils.http_client.HttpClient.get')
+    def test_negative_ttl_applies_to_long_lived_service(self, mock_get, app, tmp_path):
+        """Test a service reused across batches asks again for a miss once it has expired"""
+        def no_results(url, **kwargs):
+            if 'googleapis' in url:
+                return Mock(status_code=200, json=Mock(return_value={'status': 'ZERO_RESULTS', 'results': []}))
+            return Mock(status_code=200, json=Mock(return_value=[]))
+        mock_get.side_effect = no_results
+
+        with patch('config.Config.GAZETTEER_PATH', str(tmp_path / 'missing.json')):
+            geocoding = GeocodingService()
+            geocoding.google_maps_key = 'test-key'
+            assert geocoding.geocode_address('Nowhere, Asturias, Spain') is None
+            calls = mock_get.call_count
+            assert calls > 0
+
+            GeocodeCache.query.update({GeocodeCache.fetched_at: datetime.utcnow() - timedelta(days=2)})
+            db.session.commit()
+            # Within a batch the result is reused as is
+            geocoding.geocode_address('Nowhere, Asturias, Spain')
+            assert mock_get.call_count == calls
+
+            # The next batch starts from the table, where the miss has expired
+            geocoding.clear()
+            geocoding.geocode_address('Nowhere, Asturias, Spain')
+            assert mock_get.call_count == 2 * calls
+
+    @patch('utils.http_client.HttpClient.get')
+    def test_geocode_cache_remembers_normalized_addresses(self, mock_get, app, tmp_path):
+        """Test geocodes are cached by normalized address, misses only briefly and provider errors not at all"""
+        def geocode_response(url, params=None, **kwargs):
+            response = Mock(status_code=200)
+            if 'nominatim' in url:
+                response.json.return_value = []
+            elif params['address'].startswith('Nowhere'):
+                response.json.return_value = {'status': 'ZERO_RESULTS', 'results': []}
+            else:
+                response.json.return_value = {'status': 'OK', 'results': [{
+                    'geometry': {'location': {'lat': 43.5322, 'lng': -5.6611}},
+                    'formatted_address': 'Gijón, Asturias, Spain'
+                }]}
+            return response
+        mock_get.side_effect = geocode_response
+
+        assert normalize_address('Somió - Gijón ,  Asturias, Spain') == 'somio, gijon, asturias, spain'
+
+        # No gazetteer, so every address goes through the cache
+        with app.app_context(), patch('config.Config.GAZETTEER_PATH', str(tmp_path / 'missing.json')):
+            geocoding = GeocodingService()
+            geocoding.google_maps_key = 'test-key'
+            result = geocoding.geocode_address('Somió - Gijón, Asturias, Spain')
+            assert (result['lat'], result['lng']) == (43.5322, -5.6611)
+            assert geocoding.geocode_address('somio, gijon, asturias, spain') == result
+            assert mock_get.call_count == 1
+
+            # Another service (a new batch worker) reads the table
+            other = GeocodingService()
+            other.google_maps_key = 'test-key'
+            assert other.geocode_address('Somio, Gijon, Asturias, Spain')['lat'] == 43.5322
+            assert mock_get.call_count == 1
+
+            # Unknown addresses are cached as misses until the negative TTL passes
+            assert other.geocode_address('Nowhere, Asturias, Spain') is None
+            assert mock_get.call_count == 3
+            assert GeocodingService().geocode_address('Nowhere, Asturias, Spain') is None
+            assert mock_get.call_count == 3
+            GeocodeCache.query.filter_by(found=False).update({GeocodeCache.fetched_at: datetime.utcnow() - timedelta(days=2)})
+            db.session.commit()
+            retry = GeocodingService()
+            retry.google_maps_key = 'test-key'
+            retry.geocode_address('Nowhere, Asturias, Spain')
+            assert mock_get.call_count == 5
+
+            # Provider errors are not cached
+            mock_get.side_effect = requests.exceptions.ConnectionError()
+            assert other.geocode_address('Llanes, Asturias, Spain') is None
+            assert other.geocode_address('Llanes, Asturias, Spain') is None
+            assert mock_get.call_count == 9
+            assert GeocodeCache.query.count() == 2
@@ -0,0 +1,133 @@
+"""
+Tests for the shared HTTP client.
+"""
+
+import time
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from utils import http_client
+from utils.http_client import HttpClient, DeadlineExceeded, get_http_client
+
+
+def make_response(status_code, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def client():
+    """HttpClient with fast backoff and no real network"""
+    client = HttpClient(connect_timeout=1, read_timeout=2, deadline=5, max_retries=2,
+                        backoff_factor=0.01, backoff_max=0.05)
+    client.session.request = Mock()
+    return client
+
+
+class TestHttpClient:
+    """Test cases for HttpClient retries, backoff and deadlines"""
+
+    @patch('utils.http_client.time.sleep')
+    def test_retries_server_error_then_succeeds(self, mock_sleep, client):
+        """Test a 5xx is retried after a backoff and the 200 is returned"""
+        client.session.request.side_effect = [make_response(503), make_response(200)]
+
+        response = client.get('https://api.example.com/data')
+
+        assert response.status_code == 200
+        assert client.session.request.call_count == 2
+        assert mock_sleep.call_count == 1
+        assert 0 <= mock_sleep.call_args[0][0] <= 0.05
+
+        metrics = client.metrics()['api.example.com']
+        assert metrics['requests'] == 2
+        assert metrics['errors'] == 1
+        assert metrics['retries'] == 1
+        assert metrics['status_codes'] == {503: 1, 200: 1}
+
+    @patch('utils.http_client.time.sleep')
+    def test_client_error_not_retried(self, mock_sleep, client):
+        """Test a non-retryable 4xx is returned at once"""
+        client.session.request.return_value = make_response(404)
+
+        response = client.get('https://api.example.com/missing')
+
+        assert response.status_code == 404
+        assert client.session.request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch('utils.http_client.time.sleep')
+    def test_retries_exhausted_returns_last_response(self, mock_sleep, client):
+        """Test the last retryable response is returned once retries run out"""
+        client.session.request.return_value = make_response(502)
+
+        response = client.get('https://api.example.com/data')
+
+        assert response.status_code == 502
+        assert client.session.request.call_count == client.max_retries + 1
+
+    @patch('utils.http_client.time.sleep')
+    def test_connection_error_raised_after_retries(self, mock_sleep, client):
+        """Test connection errors are retried and the last one is raised"""
+        client.session.request.side_effect = requests.ConnectionError('refused')
+
+        with pytest.raises(requests.ConnectionError):
+            client.get('https://api.example.com/data')
+
+        assert client.session.request.call_count == client.max_retries + 1
+
+    def test_retry_after_header_respected(self, client):
+        """Test Retry-After raises the backoff up to backoff_max"""
+        deadline_at = time.monotonic() + 10
+
+        assert client._backoff_delay(0, deadline_at, '30') == client.backoff_max
+        assert client._backoff_delay(0, deadline_at) <= client.backoff_factor
+
+    def test_backoff_never_passes_deadline(self, client):
+        """Test the backoff delay is cut to the time left before the deadline"""
+        client.backoff_max = 10
+
+        assert client._backoff_delay(5, time.monotonic() + 0.01) <= 0.01
+        assert client._backoff_delay(5, time.monotonic() - 1) == 0.0
+
+    def test_deadline_exceeded(self, client):
+        """Test retries stop with DeadlineExceeded once the overall deadline has passed"""
+        def slow_server_error(*args, **kwargs):
+            time.sleep(0.06)
+            return make_response(503)
+        client.session.request.side_effect = slow_server_error
+
+        with pytest.raises(DeadlineExceeded):
+            client.get('https://api.example.com/slow', deadline=0.05)
+
+        assert client.session.request.call_count == 1
+
+    def test_attempt_timeout_bounded_by_deadline(self, client):
+        """Test each attempt's timeouts never exceed the remaining deadline"""
+        client.session.request.return_value = make_response(200)
+
+        client.get('https://api.example.com/data', deadline=0.5)
+
+        connect_timeout, read_timeout = client.session.request.call_args[1]['timeout']
+        assert connect_timeout <= 0.5
+        assert read_timeout <= 0.5
+
+
+class TestGetHttpClient:
+    """Test cases for the process-wide client"""
+
+    def test_same_client_within_process(self):
+        """Test the client is shared within a process"""
+        assert get_http_client() is get_http_client()
+
+    def test_new_client_after_fork(self):
+        """Test a forked process gets its own client instead of the parent's pools"""
+        parent_client = get_http_client()
+
+        with patch('utils.http_client.os.getpid', return_value=http_client._client_pid + 1):
+            child_client = get_http_client()
+
+        assert child_client is not parent_client
+        assert http_client._client is child_client
@@ -0,0 +1,52 @@
+"""
+Tests for shared keyword-category matching.
+"""
+
+import pytest
+from utils.keyword_matcher import KeywordMatcher, keyword_matcher
+
+
+class TestKeywordMatcher:
+    """Test cases for KeywordMatcher"""
+    
+    def test_keyword_matcher_matches_substring_scans(self):
+        """Test the shared matcher finds the same categories as any(keyword in text)"""
+        categories = {
+            'south': ['sur'], 'east': ['este'], 'southeast': ['sureste'],
+            'sea': ['mar', 'vista al mar', 'playa'], 'village': ['pueblo', 'mar']
+        }
+        matcher = KeywordMatcher(categories)
+        
+        for text in ['orientación sureste con vista al mar', 'cerca del pueblo', 'oeste', '', 'vistas']:
+            expected = {c for c, keywords in categories.items() if any(k in text for k in keywords)}
+            assert matcher.matches(text) == expected
+        assert matcher.first('orientación sureste') == 'south'
+        assert matcher.first('norte') is None
+    
+    def test_empty_text(self):
+        """Test empty or missing text matches nothing"""
+        matcher = KeywordMatcher({'sea': ['mar']})
+        
+        assert matcher.matches(None) == set()
+        assert matcher.matches('') == set()
+        assert matcher.first(None) is None
+        assert not matcher.search('')
+    
+    def test_matching_is_case_sensitive(self):
+        """Test matching behaves like the in operator"""
+        matcher = KeywordMatcher({'sea': ['mar']})
+        
+        assert matcher.search('vistas al mar')
+        assert not matcher.search('Vistas al MAR')
+    
+    def test_empty_keyword_rejected(self):
+        """Test an empty keyword, which would match every text, is refused"""
+        with pytest.raises(ValueError):
+            KeywordMatcher({'sea': ['mar', '']})
+    
+    def test_shared_matcher_built_once_per_keyword_set(self):
+        """Test keyword_matcher returns the same matcher for equal keyword sets"""
+        first = keyword_matcher({'sea': ['mar', 'playa']})
+        
+        assert keyword_matcher({'sea': ['mar', 'playa']}) is first
+        assert keyword_matcher({'sea': ['playa', 'mar']}) is not first
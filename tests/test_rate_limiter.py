@@ -0,0 +1,198 @@
+"""
+Tests for per-provider API rate limiting.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+from utils import rate_limiter
+from utils.rate_limiter import TokenBucket, RedisTokenBucket, RateLimiter, get_rate_limiter
+
+
+class FakeClock:
+    """Stand-in for time.monotonic/time.sleep so waits take no real time"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch('utils.rate_limiter.time.monotonic', clock.monotonic), \
+            patch('utils.rate_limiter.time.sleep', clock.sleep):
+        yield clock
+
+
+class TestTokenBucket:
+    """Test cases for the in-process token bucket"""
+
+    def test_burst_then_wait(self, clock):
+        """Test a full bucket allows a burst, then reports the wait for the next token"""
+        bucket = TokenBucket('test', rate=2, capacity=3)
+
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.try_acquire() == pytest.approx(0.5)
+
+    def test_refill_over_time(self, clock):
+        """Test tokens refill at the rate without exceeding the capacity"""
+        bucket = TokenBucket('test', rate=2, capacity=3)
+        for _ in range(3):
+            bucket.try_acquire()
+
+        clock.now += 1.0
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() > 0
+
+        clock.now += 60
+        assert bucket.tokens <= bucket.capacity
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+class TestRateLimiter:
+    """Test cases for blocking acquire, Redis fallback and the per-process share"""
+
+    limits = {'google_places': {'rate': 10, 'burst': 2}}
+
+    def test_acquire_blocks_until_refill(self, clock):
+        """Test acquire sleeps just long enough for the next token"""
+        limiter = RateLimiter(self.limits)
+
+        assert limiter.acquire('google_places')
+        assert limiter.acquire('google_places')
+        assert clock.sleeps == []
+
+        assert limiter.acquire('google_places')
+        assert sum(clock.sleeps) == pytest.approx(0.1)
+        assert limiter.get_stats()['google_places']['acquired'] == 3
+        assert limiter.get_stats()['google_places']['waited_seconds'] == pytest.approx(0.1)
+
+    def test_acquire_timeout(self, clock):
+        """Test acquire gives up without sleeping when the wait exceeds the timeout"""
+        limiter = RateLimiter(self.limits)
+        limiter.acquire('google_places', tokens=2)
+
+        assert limiter.acquire('google_places', timeout=0.05) is False
+        assert clock.sleeps == []
+        assert limiter.get_stats()['google_places']['timeouts'] == 1
+
+    def test_acquire_async_waits_without_blocking(self, clock):
+        """Test the async acquire waits on the event loop instead of time.sleep"""
+        limiter = RateLimiter(self.limits)
+        limiter.acquire('google_places', tokens=2)
+        waits = []
+
+        async def fake_sleep(seconds):
+            waits.append(seconds)
+            clock.now += seconds
+
+        with patch('asyncio.sleep', fake_sleep):
+            assert asyncio.run(limiter.acquire_async('google_places'))
+
+        assert waits == [pytest.approx(0.1)]
+        assert clock.sleeps == []
+
+    def test_unknown_provider_not_limited(self, clock):
+        """Test providers without a budget are never limited"""
+        limiter = RateLimiter(self.limits)
+
+        assert all(limiter.acquire('unknown') for _ in range(100))
+        assert clock.sleeps == []
+
+    def test_process_share_splits_budget(self, clock):
+        """Test each of N processes gets 1/N of the rate and burst"""
+        limiter = RateLimiter({'google_places': {'rate': 10, 'burst': 4}}, process_share=2)
+        bucket = limiter.local_buckets['google_places']
+
+        assert bucket.rate == 5
+        assert bucket.capacity == 2
+
+    def test_process_share_keeps_one_token_burst(self, clock):
+        """Test a share smaller than one token still allows single requests"""
+        limiter = RateLimiter({'nominatim': {'rate': 1, 'burst': 1}}, process_share=4)
+
+        assert limiter.local_buckets['nominatim'].capacity == 1
+        assert limiter.acquire('nominatim')
+
+    @patch('redis.Redis.from_url', side_effect=ConnectionError('no redis'))
+    def test_redis_unavailable_uses_memory(self, mock_from_url, clock):
+        """Test a Redis client that cannot be created falls back to in-process buckets"""
+        limiter = RateLimiter(self.limits, redis_url='redis://localhost:6379/0')
+
+        assert limiter.redis_buckets == {}
+        assert limiter.acquire('google_places')
+        assert limiter.get_stats()['google_places']['backend'] == 'memory'
+
+    @patch('redis.Redis.from_url')
+    def test_redis_failure_falls_back_to_memory(self, mock_from_url, clock):
+        """Test a Redis error during acquire switches to in-process buckets"""
+        script = Mock(side_effect=ConnectionError('connection lost'))
+        mock_from_url.return_value.register_script.return_value = script
+        limiter = RateLimiter(self.limits, redis_url='redis://localhost:6379/0')
+        assert limiter.get_stats()['google_places']['backend'] == 'redis'
+
+        assert limiter.acquire('google_places')
+        assert limiter.acquire('google_places')
+
+        assert script.call_count == 1
+        assert limiter.redis_buckets == {}
+        assert limiter.get_stats()['google_places']['backend'] == 'memory'
+
+    @patch('redis.Redis.from_url')
+    def test_redis_bucket_wait(self, mock_from_url, clock):
+        """Test the wait returned by the Redis script is slept before retrying"""
+        script = Mock(side_effect=['0.25', '0'])
+        mock_from_url.return_value.register_script.return_value = script
+        limiter = RateLimiter(self.limits, redis_url='redis://localhost:6379/0')
+
+        assert limiter.acquire('google_places')
+
+        assert clock.sleeps == [0.25]
+        assert script.call_args[1] == {'keys': ['ratelimit:google_places'], 'args': [10, 2, 1]}
+
+    def test_redis_bucket_parses_script_result(self):
+        """Test the Redis bucket runs the token-bucket script and parses its wait"""
+        client = Mock()
+        bucket = RedisTokenBucket('google_places', rate=10, capacity=2, client=client)
+
+        client.register_script.return_value.return_value = b'0'
+        assert bucket.try_acquire() == 0.0
+        assert client.register_script.call_args[0][0] == rate_limiter.REDIS_TOKEN_BUCKET_SCRIPT
+
+
+class TestGetRateLimiter:
+    """Test cases for the process-wide limiter"""
+
+    @pytest.fixture(autouse=True)
+    def reset_limiter(self):
+        rate_limiter._limiter = None
+        yield
+        rate_limiter._limiter = None
+
+    def test_rate_limit_processes_env(self, monkeypatch):
+        """Test RATE_LIMIT_PROCESSES splits the configured budgets"""
+        from config import Config
+        monkeypatch.delenv('REDIS_URL', raising=False)
+        monkeypatch.setenv('RATE_LIMIT_PROCESSES', '4')
+
+        limiter = get_rate_limiter()
+
+        bucket = limiter.local_buckets['google_places']
+        assert bucket.rate == Config.PROVIDER_RATE_LIMITS['google_places']['rate'] / 4
+
+    def test_new_limiter_after_fork(self, monkeypatch):
+        """Test a forked process builds its own limiter"""
+        monkeypatch.delenv('REDIS_URL', raising=False)
+        parent_limiter = get_rate_limiter()
+
+        with patch('utils.rate_limiter.os.getpid', return_value=rate_limiter._limiter_pid + 1):
+            assert get_rate_limiter() is not parent_limiter
@@ -0,0 +1,197 @@
+"""
+Tests for the offline road graph and the router built on it.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from app import create_app, db
+from services import road_router
+from services.road_router import (_maxspeed_kmh, _road_directions, build_road_network,
+                                  import_road_extract, route_many)
+from tests import setup_test_environment
+from utils.road_graph import RoadGraph, build_road_graph
+from utils.spatial_index import haversine_meters
+
+
+@pytest.fixture
+def app():
+    """Create test Flask application"""
+    setup_test_environment()
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_graph():
+    """Each test opens its own graph file"""
+    road_router._graph = None
+    yield
+    road_router._graph = None
+
+
+# Three junctions west of Gijón, about 1.6 km apart
+A, B, C = (43.50, -5.70), (43.50, -5.68), (43.52, -5.69)
+
+
+def open_graph(ways, tmp_path):
+    """Build a RoadGraph file from ([(lat, lon), ...], tags) ways and open it"""
+    nodes, edges = build_road_network(iter(ways))
+    path = str(tmp_path / 'roads.graph')
+    build_road_graph(nodes, edges, path)
+    return RoadGraph(path)
+
+
+def node_at(graph, point):
+    return graph.nearest_node(*point)[0]
+
+
+class TestRoadTags:
+    """Test cases for reading OSM speed and direction tags"""
+
+    def test_maxspeed_units_and_junk(self):
+        """Test km/h and mph speeds are read, anything non-numeric is ignored"""
+        assert _maxspeed_kmh('50') == 50
+        assert _maxspeed_kmh(' 80 ') == 80
+        assert _maxspeed_kmh('30 mph') == pytest.approx(48.28, abs=0.01)
+        assert _maxspeed_kmh('none') is None
+        assert _maxspeed_kmh('signals') is None
+        assert _maxspeed_kmh('ES:urban') is None
+        assert _maxspeed_kmh('') is None
+        assert _maxspeed_kmh(None) is None
+
+    def test_maxspeed_caps_class_speed(self):
+        """Test maxspeed only lowers the highway class speed and junk values leave it alone"""
+        meters = haversine_meters(*A, *B)
+        for maxspeed, speed in (('50', 50), ('120', 70), ('none', 70), ('fast', 70)):
+            _, edges = build_road_network(iter([([A, B], {'highway': 'primary', 'maxspeed': maxspeed})]))
+            assert edges[0][2] == pytest.approx(meters / (speed / 3.6))
+
+    def test_directions(self):
+        """Test oneway tags and the one-way default of motorways and roundabouts"""
+        assert _road_directions({'highway': 'primary'}) == (True, True)
+        assert _road_directions({'highway': 'primary', 'oneway': 'yes'}) == (True, False)
+        assert _road_directions({'highway': 'primary', 'oneway': '-1'}) == (False, True)
+        assert _road_directions({'highway': 'motorway'}) == (True, False)
+        assert _road_directions({'highway': 'motorway', 'oneway': 'no'}) == (True, True)
+        assert _road_directions({'highway': 'tertiary', 'junction': 'roundabout'}) == (True, False)
+
+
+class TestRoadGraph:
+    """Test cases for shortest paths on the road graph"""
+
+    def test_oneway_routed_forward_only(self, tmp_path):
+        """Test a oneway street is only driven along its node order; the way back takes the detour"""
+        graph = open_graph([
+            ([A, B], {'highway': 'primary', 'oneway': 'yes'}),
+            ([B, C, A], {'highway': 'residential'}),
+        ], tmp_path)
+        a, b = node_at(graph, A), node_at(graph, B)
+
+        forward_seconds, forward_meters = graph.shortest_paths(a, [b])[b]
+        back_seconds, back_meters = graph.shortest_paths(b, [a])[a]
+
+        assert forward_meters == pytest.approx(haversine_meters(*A, *B))
+        assert back_meters == pytest.approx(haversine_meters(*B, *C) + haversine_meters(*C, *A))
+        assert back_seconds > forward_seconds
+        graph.close()
+
+    def test_oneway_reversed(self, tmp_path):
+        """Test oneway=-1 is only driven against its node order"""
+        graph = open_graph([([A, B], {'highway': 'primary', 'oneway': '-1'})], tmp_path)
+        a, b = node_at(graph, A), node_at(graph, B)
+
+        assert b not in graph.shortest_paths(a, [b])
+        assert a in graph.shortest_paths(b, [a])
+        graph.close()
+
+    def test_reverse_matches_forward(self, tmp_path):
+        """Test routes searched backwards from a target equal the forward routes to it"""
+        graph = open_graph([
+            ([A, B], {'highway': 'primary', 'oneway': 'yes'}),
+            ([B, C], {'highway': 'secondary', 'oneway': '-1'}),
+            ([C, A], {'highway': 'residential'}),
+            ([A, (43.49, -5.69), B], {'highway': 'tertiary', 'maxspeed': '30'}),
+        ], tmp_path)
+
+        for target in range(len(graph)):
+            backwards = graph.shortest_paths(target, reverse=True)
+            for source in range(len(graph)):
+                forward = graph.shortest_paths(source, [target])
+                assert (target in forward) == (source in backwards)
+                if target in forward:
+                    assert backwards[source] == pytest.approx(forward[target])
+        graph.close()
+
+
+class TestRouteMany:
+    """Test cases for routing points that are off the graph"""
+
+    def test_snap_distance_cutoff(self, tmp_path):
+        """Test points further than ROAD_ROUTER_MAX_SNAP_METERS from a road are not routed"""
+        graph_path = str(tmp_path / 'roads.graph')
+        nodes, edges = build_road_network(iter([([A, B], {'highway': 'primary'})]))
+        build_road_graph(nodes, edges, graph_path)
+        # About 550 m north of B
+        off_road = (B[0] + 0.005, B[1])
+        snap = haversine_meters(*off_road, *B)
+
+        with patch('config.Config.ROAD_GRAPH_PATH', graph_path):
+            with patch('config.Config.ROAD_ROUTER_MAX_SNAP_METERS', 1000):
+                route, = route_many(*A, [off_road])
+                assert route['distance'] == round((haversine_meters(*A, *B) + snap) / 1000)
+
+            with patch('config.Config.ROAD_ROUTER_MAX_SNAP_METERS', snap - 1):
+                assert route_many(*A, [off_road, B])[0] is None
+                assert route_many(*A, [off_road, B])[1] is not None
+                # An origin too far from the roads routes nothing
+                assert route_many(*off_road, [A, B]) == [None, None]
+
+    def test_no_graph_built(self, tmp_path):
+        """Test routing is skipped when no graph file exists"""
+        with patch('config.Config.ROAD_GRAPH_PATH', str(tmp_path / 'missing.graph')):
+            assert route_many(*A, [B]) is None
+
+    def test_travel_times_route_on_local_road_graph(self, app, tmp_path):
+        """Test travel times come from the offline road graph, with islands dropped and far points unrouted"""
+        from services.travel_time_service import TravelTimeService
+
+        gijon, midpoint, oviedo = (-5.6611, 43.5322), (-5.7600, 43.4470), (-5.8593, 43.3614)
+        extract = tmp_path / 'roads.geojson'
+        extract.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'highway': 'primary'},
+             'geometry': {'type': 'LineString', 'coordinates': [list(gijon), list(midpoint)]}},
+            {'type': 'Feature', 'properties': {'highway': 'secondary', 'maxspeed': '50'},
+             'geometry': {'type': 'LineString', 'coordinates': [list(midpoint), list(oviedo)]}},
+            # Unconnected road near Bilbao and a footpath, both left out of the graph
+            {'type': 'Feature', 'properties': {'highway': 'primary'},
+             'geometry': {'type': 'LineString', 'coordinates': [[-2.9106, 43.3011], [-2.9000, 43.3100]]}},
+            {'type': 'Feature', 'properties': {'highway': 'footway'},
+             'geometry': {'type': 'LineString', 'coordinates': [list(gijon), [-5.6500, 43.5400]]}},
+        ]}))
+        graph_path = str(tmp_path / 'roads.graph')
+
+        with app.app_context(), patch('config.Config.ROAD_GRAPH_PATH', graph_path), \
+             patch('config.Config.TRAVEL_TIME_CANDIDATES', {}):
+            assert import_road_extract(str(extract)) == (3, 4)
+
+            first_leg = haversine_meters(gijon[1], gijon[0], midpoint[1], midpoint[0])
+            second_leg = haversine_meters(midpoint[1], midpoint[0], oviedo[1], oviedo[0])
+            access = haversine_meters(43.5330, -5.6611, gijon[1], gijon[0])
+            expected_seconds = first_leg / (70 / 3.6) + second_leg / (50 / 3.6) + access / (20 / 3.6)
+
+            oviedo_route, bilbao_route = route_many(43.5330, -5.6611, [(oviedo[1], oviedo[0]), (43.3011, -2.9106)])
+            assert oviedo_route == {'time': round(expected_seconds / 60),
+                                    'distance': round((first_leg + second_leg + access) / 1000)}
+            assert bilbao_route is None
+
+            travel_service = TravelTimeService()
+            travel_service.google_maps_key = None
+            travel_data = travel_service.compute_travel_times(43.5330, -5.6611)
+            assert travel_data['travel_time_oviedo'] == oviedo_route['time']
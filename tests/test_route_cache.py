@@ -0,0 +1,132 @@
+"""
+Tests for the persistent route cache.
+"""
+
+import os
+import csv
+import time
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from app import create_app, db
+from models import RouteCache
+from services.route_cache import (CSV_FIELDS, export_routes, get_cached_routes, load_routes,
+                                  purge_expired_routes, route_cell, store_routes)
+from services.travel_time_service import TravelTimeService
+from tests import setup_test_environment
+
+
+@pytest.fixture
+def app():
+    """Create test Flask application"""
+    setup_test_environment()
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+GIJON = (43.5322, -5.6611)
+
+
+def set_fetched_at(destination, fetched_at):
+    RouteCache.query.filter_by(destination=destination).update({RouteCache.fetched_at: fetched_at})
+    db.session.commit()
+
+
+class TestRouteCache:
+    """Test cases for storing, expiring and loading cached routes"""
+
+    def test_routes_older_than_road_graph_ignored_and_purged(self, app, tmp_path):
+        """Test road graph routes computed before the graph was rebuilt are misses and get purged"""
+        graph_path = tmp_path / 'roads.graph'
+        graph_path.write_bytes(b'')
+        built = time.time() - 2 * 3600
+        os.utime(graph_path, (built, built))
+
+        with patch('config.Config.ROAD_GRAPH_PATH', str(graph_path)):
+            store_routes({GIJON: {'Oviedo': {'time': 25, 'distance': 30},
+                                  'Llanes': {'time': 70, 'distance': 95}}}, 'road_graph')
+            store_routes({GIJON: {'Santander': {'time': 120, 'distance': 190}}}, 'google')
+            # Routed on the previous graph; Google routes do not depend on it
+            three_hours_ago = datetime.utcnow() - timedelta(hours=3)
+            set_fetched_at('Llanes', three_hours_ago)
+            set_fetched_at('Santander', three_hours_ago)
+
+            cached = get_cached_routes([GIJON], ['Oviedo', 'Llanes', 'Santander'])
+            assert set(cached[GIJON]) == {'Oviedo', 'Santander'}
+
+            assert purge_expired_routes() == 1
+            assert {route.destination for route in RouteCache.query} == {'Oviedo', 'Santander'}
+
+        # Without a graph file no road graph route is judged by its age against it
+        with patch('config.Config.ROAD_GRAPH_PATH', str(tmp_path / 'missing.graph')):
+            assert set(get_cached_routes([GIJON], ['Oviedo', 'Santander'])[GIJON]) == {'Oviedo', 'Santander'}
+
+    def test_load_keeps_newer_rows(self, app, tmp_path):
+        """Test loading an export only replaces cached routes that are older than the loaded rows"""
+        store_routes({GIJON: {'Oviedo': {'time': 25, 'distance': 30},
+                              'Llanes': {'time': 70, 'distance': 95}}}, 'google')
+        set_fetched_at('Oviedo', datetime.utcnow() - timedelta(days=2))
+        set_fetched_at('Llanes', datetime.utcnow() - timedelta(days=2))
+
+        export_path = tmp_path / 'routes.csv'
+        with open(export_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for destination, travel_time, age in (('Oviedo', 99, 3), ('Llanes', 65, 1), ('Ribadesella', 50, 1)):
+                writer.writerow({'origin_cell': route_cell(*GIJON), 'destination': destination, 'mode': 'driving',
+                                 'travel_time': travel_time, 'distance': 60, 'provider': 'google',
+                                 'fetched_at': (datetime.utcnow() - timedelta(days=age)).isoformat()})
+
+        load_routes(str(export_path))
+
+        times = {route.destination: route.travel_time for route in RouteCache.query}
+        assert times == {'Oviedo': 25, 'Llanes': 65, 'Ribadesella': 50}
+
+    @patch('utils.http_client.HttpClient.get')
+    def test_route_cache_persists_routes_across_services(self, mock_get, app, tmp_path):
+        """Test routed travel times are stored in route_cache, reused until they expire and survive export/load"""
+        def matrix_response(url, params=None, **kwargs):
+            response = Mock(status_code=200)
+            response.json.return_value = {'status': 'OK', 'rows': [{'elements': [
+                {'status': 'OK', 'duration': {'value': 60 * 25}, 'distance': {'value': 30000}}
+                for _ in params['destinations'].split('|')
+            ]}]}
+            return response
+        mock_get.side_effect = matrix_response
+
+        with app.app_context(), patch('config.Config.ROAD_GRAPH_PATH', str(tmp_path / 'missing.graph')):
+            travel_service = TravelTimeService()
+            travel_service.google_maps_key = 'test-key'
+            travel_data = travel_service.compute_travel_times(43.5322, -5.6611)
+            assert mock_get.call_count == 1
+            assert travel_data['travel_time_oviedo'] == 25
+            stored = RouteCache.query.count()
+            assert stored > 0 and {route.provider for route in RouteCache.query} == {'google'}
+
+            # A new service (no prefetched results) in the same origin cell asks no provider
+            mock_get.reset_mock()
+            other_service = TravelTimeService()
+            other_service.google_maps_key = 'test-key'
+            assert other_service.compute_travel_times(43.53221, -5.66111) == travel_data
+            mock_get.assert_not_called()
+
+            export_path = str(tmp_path / 'routes.csv')
+            assert export_routes(export_path) == stored
+
+            # Expired routes are fetched again, and purged
+            RouteCache.query.update({RouteCache.fetched_at: datetime.utcnow() - timedelta(days=365)})
+            db.session.commit()
+            other_service.compute_travel_times(43.53221, -5.66111)
+            assert mock_get.call_count == 1
+            RouteCache.query.update({RouteCache.fetched_at: datetime.utcnow() - timedelta(days=365)})
+            db.session.commit()
+            assert purge_expired_routes() == stored
+
+            assert load_routes(export_path, batch_size=3) == stored
+            assert RouteCache.query.count() == stored
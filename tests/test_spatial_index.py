@@ -0,0 +1,96 @@
+"""
+Tests for the memory-mapped spatial point index.
+"""
+
+import random
+import pytest
+from utils.spatial_index import SpatialIndex, build_spatial_index, haversine_meters
+
+
+@pytest.fixture
+def points():
+    """Random POIs over Asturias and Cantabria"""
+    rng = random.Random(10)
+    categories = ['cafe', 'school', 'hospital']
+    return [(rng.uniform(43.0, 43.7), rng.uniform(-7.2, -3.1), rng.choice(categories)) for _ in range(2000)]
+
+
+@pytest.fixture
+def index(points, tmp_path):
+    path = str(tmp_path / 'pois.idx')
+    build_spatial_index(points, path, names=[f'poi {i}' for i in range(len(points))])
+    index = SpatialIndex(path)
+    yield index
+    index.close()
+
+
+class TestSpatialIndex:
+    """Test cases for SpatialIndex radius and nearest-neighbour queries"""
+
+    def test_haversine_meters(self):
+        """Test great-circle distances"""
+        assert haversine_meters(43.5, -5.6, 43.5, -5.6) == 0.0
+        # One degree of latitude is ~111 km
+        assert 111000 < haversine_meters(43.0, -5.6, 44.0, -5.6) < 111400
+
+    def test_within_matches_brute_force(self, index, points):
+        """Test radius queries return exactly the points within the radius"""
+        for lat, lon in [(43.5322, -5.6611), (43.4623, -3.8099), (43.0, -7.2)]:
+            expected = {i for i, (p_lat, p_lon, _) in enumerate(points)
+                        if haversine_meters(lat, lon, p_lat, p_lon) <= 15000}
+            found = {(index.point(position)['lat'], index.point(position)['lon'])
+                     for position, _ in index.within(lat, lon, 15000)}
+            assert found == {(points[i][0], points[i][1]) for i in expected}
+
+    def test_nearest_matches_brute_force(self, index, points):
+        """Test nearest returns the k closest points, closest first"""
+        lat, lon = 43.3614, -5.8494
+        expected = sorted(haversine_meters(lat, lon, p_lat, p_lon) for p_lat, p_lon, _ in points)[:5]
+
+        nearest = index.nearest(lat, lon, k=5)
+
+        assert [distance for _, distance in nearest] == pytest.approx(expected)
+
+    def test_nearest_filters_categories(self, index, points):
+        """Test nearest only considers the requested categories"""
+        lat, lon = 43.3614, -5.8494
+        expected = min(haversine_meters(lat, lon, p_lat, p_lon) for p_lat, p_lon, c in points if c == 'hospital')
+
+        (position, distance), = index.nearest(lat, lon, k=1, categories=['hospital'])
+
+        assert index.point(position)['category'] == 'hospital'
+        assert distance == pytest.approx(expected)
+        assert index.nearest(lat, lon, categories=['airport']) == []
+
+    def test_count_by_category(self, index, points):
+        """Test per-category counts within a radius"""
+        lat, lon = 43.5322, -5.6611
+        expected = {}
+        for p_lat, p_lon, category in points:
+            if haversine_meters(lat, lon, p_lat, p_lon) <= 20000:
+                expected[category] = expected.get(category, 0) + 1
+
+        assert expected
+        assert index.count_by_category(lat, lon, 20000) == expected
+        assert index.count_by_category(lat, lon, 20000, ['cafe']) == {'cafe': expected['cafe']}
+
+    def test_in_memory_index_matches_file(self, index, points):
+        """Test from_points answers the same queries as the memory-mapped file"""
+        memory_index = SpatialIndex.from_points(points)
+
+        assert len(memory_index) == len(index) == len(points)
+        assert memory_index.nearest(43.4, -5.0, k=3) == index.nearest(43.4, -5.0, k=3)
+
+    def test_point_names(self, index):
+        """Test names stored with the points are returned by point()"""
+        position, _ = index.nearest(43.4, -5.0)[0]
+
+        assert index.point(position)['name'].startswith('poi ')
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test opening a file that is not an index fails clearly"""
+        path = tmp_path / 'other.idx'
+        path.write_bytes(b'not an index file')
+
+        with pytest.raises(ValueError):
+            SpatialIndex(str(path))
@@ -0,0 +1,192 @@
+"""
+Tests for the precomputed travel time grid.
+"""
+
+import json
+import math
+import struct
+import pytest
+import numpy as np
+from decimal import Decimal
+from unittest.mock import patch
+from app import create_app, db
+from models import Land
+from services import travel_time_grid
+from services.road_router import import_road_extract, route_many
+from services.travel_time_grid import (MAGIC, TravelTimeGrid, build_travel_time_grid,
+                                       land_ids_within_minutes)
+from services.travel_time_service import TravelTimeService
+from tests import setup_test_environment
+
+
+@pytest.fixture
+def app():
+    """Create test Flask application"""
+    setup_test_environment()
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_grid():
+    """Each test opens its own grid file"""
+    travel_time_grid._grid = None
+    yield
+    travel_time_grid._grid = None
+
+
+# 0.01 degree cells starting at 43.0 N, 6.0 W
+SOUTH, WEST, STEP = 43.0, -6.0, 0.01
+
+
+def write_grid(path, minutes, destinations):
+    """Write a grid file with the given rows x cols x destinations minutes (kilometers = minutes)"""
+    minutes = np.asarray(minutes, dtype='<f4')
+    rows, cols, _ = minutes.shape
+    header = json.dumps({
+        'south': SOUTH, 'west': WEST, 'lat_step': STEP, 'lon_step': STEP,
+        'rows': rows, 'cols': cols, 'destinations': destinations
+    }).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(b'\0' * (-f.tell() % 8))
+        minutes.tofile(f)
+        minutes.tofile(f)
+    return str(path)
+
+
+def cell_centre(row, col):
+    return SOUTH + (row + 0.5) * STEP, WEST + (col + 0.5) * STEP
+
+
+class TestTravelTimeGrid:
+    """Test cases for grid lookups"""
+
+    def test_nan_cells_fall_back_to_nearest_cell(self, tmp_path):
+        """Test a point next to a cell with no route takes its nearest cell's value"""
+        grid = TravelTimeGrid(write_grid(tmp_path / 'grid', [[[10], [math.nan]], [[20], [30]]], ['Oviedo']))
+
+        assert grid.travel_times(*cell_centre(0, 0)) == {'Oviedo': {'time': 10, 'distance': 10}}
+        assert grid.travel_times(*cell_centre(1, 1)) == {'Oviedo': {'time': 30, 'distance': 30}}
+        # The surrounding cells include the unrouted one, so the nearest cell is used as is
+        lat, lon = cell_centre(1, 0)
+        assert grid.travel_times(lat, lon + 0.4 * STEP)['Oviedo']['time'] == 20
+        # The nearest cell itself has no route
+        assert grid.travel_times(*cell_centre(0, 1)) == {'Oviedo': None}
+
+    def test_edges_and_outside(self, tmp_path):
+        """Test the south and west edges are inside the grid, the north and east edges and beyond are not"""
+        grid = TravelTimeGrid(write_grid(tmp_path / 'grid', [[[10], [20]], [[30], [40]]], ['Oviedo']))
+        north, east = SOUTH + 2 * STEP, WEST + 2 * STEP
+
+        assert grid.contains(SOUTH, WEST)
+        assert grid.contains(north - 1e-9, east - 1e-9)
+        assert not grid.contains(north, WEST)
+        assert not grid.contains(SOUTH, east)
+        assert not grid.contains(SOUTH - 0.001, WEST + 0.005)
+
+        assert grid.travel_times(SOUTH + STEP, WEST + STEP)['Oviedo']['time'] == 25
+        # Points between a cell centre and the grid edge take the edge cells' values
+        assert grid.travel_times(SOUTH, WEST)['Oviedo']['time'] == 10
+        assert grid.travel_times(north - 1e-9, east - 1e-9)['Oviedo']['time'] == 40
+        assert grid.travel_times(SOUTH - 0.001, WEST + 0.005) == {}
+
+    def test_lands_within_closest_of_facility_type(self, app, tmp_path):
+        """Test a facility type stands for all of its destinations, each land judged by its closest one"""
+        first_beach, second_beach = TravelTimeService().beaches[:2]
+        # Cell (0, 0) is near the first beach, (0, 2) near the second, (0, 1) far from both
+        grid_path = write_grid(tmp_path / 'grid', [[[5, 60], [60, 60], [60, 5]]], [first_beach, second_beach])
+
+        land_ids = []
+        for col in range(3):
+            lat, lon = cell_centre(0, col)
+            land = Land(source_email_id=f'grid_beach_{col}', title='Finca', municipality='Llanes',
+                        location_lat=Decimal(str(round(lat, 6))), location_lon=Decimal(str(round(lon, 6))))
+            db.session.add(land)
+            db.session.commit()
+            land_ids.append(land.id)
+
+        with patch('config.Config.TRAVEL_TIME_GRID_PATH', grid_path):
+            assert sorted(land_ids_within_minutes('beach', 10)) == [land_ids[0], land_ids[2]]
+            assert land_ids_within_minutes(first_beach, 10) == [land_ids[0]]
+
+    def test_no_grid_built(self, app, tmp_path):
+        """Test the within-minutes filter fails clearly when the grid file is missing"""
+        with patch('config.Config.TRAVEL_TIME_GRID_PATH', str(tmp_path / 'missing.grid')):
+            with pytest.raises(ValueError, match='not built'):
+                land_ids_within_minutes('oviedo', 30)
+
+    def test_api_rejects_unusable_within_minutes_filter(self, app, tmp_path):
+        """Test /api/lands answers 400 when the drive time filter cannot be applied"""
+        client = app.test_client()
+
+        with patch('config.Config.TRAVEL_TIME_GRID_PATH', str(tmp_path / 'missing.grid')):
+            response = client.get('/api/lands?near=oviedo&within_minutes=30')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+        grid_path = write_grid(tmp_path / 'grid', [[[10]]], ['Oviedo, Asturias, Spain'])
+        with patch('config.Config.TRAVEL_TIME_GRID_PATH', grid_path):
+            response = client.get('/api/lands?near=Atlantis&within_minutes=30')
+        assert response.status_code == 400
+        assert 'Atlantis' in response.get_json()['error']
+
+    def test_travel_time_grid_answers_lookups_and_within_minutes_filter(self, app, tmp_path):
+        """Test gridded travel times match the road graph and power the within-minutes land filter"""
+        from services.land_service import LandService
+
+        gijon, midpoint, oviedo = (-5.6611, 43.5322), (-5.7600, 43.4470), (-5.8593, 43.3614)
+        extract = tmp_path / 'roads.geojson'
+        extract.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'highway': 'primary'},
+             'geometry': {'type': 'LineString', 'coordinates': [list(gijon), list(midpoint), list(oviedo)]}},
+        ]}))
+
+        with app.app_context(), patch('config.Config.ROAD_GRAPH_PATH', str(tmp_path / 'roads.graph')), \
+             patch('config.Config.TRAVEL_TIME_GRID_PATH', str(tmp_path / 'travel_times.grid')), \
+             patch('config.Config.TRAVEL_TIME_GRID_BOUNDS', (43.30, -5.95, 43.60, -5.60)), \
+             patch('config.Config.TRAVEL_TIME_GRID_CELL_METERS', 500), \
+             patch('config.Config.TRAVEL_TIME_CANDIDATES', {}):
+            import_road_extract(str(extract))
+            cells, destinations = build_travel_time_grid()
+            assert cells > 1000 and destinations > 10
+
+            # Interpolated lookups stay within a minute of routing the point itself
+            travel_service = TravelTimeService()
+            travel_service.google_maps_key = None
+            oviedo_coords = travel_service._get_destination_coordinates(travel_service.destinations['oviedo'])
+            for lat, lon in ((43.5330, -5.6611), (43.4470, -5.7650), (43.3700, -5.8550)):
+                routed = route_many(lat, lon, [oviedo_coords])[0]
+                with patch('services.road_router.route_many') as route_many_mock:
+                    travel_data = travel_service.compute_travel_times(lat, lon)
+                route_many_mock.assert_not_called()
+                assert abs(travel_data['travel_time_oviedo'] - routed['time']) <= 1
+
+            land_ids = []
+            for i, (lat, lon) in enumerate([(43.5330, -5.6611), (43.3700, -5.8550), (43.4623, -3.8099)]):
+                land = Land(source_email_id=f'travel_grid_{i}', title='Finca', municipality='Gijón',
+                            location_lat=Decimal(str(lat)), location_lon=Decimal(str(lon)))
+                db.session.add(land)
+                db.session.commit()
+                land_ids.append(land.id)
+            gijon_land, oviedo_land, santander_land = land_ids
+
+            gijon_minutes = route_many(43.5330, -5.6611, [oviedo_coords])[0]['time']
+            within = land_ids_within_minutes('oviedo', gijon_minutes + 2)
+            assert gijon_land in within and oviedo_land in within and santander_land not in within
+            within = land_ids_within_minutes('Oviedo', 10)
+            assert oviedo_land in within and gijon_land not in within
+
+            pagination = LandService.get_filtered_lands({'near': 'oviedo', 'within_minutes': 10}, page=1, per_page=100)
+            assert [land.id for land in pagination.items if land.id in land_ids] == [oviedo_land]
+
+            with pytest.raises(ValueError):
+                land_ids_within_minutes('Atlantis', 30)
@@ -1,7 +1,9 @@
 """Caching utilities for the application"""
 import os
+import math
 import hashlib
 import json
+import threading
 from flask_caching import Cache
 from functools import wraps
 import logging
@@ -10,6 +12,10 @@ logger = logging.getLogger(__name__)
 
 cache = Cache()
 
+# Hit/miss counters for the enrichment read-through cache, per provider
+enrichment_cache_stats = {}
+_enrichment_stats_lock = threading.Lock()
+
 def init_cache(app):
     """Initialize caching with appropriate backend"""
     redis_url = os.environ.get('REDIS_URL')
@@ -76,29 +82,99 @@ def cache_api_response(timeout=300):
         return decorated_function
     return decorator
 
-def cache_enrichment_data(lat, lon, data_type, data, timeout=86400):
-    """Cache enrichment data by location (24 hours default)"""
-    # Round coordinates to 4 decimal places for caching (about 11 meters precision)
-    lat_rounded = round(lat, 4)
-    lon_rounded = round(lon, 4)
+def coordinate_cell(lat, lon, cell_meters=None):
+    """Snap coordinates to a square grid cell id (cell size from config)"""
+    from config import Config
+    cell_meters = cell_meters or Config.ENRICHMENT_CACHE_GRID_METERS
+    
+    # ~111.32 km per degree of latitude; longitude cells widen towards the equator
+    lat_step = cell_meters / 111320.0
+    lat_index = math.floor(float(lat) / lat_step)
+    lon_step = lat_step / max(math.cos(math.radians(lat_index * lat_step)), 0.01)
+    lon_index = math.floor(float(lon) / lon_step)
+    
+    return f"{cell_meters}m:{lat_index}:{lon_index}"
+
+def enrichment_cache_key(lat, lon, data_type, params=None):
+    """Build the cache key for a provider lookup at a location"""
+    key = f"enrichment:{data_type}:{coordinate_cell(lat, lon)}"
+    if params:
+        key += f":{cache_key_from_args(**params)}"
+    return key
+
+def _record_enrichment_cache_event(data_type, event):
+    with _enrichment_stats_lock:
+        counters = enrichment_cache_stats.setdefault(data_type, {'hits': 0, 'misses': 0, 'stores': 0})
+        counters[event] += 1
+
+def cache_enrichment_data(lat, lon, data_type, data, timeout=None, params=None):
+    """Cache enrichment data by grid cell (per-provider TTL by default)"""
+    from config import Config
+    if timeout is None:
+        timeout = Config.ENRICHMENT_CACHE_TTLS.get(data_type, 86400)
     
-    cache_key = f"enrichment:{data_type}:{lat_rounded}:{lon_rounded}"
-    cache.set(cache_key, data, timeout=timeout)
+    cache_key = enrichment_cache_key(lat, lon, data_type, params)
+    try:
+        cache.set(cache_key, data, timeout=timeout)
+    except Exception as e:
+        # No app context or cache backend unavailable - caching is best effort
+        logger.debug(f"Could not cache enrichment data {cache_key}: {e}")
+        return
+    _record_enrichment_cache_event(data_type, 'stores')
     logger.debug(f"Cached enrichment data: {cache_key}")
 
-def get_cached_enrichment_data(lat, lon, data_type):
+def get_cached_enrichment_data(lat, lon, data_type, params=None):
     """Get cached enrichment data if available"""
-    lat_rounded = round(lat, 4)
-    lon_rounded = round(lon, 4)
-    
-    cache_key = f"enrichment:{data_type}:{lat_rounded}:{lon_rounded}"
-    data = cache.get(cache_key)
+    cache_key = enrichment_cache_key(lat, lon, data_type, params)
+    try:
+        data = cache.get(cache_key)
+    except Exception as e:
+        logger.debug(f"Could not read enrichment cache {cache_key}: {e}")
+        data = None
     
     if data is not None:
+        _record_enrichment_cache_event(data_type, 'hits')
         logger.debug(f"Enrichment cache hit: {cache_key}")
+    else:
+        _record_enrichment_cache_event(data_type, 'misses')
+    
+    return data
+
+def cached_enrichment_lookup(lat, lon, data_type, fetch, params=None, timeout=None):
+    """Read-through cache for external enrichment lookups
+    
+    Returns the cached value for the grid cell and parameters, or calls fetch()
+    and caches its result. None results (failed lookups) are not cached.
+    """
+    data = get_cached_enrichment_data(lat, lon, data_type, params)
+    if data is not None:
+        return data
     
+    data = fetch()
+    if data is not None:
+        cache_enrichment_data(lat, lon, data_type, data, timeout=timeout, params=params)
     return data
 
+async def cached_enrichment_lookup_async(lat, lon, data_type, fetch, params=None, timeout=None):
+    """cached_enrichment_lookup for coroutines: fetch is an async callable"""
+    data = get_cached_enrichment_data(lat, lon, data_type, params)
+    if data is not None:
+        return data
+    
+    data = await fetch()
+    if data is not None:
+        cache_enrichment_data(lat, lon, data_type, data, timeout=timeout, params=params)
+    return data
+
+def get_enrichment_cache_stats():
+    """Get hit/miss counters for the enrichment cache by provider"""
+    with _enrichment_stats_lock:
+        stats = {}
+        for data_type, counters in enrichment_cache_stats.items():
+            lookups = counters['hits'] + counters['misses']
+            stats[data_type] = dict(counters, hit_rate=round(counters['hits'] / lookups, 3) if lookups else None)
+        return stats
+
 def clear_cache_pattern(pattern):
     """Clear all cache entries matching a pattern (Redis only)"""
     try:
@@ -118,7 +194,8 @@ def get_cache_stats():
     """Get cache statistics"""
     stats = {
         'backend': cache.config.get('CACHE_TYPE', 'unknown') if cache.config else 'unknown',
-        'available': True
+        'available': True,
+        'enrichment': get_enrichment_cache_stats()
     }
     
     if stats['backend'] == 'redis':
@@ -0,0 +1,150 @@
+"""Per-provider circuit breakers for external API providers
+
+A provider's breaker opens after CIRCUIT_BREAKER_FAILURES consecutive failed
+attempts (transport errors, 429/5xx, 401/403), or at once when the provider
+reports a quota or key problem in an otherwise successful response. While
+open, requests for the provider fail immediately with CircuitOpen so callers
+drop straight to their local fallbacks. After CIRCUIT_BREAKER_RESET_SECONDS
+the breaker is half-open: the next request is let through as a probe, and
+its outcome closes the breaker or opens it for another period.
+
+State is per process, like the HTTP metrics.
+"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Google response statuses meaning every further request will fail too
+PROVIDER_OUTAGE_STATUSES = {'OVER_QUERY_LIMIT', 'OVER_DAILY_LIMIT', 'REQUEST_DENIED'}
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker state for each provider"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.providers = {}
+        self.lock = threading.Lock()
+
+    def _provider(self, provider: str) -> Dict:
+        return self.providers.setdefault(provider, {
+            'state': CLOSED, 'consecutive_failures': 0, 'opened_at': None, 'probe_started_at': None,
+            'last_failure': None, 'last_failure_at': None, 'trips': 0, 'rejected': 0
+        })
+
+    def allow(self, provider: str) -> bool:
+        """Whether a request to the provider may be sent now"""
+        with self.lock:
+            breaker = self._provider(provider)
+            now = time.monotonic()
+
+            if breaker['state'] == OPEN and now - breaker['opened_at'] >= self.reset_seconds:
+                breaker['state'] = HALF_OPEN
+                breaker['probe_started_at'] = None
+
+            if breaker['state'] == HALF_OPEN:
+                # One probe at a time; a probe that never reported back is replaced
+                if breaker['probe_started_at'] is None or now - breaker['probe_started_at'] >= self.reset_seconds:
+                    breaker['probe_started_at'] = now
+                    logger.info(f"Circuit for {provider} is half-open, probing")
+                    return True
+
+            if breaker['state'] == CLOSED:
+                return True
+
+            breaker['rejected'] += 1
+            return False
+
+    def record_success(self, provider: str):
+        with self.lock:
+            breaker = self._provider(provider)
+            if breaker['state'] != CLOSED:
+                logger.info(f"Circuit for {provider} closed after a successful probe")
+            breaker['state'] = CLOSED
+            breaker['consecutive_failures'] = 0
+            breaker['opened_at'] = None
+            breaker['probe_started_at'] = None
+
+    def record_failure(self, provider: str, reason: str):
+        with self.lock:
+            breaker = self._provider(provider)
+            breaker['consecutive_failures'] += 1
+            breaker['last_failure'] = reason
+            breaker['last_failure_at'] = datetime.utcnow()
+            if breaker['state'] == HALF_OPEN or breaker['consecutive_failures'] >= self.failure_threshold:
+                self._open(provider, breaker, reason)
+
+    def trip(self, provider: str, reason: str):
+        """Open the breaker at once (the provider refused service, e.g. quota exhausted)"""
+        with self.lock:
+            breaker = self._provider(provider)
+            breaker['last_failure'] = reason
+            breaker['last_failure_at'] = datetime.utcnow()
+            self._open(provider, breaker, reason)
+
+    def _open(self, provider: str, breaker: Dict, reason: str):
+        if breaker['state'] != OPEN:
+            breaker['trips'] += 1
+            logger.warning(f"Circuit for {provider} opened for {self.reset_seconds:.0f}s: {reason}")
+        breaker['state'] = OPEN
+        breaker['opened_at'] = time.monotonic()
+        breaker['probe_started_at'] = None
+
+    def reset(self, provider: Optional[str] = None):
+        """Close one provider's breaker, or all of them"""
+        with self.lock:
+            for name in ([provider] if provider else list(self.providers)):
+                self.providers.pop(name, None)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            now = time.monotonic()
+            stats = {}
+            for name, breaker in self.providers.items():
+                retry_in = None
+                if breaker['state'] == OPEN:
+                    retry_in = round(max(0.0, self.reset_seconds - (now - breaker['opened_at'])), 1)
+                stats[name] = {
+                    'state': breaker['state'],
+                    'consecutive_failures': breaker['consecutive_failures'],
+                    'probe_in_seconds': retry_in,
+                    'last_failure': breaker['last_failure'],
+                    'last_failure_at': breaker['last_failure_at'].isoformat() if breaker['last_failure_at'] else None,
+                    'trips': breaker['trips'],
+                    'rejected': breaker['rejected']
+                }
+            return stats
+
+
+_breaker = None
+_breaker_pid = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide circuit breakers (recreated after fork)"""
+    global _breaker, _breaker_pid
+
+    if _breaker is None or _breaker_pid != os.getpid():
+        with _breaker_lock:
+            if _breaker is None or _breaker_pid != os.getpid():
+                from config import Config
+                _breaker = CircuitBreaker(Config.CIRCUIT_BREAKER_FAILURES, Config.CIRCUIT_BREAKER_RESET_SECONDS)
+                _breaker_pid = os.getpid()
+    return _breaker
+
+
+def report_provider_status(provider: str, status: Optional[str]):
+    """Open the provider's breaker if an API status says further requests will be refused"""
+    if status in PROVIDER_OUTAGE_STATUSES:
+        get_circuit_breaker().trip(provider, status)
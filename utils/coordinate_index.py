@@ -0,0 +1,62 @@
+"""In-memory grid hash of point coordinates for "another point within X meters?" checks
+
+Points are bucketed by grid cell (cells at least tolerance_meters wide in
+both directions), so every point within the tolerance of a query lies in the
+query's cell or one of its eight neighbours: a check looks at nine buckets,
+whatever the number of points. Points can be added as they are located.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+from utils.spatial_index import METERS_PER_DEGREE, haversine_meters
+
+
+class CoordinateIndex:
+    """Point ids bucketed by grid cell, answering tolerance-distance duplicate checks in O(1)"""
+
+    def __init__(self, tolerance_meters: float):
+        self.tolerance_meters = tolerance_meters
+        self._lat_step = max(tolerance_meters, 0.01) / METERS_PER_DEGREE
+        self._lon_steps = {}
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _lon_step(self, row: int) -> float:
+        """Cell width in degrees of longitude for a row, wide enough at the row's poleward edge"""
+        step = self._lon_steps.get(row)
+        if step is None:
+            edge = max(abs(row * self._lat_step), abs((row + 1) * self._lat_step))
+            step = self._lat_step / max(math.cos(math.radians(min(edge, 89.9))), 1e-6)
+            self._lon_steps[row] = step
+        return step
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        row = math.floor(lat / self._lat_step)
+        return row, math.floor(lon / self._lon_step(row))
+
+    def add(self, point_id: int, lat: float, lon: float):
+        lat, lon = float(lat), float(lon)
+        self._cells.setdefault(self._cell(lat, lon), []).append((point_id, lat, lon))
+        self._count += 1
+
+    def nearby(self, lat: float, lon: float, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(point id, meters) of the points within the tolerance, other than exclude"""
+        lat, lon = float(lat), float(lon)
+        row = math.floor(lat / self._lat_step)
+        found = []
+        for cell_row in (row - 1, row, row + 1):
+            col = math.floor(lon / self._lon_step(cell_row))
+            for cell_col in (col - 1, col, col + 1):
+                for point_id, point_lat, point_lon in self._cells.get((cell_row, cell_col), ()):
+                    if point_id == exclude:
+                        continue
+                    meters = haversine_meters(lat, lon, point_lat, point_lon)
+                    if meters <= self.tolerance_meters:
+                        found.append((point_id, meters))
+        return found
+
+    def has_other(self, lat: float, lon: float, point_id: Optional[int] = None) -> bool:
+        """Whether a point other than point_id lies within the tolerance"""
+        return bool(self.nearby(lat, lon, exclude=point_id))
@@ -1,9 +1,23 @@
 import re
 import logging
 from typing import Dict, Optional
+from utils.keyword_matcher import KeywordMatcher, keyword_matcher
 
 logger = logging.getLogger(__name__)
 
+# Title candidates must name the plot and must not be email boilerplate
+TITLE_KEYWORDS = KeywordMatcher({
+    'skip': ['your search', 'cantabria land', 'new plot', 'idealista'],
+    'land': ['terreno', 'finca', 'parcela', 'solar', 'plot', 'land', 'm²', 'm2'],
+})
+
+# Legal status indicators; the first listed status found wins
+LEGAL_STATUS_KEYWORDS = KeywordMatcher({
+    'Developed': ['urbano consolidado', 'suelo urbano'],
+    'Buildable': ['urbanizable', 'apto para construcción'],
+    'Rustic': ['rústico', 'rustico', 'no urbanizable'],
+})
+
 class EmailParser:
     def __init__(self):
         # Regex patterns for extracting data from Idealista emails
@@ -46,6 +60,12 @@ class EmailParser:
                 'rustico', 'rústico', 'rural'
             ]
         }
+        # Plot and construction words are the fallback clue for buildable land
+        self.land_type_matcher = keyword_matcher({
+            **self.land_type_patterns,
+            'plot': ['solar', 'parcela', 'terreno'],
+            'construction': ['construir', 'edificar', 'vivienda']
+        })
     
     def parse_idealista_email(self, email_content: Dict) -> Optional[Dict]:
         """Parse Idealista email and extract property data"""
@@ -112,10 +132,10 @@ class EmailParser:
                 title = title.strip()
                 
                 # Validate the title (should be descriptive, not too short/generic)
-                if (len(title) >= 15 and 
-                    not any(skip in title.lower() for skip in ['your search', 'cantabria land', 'new plot', 'idealista']) and
-                    any(keyword in title.lower() for keyword in ['terreno', 'finca', 'parcela', 'solar', 'plot', 'land', 'm²', 'm2'])):
-                    return title[:100]  # Limit length
+                if len(title) >= 15:
+                    title_keywords = TITLE_KEYWORDS.matches(title.lower())
+                    if 'skip' not in title_keywords and 'land' in title_keywords:
+                        return title[:100]  # Limit length
         
         # If no specific property title found, create a descriptive one from available info
         # Try to extract location info
@@ -343,40 +363,23 @@ class EmailParser:
     
     def _classify_land_type(self, text: str) -> Optional[str]:
         """Classify land type based on text content"""
-        text_lower = text.lower()
+        found = self.land_type_matcher.matches(text.lower())
         
-        # Check for developed land indicators
-        for keyword in self.land_type_patterns['developed']:
-            if keyword in text_lower:
-                return 'developed'
-        
-        # Check for buildable land indicators
-        for keyword in self.land_type_patterns['buildable']:
-            if keyword in text_lower:
-                return 'buildable'
+        # Developed land indicators take precedence over buildable ones
+        if 'developed' in found:
+            return 'developed'
+        if 'buildable' in found:
+            return 'buildable'
         
         # If no clear indication, try to infer from other clues
-        if any(word in text_lower for word in ['solar', 'parcela', 'terreno']):
-            if any(word in text_lower for word in ['construir', 'edificar', 'vivienda']):
-                return 'buildable'
+        if 'plot' in found and 'construction' in found:
+            return 'buildable'
         
         return None
     
     def _extract_legal_status(self, text: str) -> Optional[str]:
         """Extract legal status information"""
-        text_lower = text.lower()
-        
-        legal_indicators = {
-            'Developed': ['urbano consolidado', 'suelo urbano'],
-            'Buildable': ['urbanizable', 'apto para construcción'],
-            'Rustic': ['rústico', 'rustico', 'no urbanizable']
-        }
-        
-        for status, keywords in legal_indicators.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return status
-        
-        return None
+        return LEGAL_STATUS_KEYWORDS.first(text.lower())
     
     def _clean_description(self, body: str) -> str:
         """Clean and format email body for description"""
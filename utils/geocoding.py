@@ -1,8 +1,9 @@
 import os
 import logging
-import requests
-import time
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from utils.circuit_breaker import report_provider_status
+from utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -10,9 +11,71 @@ class GeocodingService:
     def __init__(self):
         # Use existing secret names with fallback to standard names
         self.google_maps_key = os.environ.get("Google_api") or os.environ.get("GOOGLE_MAPS_API") or os.environ.get("GOOGLE_MAPS_API_KEY")
+        # Results by normalized address, so a batch geocodes each distinct string once
+        self._results = {}
+    
+    def clear(self):
+        """Forget this service's results so cached misses expire per GEOCODE_CACHE_NEGATIVE_TTL_HOURS"""
+        self._results.clear()
         
     def geocode_address(self, address: str) -> Optional[Dict]:
-        """Geocode an address using Google Maps Geocoding API"""
+        """Geocode an address from the offline gazetteer or the geocode cache when possible, else Google then Nominatim"""
+        return self.geocode_many([address])[address]
+    
+    def geocode_many(self, addresses: Iterable[str], max_workers: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """Geocode a batch of addresses, each distinct normalized address once
+        
+        Addresses the gazetteer, this service or the geocode cache already
+        know are answered locally (one cache query for the whole batch); the
+        rest are sent to the providers in parallel on a pool of
+        GEOCODING_MAX_WORKERS threads, whose requests wait on the provider
+        rate limits. Returns every given address with its result (None if
+        not found).
+        """
+        from config import Config
+        from services.gazetteer import get_gazetteer
+        from services.geocode_cache import get_cached_geocodes, normalize_address, store_geocodes
+        
+        addresses = list(dict.fromkeys(addresses))
+        keys = {address: normalize_address(address) for address in addresses}
+        
+        gazetteer = get_gazetteer()
+        pending = {}
+        for address, key in keys.items():
+            if key in self._results or key in pending:
+                continue
+            result = gazetteer.geocode(address) if gazetteer else None
+            if result is not None:
+                self._results[key] = result
+            else:
+                pending[key] = address
+        
+        if pending:
+            cached = get_cached_geocodes(pending)
+            self._results.update(cached)
+            pending = {key: address for key, address in pending.items() if key not in cached}
+        
+        if pending:
+            workers = min(max_workers or Config.GEOCODING_MAX_WORKERS, len(pending))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='geocode') as executor:
+                    fetched = dict(zip(pending, executor.map(self._geocode_uncached, pending.values())))
+            else:
+                fetched = {key: self._geocode_uncached(address) for key, address in pending.items()}
+            
+            # Provider errors are not remembered; the next attempt asks again
+            found = {key: result for key, (result, definitive) in fetched.items() if result is not None or definitive}
+            store_geocodes({pending[key]: result for key, result in found.items()})
+            self._results.update(found)
+        
+        return {address: self._results.get(key) for address, key in keys.items()}
+    
+    def _geocode_uncached(self, address: str) -> Tuple[Optional[Dict], bool]:
+        """Geocode an address using Google Maps Geocoding API, falling back to Nominatim
+        
+        Returns (result, definitive): definitive is False when no result came
+        back because a provider failed rather than because the address is unknown.
+        """
         try:
             if not self.google_maps_key:
                 logger.warning("Google Maps API key not available for geocoding")
@@ -25,7 +88,7 @@ class GeocodingService:
                 'region': 'es'  # Bias results to Spain
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_client().get(url, params=params, timeout=10, provider='google_geocoding')
             if response.status_code == 200:
                 data = response.json()
                 
@@ -38,12 +101,14 @@ class GeocodingService:
                         'lat': location['lat'],
                         'lng': location['lng'],
                         'formatted_address': result['formatted_address'],
-                        'address_components': result.get('address_components', [])
-                    }
+                        'address_components': result.get('address_components', []),
+                        'provider': 'google'
+                    }, True
                 else:
                     status = data.get('status', 'UNKNOWN')
                     error_message = data.get('error_message', '')
                     logger.warning(f"Google geocoding failed for '{address}': {status} - {error_message}")
+                    report_provider_status('google_geocoding', status)
                     return self._fallback_geocoding(address)
             else:
                 logger.error(f"Google geocoding API request failed with status {response.status_code} for '{address}'")
@@ -53,8 +118,8 @@ class GeocodingService:
             logger.error(f"Geocoding error for '{address}': {str(e)}")
             return self._fallback_geocoding(address)
     
-    def _fallback_geocoding(self, address: str) -> Optional[Dict]:
-        """Fallback geocoding using Nominatim (OpenStreetMap)"""
+    def _fallback_geocoding(self, address: str) -> Tuple[Optional[Dict], bool]:
+        """Fallback geocoding using Nominatim (OpenStreetMap); returns (result, definitive)"""
         try:
             # Use Nominatim as fallback
             url = "https://nominatim.openstreetmap.org/search"
@@ -69,7 +134,7 @@ class GeocodingService:
                 'User-Agent': 'Idealista-Land-Watch/1.0'
             }
             
-            response = requests.get(url, params=params, headers=headers)
+            response = get_http_client().get(url, params=params, headers=headers, timeout=10, provider='nominatim')
             if response.status_code == 200:
                 data = response.json()
                 
@@ -79,15 +144,19 @@ class GeocodingService:
                         'lat': float(result['lat']),
                         'lng': float(result['lon']),
                         'formatted_address': result['display_name'],
-                        'address_components': []
-                    }
+                        'address_components': [],
+                        'provider': 'nominatim'
+                    }, True
+                
+                logger.warning(f"Fallback geocoding found no match for '{address}'")
+                return None, True
             
             logger.warning(f"Fallback geocoding also failed for '{address}'")
-            return None
+            return None, False
             
         except Exception as e:
             logger.error(f"Fallback geocoding error for '{address}': {str(e)}")
-            return None
+            return None, False
     
     def reverse_geocode(self, lat: float, lng: float) -> Optional[Dict]:
         """Reverse geocode coordinates to get address"""
@@ -102,7 +171,7 @@ class GeocodingService:
                 'language': 'es'
             }
             
-            response = requests.get(url, params=params)
+            response = get_http_client().get(url, params=params, timeout=10, provider='google_geocoding')
             if response.status_code == 200:
                 data = response.json()
                 
@@ -112,6 +181,7 @@ class GeocodingService:
                         'formatted_address': result['formatted_address'],
                         'address_components': result.get('address_components', [])
                     }
+                report_provider_status('google_geocoding', data.get('status'))
             
             return self._fallback_reverse_geocoding(lat, lng)
             
@@ -134,7 +204,7 @@ class GeocodingService:
                 'User-Agent': 'Idealista-Land-Watch/1.0'
             }
             
-            response = requests.get(url, params=params, headers=headers)
+            response = get_http_client().get(url, params=params, headers=headers, timeout=10, provider='nominatim')
             if response.status_code == 200:
                 data = response.json()
                 
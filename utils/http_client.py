@@ -0,0 +1,301 @@
+"""Shared HTTP clients for outbound API calls (Google, Nominatim, Overpass)"""
+import os
+import time
+import random
+import logging
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.circuit_breaker import get_circuit_breaker
+from utils.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Responses counted against the provider's circuit breaker (plus rejected credentials)
+BREAKER_FAILURE_STATUSES = RETRY_STATUSES | {401, 403}
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when a request and its retries run past the overall deadline"""
+
+
+class CircuitOpen(requests.ConnectionError):
+    """Raised without sending when the provider's circuit breaker is open"""
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with capped exponential-backoff retries
+
+    Every request has a per-attempt timeout and an overall deadline covering
+    all retries, so a hung upstream can never pin a worker indefinitely.
+    urllib3 keeps a separate connection pool per host.
+    """
+
+    def __init__(self, connect_timeout: float = None, read_timeout: float = None,
+                 deadline: float = None, max_retries: int = None,
+                 backoff_factor: float = None, backoff_max: float = None,
+                 pool_maxsize: int = None):
+        from config import Config
+
+        self.connect_timeout = connect_timeout or Config.HTTP_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or Config.HTTP_READ_TIMEOUT
+        self.deadline = deadline or Config.HTTP_DEADLINE
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_factor = backoff_factor or Config.HTTP_BACKOFF_FACTOR
+        self.backoff_max = backoff_max or Config.HTTP_BACKOFF_MAX
+        pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+
+        self.session = requests.Session()
+        # Retries are handled here so each attempt is measured and bounded by the deadline
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, timeout=None, deadline: float = None,
+                provider: str = None, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors, timeouts and 429/5xx responses
+
+        timeout: per-attempt timeout (seconds or a (connect, read) tuple)
+        deadline: overall budget in seconds for all attempts and backoff
+        provider: rate limit budget (see Config.PROVIDER_RATE_LIMITS) charged per attempt,
+            and circuit breaker checked before and updated after every attempt
+        """
+        host = urlsplit(url).netloc
+        connect_timeout, read_timeout = self._split_timeout(timeout)
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self._record(host, 0.0, error=True)
+                raise DeadlineExceeded(f"Deadline exceeded for {method} {host}")
+            self._check_circuit(provider, method, host)
+
+            if provider and not get_rate_limiter().acquire(provider, timeout=remaining):
+                self._record(host, 0.0, error=True)
+                raise DeadlineExceeded(f"Rate limit wait for {provider} would exceed the deadline")
+            remaining = deadline_at - time.monotonic()
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, url,
+                    timeout=(min(connect_timeout, remaining), min(read_timeout, remaining)),
+                    **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(host, time.monotonic() - started, error=True, retry=attempt > 0)
+                self._report_outcome(provider, error=e)
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"{method} {host} failed (attempt {attempt + 1}): {str(e)}")
+                self._backoff(attempt, deadline_at)
+                continue
+
+            retryable = response.status_code in RETRY_STATUSES
+            self._record(host, time.monotonic() - started, error=retryable, retry=attempt > 0,
+                         status=response.status_code)
+            self._report_outcome(provider, status=response.status_code)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            logger.warning(f"{method} {host} returned {response.status_code} (attempt {attempt + 1}), retrying")
+            self._backoff(attempt, deadline_at, response.headers.get('Retry-After'))
+
+        return response
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-host request counts, error counts and latency"""
+        with self._metrics_lock:
+            metrics = {}
+            for host, stats in self._metrics.items():
+                metrics[host] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'status_codes': dict(stats['status_codes']),
+                    'avg_latency_ms': round(stats['total_latency'] / stats['requests'] * 1000, 1) if stats['requests'] else None,
+                    'max_latency_ms': round(stats['max_latency'] * 1000, 1)
+                }
+            return metrics
+
+    def _split_timeout(self, timeout):
+        if timeout is None:
+            return self.connect_timeout, self.read_timeout
+        if isinstance(timeout, tuple):
+            return timeout
+        return min(self.connect_timeout, timeout), timeout
+
+    def _check_circuit(self, provider: Optional[str], method: str, host: str):
+        if provider and not get_circuit_breaker().allow(provider):
+            raise CircuitOpen(f"Circuit open for {provider}, not sending {method} {host}")
+
+    def _report_outcome(self, provider: Optional[str], status: int = None, error: Exception = None):
+        """Update the provider's circuit breaker with the result of one attempt"""
+        if not provider:
+            return
+        if error is not None:
+            get_circuit_breaker().record_failure(provider, f"{type(error).__name__}: {error}")
+        elif status in BREAKER_FAILURE_STATUSES:
+            get_circuit_breaker().record_failure(provider, f"HTTP {status}")
+        else:
+            get_circuit_breaker().record_success(provider)
+
+    def _backoff(self, attempt: int, deadline_at: float, retry_after: Optional[str] = None):
+        """Sleep with capped exponential backoff and jitter, never past the deadline"""
+        time.sleep(self._backoff_delay(attempt, deadline_at, retry_after))
+
+    def _backoff_delay(self, attempt: int, deadline_at: float, retry_after: Optional[str] = None) -> float:
+        delay = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        delay *= random.uniform(0.5, 1.0)
+        if retry_after and retry_after.isdigit():
+            delay = min(self.backoff_max, max(delay, float(retry_after)))
+        return max(0.0, min(delay, deadline_at - time.monotonic()))
+
+    def _record(self, host: str, latency: float, error: bool = False, retry: bool = False, status: int = None):
+        with self._metrics_lock:
+            stats = self._metrics.setdefault(host, {
+                'requests': 0, 'errors': 0, 'retries': 0, 'status_codes': {},
+                'total_latency': 0.0, 'max_latency': 0.0
+            })
+            stats['requests'] += 1
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+            if error:
+                stats['errors'] += 1
+            if retry:
+                stats['retries'] += 1
+            if status is not None:
+                stats['status_codes'][status] = stats['status_codes'].get(status, 0) + 1
+
+
+class AsyncHttpClient(HttpClient):
+    """asyncio counterpart of HttpClient built on httpx.AsyncClient
+
+    Same timeouts, deadline, retries, rate limits, circuit breakers and
+    metrics, plus a cap on requests in flight across every coroutine using the
+    client. Create one per event loop and close it with aclose() (or use it as
+    an async context manager).
+    """
+
+    def __init__(self, max_in_flight: int = None, **kwargs):
+        import asyncio
+        import httpx
+        from config import Config
+
+        super().__init__(**kwargs)
+        self.session.close()  # Only the async transport is used
+
+        self.max_in_flight = max_in_flight or Config.ASYNC_ENRICHMENT_MAX_IN_FLIGHT
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        self.async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_in_flight,
+                                max_keepalive_connections=self.max_in_flight)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.async_client.aclose()
+
+    async def get(self, url: str, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def request(self, method: str, url: str, timeout=None, deadline: float = None,
+                      provider: str = None, **kwargs):
+        """Send a request, retrying transport errors and 429/5xx responses (see HttpClient.request)"""
+        import asyncio
+        import httpx
+
+        host = urlsplit(url).netloc
+        connect_timeout, read_timeout = self._split_timeout(timeout)
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self._record(host, 0.0, error=True)
+                raise DeadlineExceeded(f"Deadline exceeded for {method} {host}")
+            self._check_circuit(provider, method, host)
+
+            if provider and not await get_rate_limiter().acquire_async(provider, timeout=remaining):
+                self._record(host, 0.0, error=True)
+                raise DeadlineExceeded(f"Rate limit wait for {provider} would exceed the deadline")
+            remaining = deadline_at - time.monotonic()
+
+            async with self.in_flight:
+                started = time.monotonic()
+                try:
+                    response = await self.async_client.request(
+                        method, url,
+                        timeout=httpx.Timeout(min(read_timeout, remaining), connect=min(connect_timeout, remaining)),
+                        **kwargs
+                    )
+                except httpx.TransportError as e:
+                    self._record(host, time.monotonic() - started, error=True, retry=attempt > 0)
+                    self._report_outcome(provider, error=e)
+                    if attempt >= self.max_retries:
+                        raise
+                    logger.warning(f"{method} {host} failed (attempt {attempt + 1}): {str(e)}")
+                    response = None
+
+            if response is None:
+                await asyncio.sleep(self._backoff_delay(attempt, deadline_at))
+                continue
+
+            retryable = response.status_code in RETRY_STATUSES
+            self._record(host, time.monotonic() - started, error=retryable, retry=attempt > 0,
+                         status=response.status_code)
+            self._report_outcome(provider, status=response.status_code)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            logger.warning(f"{method} {host} returned {response.status_code} (attempt {attempt + 1}), retrying")
+            await asyncio.sleep(self._backoff_delay(attempt, deadline_at, response.headers.get('Retry-After')))
+
+        return response
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the process-wide HTTP client (recreated after fork so pools aren't shared)"""
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = HttpClient()
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_http_metrics() -> Dict[str, Dict]:
+    """Per-host metrics for this process"""
+    return get_http_client().metrics()
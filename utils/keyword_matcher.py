@@ -0,0 +1,66 @@
+"""Shared keyword-category matching for parser, enrichment and scoring
+
+Replaces the `any(keyword in text for keyword in keywords)` scans spread
+across the code. A KeywordMatcher is built once per keyword set and answers
+which categories occur in a text, with the same result as a substring test
+for every keyword.
+
+Each category is checked with C-level substring searches over a reduced
+keyword list: keywords that contain another keyword of the same category
+can never decide the result and are dropped, and the rest keep their listed
+order (put the common ones first). This measures on par with the plain
+any() scans it replaces, up to ~1.2x faster on some keyword sets. A
+single-pass regex alternation (plain or trie-shaped) measured slower than
+these scans for our keyword sets and text sizes - see
+benchmarks/keyword_matching.py.
+
+Matching is case-sensitive, like the `in` operator; lower-case the text
+first where the keywords are lower case.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+class KeywordMatcher:
+    """Precompiled keyword categories answering which of them occur in a text"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.keywords = {category: tuple(keywords) for category, keywords in categories.items()}
+        self.categories = list(self.keywords)
+
+        self._scans = []
+        for category, keywords in self.keywords.items():
+            if not all(keywords):
+                raise ValueError(f"Empty keyword in category '{category}'")
+            unique = list(dict.fromkeys(keywords))
+            # 'vista al mar' can only match where 'mar' does
+            needed = tuple(k for k in unique if not any(other != k and other in k for other in unique))
+            self._scans.append((category, needed))
+
+    def matches(self, text: Optional[str]) -> Set[str]:
+        """Categories with at least one keyword in the text"""
+        if not text:
+            return set()
+        return {category for category, keywords in self._scans if any(k in text for k in keywords)}
+
+    def first(self, text: Optional[str]) -> Optional[str]:
+        """The first category, in definition order, with a keyword in the text"""
+        if text:
+            for category, keywords in self._scans:
+                if any(k in text for k in keywords):
+                    return category
+        return None
+
+    def search(self, text: Optional[str]) -> bool:
+        """Whether any keyword of any category occurs in the text"""
+        return self.first(text) is not None
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(frozen: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(dict(frozen))
+
+
+def keyword_matcher(categories: Dict[str, Iterable[str]]) -> KeywordMatcher:
+    """Shared matcher for a keyword set, built once per distinct set"""
+    return _cached_matcher(tuple((category, tuple(keywords)) for category, keywords in categories.items()))
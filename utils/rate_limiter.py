@@ -0,0 +1,193 @@
+"""Token-bucket rate limiting for external API providers
+
+Budgets are shared across threads, and across processes when REDIS_URL is
+configured. Without Redis (or if it becomes unreachable) each process gets
+its own in-memory bucket; set RATE_LIMIT_PROCESSES to split the budget
+between that many worker processes.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Atomically refill the bucket and take tokens; returns seconds to wait ('0' when granted)
+REDIS_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class TokenBucket:
+    """In-process token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, name: str, rate: float, capacity: float):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take tokens if available; otherwise return the seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+
+class RedisTokenBucket:
+    """Token bucket stored in Redis so every worker process shares one budget"""
+
+    def __init__(self, name: str, rate: float, capacity: float, client):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.key = f"ratelimit:{name}"
+        self.script = client.register_script(REDIS_TOKEN_BUCKET_SCRIPT)
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        return float(self.script(keys=[self.key], args=[self.rate, self.capacity, tokens]))
+
+
+class RateLimiter:
+    """Per-provider token buckets with blocking acquire"""
+
+    def __init__(self, limits: Dict[str, Dict], redis_url: Optional[str] = None, process_share: int = 1):
+        self.limits = limits
+        # Without Redis, N cooperating processes each take 1/N of every budget
+        self.local_buckets = {
+            name: TokenBucket(name, limit['rate'] / process_share, max(1, limit['burst'] / process_share))
+            for name, limit in limits.items()
+        }
+        self.redis_buckets = {}
+        self.stats = {name: {'acquired': 0, 'waited_seconds': 0.0, 'timeouts': 0} for name in limits}
+        self.stats_lock = threading.Lock()
+
+        if redis_url:
+            try:
+                import redis
+                client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+                self.redis_buckets = {
+                    name: RedisTokenBucket(name, limit['rate'], limit['burst'], client)
+                    for name, limit in limits.items()
+                }
+                logger.info("Using Redis for API rate limiting")
+            except Exception as e:
+                logger.warning(f"Redis rate limiting unavailable, using in-process buckets: {e}")
+
+    def acquire(self, provider: str, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until the provider budget allows the call
+
+        Returns False if the wait would exceed `timeout`. Unknown providers are
+        not limited.
+        """
+        if provider not in self.local_buckets:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+
+        while True:
+            wait = self._try_acquire(provider, tokens)
+            if wait <= 0:
+                self._record(provider, waited)
+                return True
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                with self.stats_lock:
+                    self.stats[provider]['timeouts'] += 1
+                return False
+
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, provider: str, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Like acquire(), but waits without blocking the event loop"""
+        import asyncio
+
+        if provider not in self.local_buckets:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+
+        while True:
+            wait = self._try_acquire(provider, tokens)
+            if wait <= 0:
+                self._record(provider, waited)
+                return True
+            
+            if deadline is not None and time.monotonic() + wait > deadline:
+                with self.stats_lock:
+                    self.stats[provider]['timeouts'] += 1
+                return False
+            
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self.stats_lock:
+            return {
+                name: dict(stats, rate=self.limits[name]['rate'], burst=self.limits[name]['burst'],
+                           backend='redis' if name in self.redis_buckets else 'memory')
+                for name, stats in self.stats.items()
+            }
+
+    def _try_acquire(self, provider: str, tokens: float) -> float:
+        bucket = self.redis_buckets.get(provider)
+        if bucket:
+            try:
+                return bucket.try_acquire(tokens)
+            except Exception as e:
+                logger.warning(f"Redis rate limiter failed, falling back to in-process buckets: {e}")
+                self.redis_buckets = {}
+        return self.local_buckets[provider].try_acquire(tokens)
+
+    def _record(self, provider: str, waited: float):
+        with self.stats_lock:
+            self.stats[provider]['acquired'] += 1
+            self.stats[provider]['waited_seconds'] += waited
+
+
+_limiter = None
+_limiter_pid = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter (recreated after fork)"""
+    global _limiter, _limiter_pid
+
+    if _limiter is None or _limiter_pid != os.getpid():
+        with _limiter_lock:
+            if _limiter is None or _limiter_pid != os.getpid():
+                from config import Config
+                _limiter = RateLimiter(Config.PROVIDER_RATE_LIMITS, os.environ.get('REDIS_URL'),
+                                       process_share=int(os.environ.get('RATE_LIMIT_PROCESSES') or "1"))
+                _limiter_pid = os.getpid()
+    return _limiter
@@ -0,0 +1,203 @@
+"""Static road graph (CSR adjacency) persisted to disk and memory-mapped
+
+Nodes are stored in KD-tree order (see spatial_index), so the same arrays
+answer nearest-node queries without a separate index. Directed edges are
+grouped by source node: the edges of node i are positions offsets[i] to
+offsets[i + 1] of the target, travel time and length arrays.
+
+File layout: 8-byte magic, uint32 header length, JSON header (node_count,
+edge_count), padding to 8 bytes, then float64 latitudes, float64
+longitudes, uint32 offsets (node_count + 1), uint32 edge targets, float32
+edge travel seconds and float32 edge lengths in meters.
+"""
+import os
+import json
+import math
+import mmap
+import heapq
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.spatial_index import METERS_PER_DEGREE, _kd_order, haversine_meters
+
+MAGIC = b'RDGRPH01'
+
+
+def build_road_graph(nodes: List[Tuple[float, float]], edges: Iterable[Tuple[int, int, float, float]],
+                     path: str) -> Tuple[int, int]:
+    """Write (lat, lon) nodes and directed (source, target, seconds, meters) edges; returns (nodes, edges)"""
+    lats = [float(lat) for lat, _ in nodes]
+    lons = [float(lon) for _, lon in nodes]
+
+    order = _kd_order(lats, lons)
+    position = [0] * len(order)
+    for new, old in enumerate(order):
+        position[old] = new
+
+    adjacency = [[] for _ in order]
+    edge_count = 0
+    for source, target, seconds, meters in edges:
+        adjacency[position[source]].append((position[target], seconds, meters))
+        edge_count += 1
+
+    offsets = array('I', [0])
+    targets, edge_seconds, edge_meters = array('I'), array('f'), array('f')
+    for node_edges in adjacency:
+        for target, seconds, meters in node_edges:
+            targets.append(target)
+            edge_seconds.append(seconds)
+            edge_meters.append(meters)
+        offsets.append(len(targets))
+
+    header = json.dumps({'node_count': len(order), 'edge_count': edge_count}).encode('utf-8')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file and rename, so readers never see a partial graph
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(b'\0' * (-f.tell() % 8))
+        array('d', (lats[i] for i in order)).tofile(f)
+        array('d', (lons[i] for i in order)).tofile(f)
+        offsets.tofile(f)
+        targets.tofile(f)
+        edge_seconds.tofile(f)
+        edge_meters.tofile(f)
+    os.replace(tmp_path, path)
+
+    return len(order), edge_count
+
+
+class RoadGraph:
+    """Read-only, memory-mapped road graph answering nearest-node and driving time queries"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:8] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a road graph file")
+
+        header_length = struct.unpack_from('<I', self._mmap, 8)[0]
+        header = json.loads(self._mmap[12:12 + header_length].decode('utf-8'))
+        self.node_count = header['node_count']
+        self.edge_count = header['edge_count']
+
+        offset = 12 + header_length
+        offset += -offset % 8
+        view = memoryview(self._mmap)
+        self._views = []
+        for name, code, size, count in (('lats', 'd', 8, self.node_count), ('lons', 'd', 8, self.node_count),
+                                        ('offsets', 'I', 4, self.node_count + 1),
+                                        ('targets', 'I', 4, self.edge_count),
+                                        ('seconds', 'f', 4, self.edge_count), ('meters', 'f', 4, self.edge_count)):
+            array_view = view[offset:offset + size * count].cast(code)
+            setattr(self, name, array_view)
+            self._views.append(array_view)
+            offset += size * count
+        self._reverse = None
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def close(self):
+        for array_view in self._views:
+            array_view.release()
+        self._mmap.close()
+
+    def nearest_node(self, lat: float, lon: float) -> Tuple[int, float]:
+        """(node, distance in meters) of the graph node closest to a point"""
+        if not self.node_count:
+            raise ValueError("Road graph has no nodes")
+
+        # Equirectangular meters for the search; the returned distance is great-circle
+        lon_scale = math.cos(math.radians(lat))
+        lats, lons = self.lats, self.lons
+        best_node, best_distance = -1, float('inf')
+        stack = [(0, self.node_count, 0, 0.0)]
+
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            if lo >= hi or bound >= best_distance:
+                continue
+            mid = (lo + hi) // 2
+            delta_lat = (lat - lats[mid]) * METERS_PER_DEGREE
+            delta_lon = (lon - lons[mid]) * METERS_PER_DEGREE * lon_scale
+            distance = math.hypot(delta_lat, delta_lon)
+            if distance < best_distance:
+                best_node, best_distance = mid, distance
+
+            axis_delta = delta_lat if depth % 2 == 0 else delta_lon
+            near, far = ((mid + 1, hi), (lo, mid)) if axis_delta > 0 else ((lo, mid), (mid + 1, hi))
+            stack.append((far[0], far[1], depth + 1, abs(axis_delta)))
+            stack.append((near[0], near[1], depth + 1, bound))
+
+        return best_node, haversine_meters(lat, lon, lats[best_node], lons[best_node])
+
+    def shortest_paths(self, source: int, targets: Optional[Iterable[int]] = None,
+                       reverse: bool = False) -> Dict[int, Tuple[float, float]]:
+        """(seconds, meters) of the fastest route from source to each reachable target
+
+        One Dijkstra search, stopped once every target is settled; without
+        targets every reachable node is returned. With reverse the routes run
+        from each node to source instead (edges are followed backwards).
+        """
+        remaining = set(targets) if targets is not None else None
+        if reverse:
+            offsets, neighbors, edge_ids = self._reverse_adjacency()
+        else:
+            offsets, neighbors, edge_ids = self.offsets, self.targets, None
+        edge_seconds, edge_meters = self.seconds, self.meters
+        best = {source: 0.0}
+        meters = {source: 0.0}
+        heap = [(0.0, source)]
+        results = {}
+
+        while heap and (remaining is None or remaining):
+            seconds, node = heapq.heappop(heap)
+            if seconds > best[node]:
+                continue
+            if remaining is None:
+                results[node] = (seconds, meters[node])
+            elif node in remaining:
+                results[node] = (seconds, meters[node])
+                remaining.discard(node)
+
+            for position in range(offsets[node], offsets[node + 1]):
+                neighbor = neighbors[position]
+                edge = edge_ids[position] if edge_ids is not None else position
+                arrival = seconds + edge_seconds[edge]
+                if arrival < best.get(neighbor, float('inf')):
+                    best[neighbor] = arrival
+                    meters[neighbor] = meters[node] + edge_meters[edge]
+                    heapq.heappush(heap, (arrival, neighbor))
+
+        return results
+
+    def _reverse_adjacency(self) -> Tuple[array, array, array]:
+        """Incoming edges grouped by target: (offsets, source nodes, edge ids), built on first use"""
+        if self._reverse is None:
+            offsets = array('I', bytes(4 * (self.node_count + 1)))
+            for edge in range(self.edge_count):
+                offsets[self.targets[edge] + 1] += 1
+            for node in range(self.node_count):
+                offsets[node + 1] += offsets[node]
+
+            sources = array('I', bytes(4 * self.edge_count))
+            edge_ids = array('I', bytes(4 * self.edge_count))
+            next_slot = array('I', offsets)
+            for node in range(self.node_count):
+                for edge in range(self.offsets[node], self.offsets[node + 1]):
+                    slot = next_slot[self.targets[edge]]
+                    sources[slot] = node
+                    edge_ids[slot] = edge
+                    next_slot[self.targets[edge]] = slot + 1
+            self._reverse = (offsets, sources, edge_ids)
+        return self._reverse
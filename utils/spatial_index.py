@@ -0,0 +1,263 @@
+"""Static point index (implicit KD-tree) persisted to disk and memory-mapped
+
+Points are stored in KD-tree order: the median of every range is its node, so
+the tree needs no child pointers and lives in three flat arrays (latitude,
+longitude, category). The file is memory-mapped read-only, so opening it is
+cheap and every worker process shares the same pages. Small point sets can
+be indexed in memory instead (SpatialIndex.from_points).
+
+File layout: 8-byte magic, uint32 header length, JSON header (count,
+categories, optional names), padding to 8 bytes, then float64 latitudes,
+float64 longitudes and uint16 category ids.
+"""
+import os
+import json
+import math
+import mmap
+import heapq
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b'SPIDX001'
+EARTH_RADIUS_METERS = 6371000
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters"""
+    lat1_rad, lat2_rad = math.radians(lat1), math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = (math.sin(delta_lat / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2)
+    return EARTH_RADIUS_METERS * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _kd_order(lats: List[float], lons: List[float]) -> List[int]:
+    """Permutation that places every range's median (by alternating axis) in its middle"""
+    order = list(range(len(lats)))
+    stack = [(0, len(order), 0)]
+
+    while stack:
+        lo, hi, depth = stack.pop()
+        if hi - lo <= 1:
+            continue
+        coords = lats if depth % 2 == 0 else lons
+        order[lo:hi] = sorted(order[lo:hi], key=coords.__getitem__)
+        mid = (lo + hi) // 2
+        stack.append((lo, mid, depth + 1))
+        stack.append((mid + 1, hi, depth + 1))
+
+    return order
+
+
+def _index_arrays(points: Iterable[Tuple[float, float, str]], names: Optional[Iterable[Optional[str]]] = None
+                  ) -> Tuple[array, array, array, List[str], Optional[List[Optional[str]]]]:
+    """KD-ordered latitude, longitude and category id arrays, category list and names of points"""
+    lats, lons, category_names = [], [], []
+    for lat, lon, category in points:
+        lats.append(float(lat))
+        lons.append(float(lon))
+        category_names.append(category)
+    names = list(names) if names is not None else None
+
+    categories = sorted(set(category_names))
+    if len(categories) > 65535:
+        raise ValueError("Too many categories for a spatial index")
+    category_ids = {category: i for i, category in enumerate(categories)}
+
+    order = _kd_order(lats, lons)
+    return (array('d', (lats[i] for i in order)), array('d', (lons[i] for i in order)),
+            array('H', (category_ids[category_names[i]] for i in order)), categories,
+            [names[i] for i in order] if names is not None else None)
+
+
+def build_spatial_index(points: Iterable[Tuple[float, float, str]], path: str,
+                        names: Optional[Iterable[Optional[str]]] = None) -> int:
+    """Write (lat, lon, category) points to an index file; returns the point count
+
+    names, if given, must be aligned with points.
+    """
+    lats, lons, category_index, categories, names = _index_arrays(points, names)
+    header = json.dumps({
+        'count': len(lats),
+        'categories': categories,
+        'names': names
+    }).encode('utf-8')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file and rename, so readers never see a partial index
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(b'\0' * (-f.tell() % 8))
+        lats.tofile(f)
+        lons.tofile(f)
+        category_index.tofile(f)
+    os.replace(tmp_path, path)
+
+    return len(lats)
+
+
+class SpatialIndex:
+    """Read-only, memory-mapped point index answering radius and nearest-neighbour queries"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:8] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a spatial index file")
+
+        header_length = struct.unpack_from('<I', self._mmap, 8)[0]
+        header = json.loads(self._mmap[12:12 + header_length].decode('utf-8'))
+        self.count = header['count']
+        self.categories = header['categories']
+        self.names = header.get('names')
+        self.category_ids = {category: i for i, category in enumerate(self.categories)}
+
+        offset = 12 + header_length
+        offset += -offset % 8
+        view = memoryview(self._mmap)
+        self.lats = view[offset:offset + 8 * self.count].cast('d')
+        offset += 8 * self.count
+        self.lons = view[offset:offset + 8 * self.count].cast('d')
+        offset += 8 * self.count
+        self.category_index = view[offset:offset + 2 * self.count].cast('H')
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple[float, float, str]],
+                    names: Optional[Iterable[Optional[str]]] = None) -> 'SpatialIndex':
+        """In-memory index over (lat, lon, category) points, for sets small enough to need no file"""
+        index = cls.__new__(cls)
+        index.path = None
+        index._mmap = None
+        index.lats, index.lons, index.category_index, index.categories, index.names = _index_arrays(points, names)
+        index.count = len(index.lats)
+        index.category_ids = {category: i for i, category in enumerate(index.categories)}
+        return index
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self.lats.release()
+        self.lons.release()
+        self.category_index.release()
+        self._mmap.close()
+
+    def within(self, lat: float, lon: float, radius_meters: float,
+               categories: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """(point position, distance in meters) for points within the radius"""
+        wanted = None
+        if categories is not None:
+            wanted = {self.category_ids[c] for c in categories if c in self.category_ids}
+            if not wanted:
+                return []
+
+        # Bounding box in degrees; longitude span uses the highest latitude in the box
+        delta_lat = radius_meters / METERS_PER_DEGREE
+        max_abs_lat = min(89.9, abs(lat) + delta_lat)
+        delta_lon = radius_meters / (METERS_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+        bounds = ((lat - delta_lat, lat + delta_lat), (lon - delta_lon, lon + delta_lon))
+
+        lats, lons, category_index = self.lats, self.lons, self.category_index
+        results = []
+        stack = [(0, self.count, 0)]
+
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            point_lat, point_lon = lats[mid], lons[mid]
+
+            if (bounds[0][0] <= point_lat <= bounds[0][1] and bounds[1][0] <= point_lon <= bounds[1][1] and
+                    (wanted is None or category_index[mid] in wanted)):
+                distance = haversine_meters(lat, lon, point_lat, point_lon)
+                if distance <= radius_meters:
+                    results.append((mid, distance))
+
+            axis_value = point_lat if depth % 2 == 0 else point_lon
+            axis_low, axis_high = bounds[depth % 2]
+            if axis_low <= axis_value:
+                stack.append((lo, mid, depth + 1))
+            if axis_value <= axis_high:
+                stack.append((mid + 1, hi, depth + 1))
+
+        return results
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                categories: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """(point position, distance in meters) of the k points closest to a location, closest first"""
+        wanted = None
+        if categories is not None:
+            wanted = {self.category_ids[c] for c in categories if c in self.category_ids}
+            if not wanted:
+                return []
+        if k <= 0:
+            return []
+
+        lats, lons, category_index = self.lats, self.lons, self.category_index
+        best = []  # max-heap of the k closest so far as (-distance, position)
+        stack = [(0, self.count, 0, 0.0)]
+
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            worst = -best[0][0] if len(best) == k else float('inf')
+            if lo >= hi or bound >= worst:
+                continue
+            mid = (lo + hi) // 2
+            point_lat, point_lon = lats[mid], lons[mid]
+
+            if wanted is None or category_index[mid] in wanted:
+                distance = haversine_meters(lat, lon, point_lat, point_lon)
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, mid))
+                elif distance < worst:
+                    heapq.heapreplace(best, (-distance, mid))
+                worst = -best[0][0] if len(best) == k else float('inf')
+
+            if depth % 2 == 0:
+                # Great-circle distance is at least the latitude difference
+                axis_delta = (lat - point_lat) * METERS_PER_DEGREE
+            else:
+                # Longitude degrees shrink towards the poles: scale by the widest latitude a
+                # closer point could have, with slack for great circles cutting across parallels
+                reach = worst / METERS_PER_DEGREE if worst < float('inf') else 90.0
+                lon_scale = math.cos(math.radians(min(89.9, abs(lat) + reach)))
+                axis_delta = (lon - point_lon) * METERS_PER_DEGREE * lon_scale * 0.99
+            near, far = ((mid + 1, hi), (lo, mid)) if axis_delta > 0 else ((lo, mid), (mid + 1, hi))
+            stack.append((far[0], far[1], depth + 1, max(bound, abs(axis_delta))))
+            stack.append((near[0], near[1], depth + 1, bound))
+
+        return sorted(((position, -negative) for negative, position in best), key=lambda item: item[1])
+
+    def count_by_category(self, lat: float, lon: float, radius_meters: float,
+                          categories: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Number of points per category within the radius"""
+        counts = {}
+        for position, _ in self.within(lat, lon, radius_meters, categories):
+            category = self.categories[self.category_index[position]]
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def point(self, position: int) -> Dict:
+        """Coordinates, category and name of the point at a position"""
+        return {
+            'lat': self.lats[position],
+            'lon': self.lons[position],
+            'category': self.categories[self.category_index[position]],
+            'name': self.names[position] if self.names else None
+        }
@@ -11,6 +11,9 @@ class LandFilterSchema(Schema):
     max_area = fields.Decimal(allow_none=True, validate=validate.Range(min=0))
     search = fields.Str(allow_none=True, validate=validate.Length(max=200))
     sea_view = fields.Bool(allow_none=True)
+    # Lands within within_minutes drive of near: 'oviedo', 'gijon', a facility type ('beach') or a destination
+    near = fields.Str(allow_none=True, validate=validate.Length(max=200))
+    within_minutes = fields.Int(allow_none=True, validate=validate.Range(min=1, max=600))
     sort = fields.Str(allow_none=True, validate=validate.OneOf([
         'score_total', 'score_investment', 'score_lifestyle', 
         'price', 'area', 'created_at', 'municipality', 'travel_time_nearest_beach'